@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: N parallel tool calls against a local stub server.
+
+Compares calling the sync client directly inside the async handler (the old
+behaviour, which blocks the event loop) with OpensearchClient._run in thread
+mode and, when aiohttp is installed, in async mode.
+
+Usage:
+    python benchmarks/concurrency.py [--calls 32] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_opensearch import FakeOpenSearch
+from opensearch_mcp_server import env, es_client
+
+
+async def blocking_call(tools):
+    # Previous handlers called the sync client straight from the coroutine
+    return tools.es_client.cluster.health()
+
+
+async def offloaded_call(tools):
+    return await tools._run(lambda client: client.cluster.health())
+
+
+async def run_batch(call, tools, calls):
+    # Warm up connections so the measurement excludes connection setup
+    await asyncio.gather(*(call(tools) for _ in range(calls)))
+    start = time.perf_counter()
+    await asyncio.gather(*(call(tools) for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+def reset(mode: str):
+    es_client.close_opensearch_client()
+    env._dotenv_loaded = False
+    os.environ["OPENSEARCH_CLIENT_MODE"] = mode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=32, help="parallel tool calls per batch")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub server latency in seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    logger = logging.getLogger("benchmark")
+
+    with FakeOpenSearch(latency=args.latency) as server:
+        os.environ["OPENSEARCH_HOST"] = server.url
+        os.environ.setdefault("OPENSEARCH_USERNAME", "admin")
+        os.environ.setdefault("OPENSEARCH_PASSWORD", "admin")
+        os.environ.setdefault("OPENSEARCH_POOL_MAXSIZE", str(args.calls))
+
+        scenarios = [("blocking (before)", "thread", blocking_call), ("thread pool", "thread", offloaded_call)]
+        if importlib.util.find_spec("aiohttp") is not None:
+            scenarios.append(("AsyncOpenSearch", "async", offloaded_call))
+        else:
+            print("aiohttp not installed; skipping async mode")
+
+        for label, mode, call in scenarios:
+            reset(mode)
+            tools = es_client.OpensearchClient(logger)
+            elapsed = asyncio.run(run_batch(call, tools, args.calls))
+            print(
+                f"{label:<20} {args.calls} calls in {elapsed:7.3f}s "
+                f"-> {args.calls / elapsed:8.1f} calls/s"
+            )
+        es_client.close_opensearch_client()
+
+
+if __name__ == "__main__":
+    main()
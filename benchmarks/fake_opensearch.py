@@ -0,0 +1,105 @@
+"""
+A minimal local OpenSearch stand-in for benchmarks.
+
+It answers a handful of endpoints with canned JSON after an optional
+artificial latency, which is enough to exercise the client transport
+without a real cluster.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class FakeOpenSearch:
+    def __init__(self, latency: float = 0.0, routes: dict = None):
+        """
+        Args:
+            latency: Seconds to sleep before answering each request.
+            routes: Mapping of path prefix to a response body (dict, list, str, or
+                bytes holding pre-encoded JSON) or a callable taking
+                (method, path, query, body) and returning one.
+        """
+        self.latency = latency
+        self.routes = {
+            "/_cluster/health": {"cluster_name": "bench", "status": "green", "number_of_nodes": 3, "number_of_data_nodes": 3},
+            "/_cluster/stats": {"cluster_name": "bench", "indices": {"count": 1}, "nodes": {"count": {"total": 3}}},
+        }
+        self.routes.update(routes or {})
+        self.requests = 0
+        self.connections = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _resolve(self, method: str, path: str, query: str, body: bytes):
+        # Longest matching prefix wins so specific routes override generic ones
+        for prefix in sorted(self.routes, key=len, reverse=True):
+            if path.startswith(prefix):
+                route = self.routes[prefix]
+                return route(method, path, query, body) if callable(route) else route
+        return {"acknowledged": True}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                fake.connections += 1
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if fake.latency:
+                    time.sleep(fake.latency)
+                fake.requests += 1
+                parsed = urlparse(self.path)
+                payload = fake._resolve(self.command, parsed.path, parsed.query, body)
+                if isinstance(payload, bytes):
+                    data, content_type = payload, "application/json; charset=UTF-8"
+                elif isinstance(payload, str):
+                    data, content_type = payload.encode(), "text/plain; charset=UTF-8"
+                else:
+                    data, content_type = json.dumps(payload).encode(), "application/json; charset=UTF-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeOpenSearch":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,421 @@
+"""
+Deterministic synthetic OpenSearch responses for the benchmark suite.
+
+Every generator takes a seeded random source so results are identical from
+run to run and comparable across commits. `routes()` wires them into a
+FakeOpenSearch route table covering every endpoint the tools call.
+"""
+import json
+import random
+from typing import Any, Dict, List
+
+INDEX = "bench"
+
+
+def cat_indices(rng: random.Random, count: int = 5000) -> List[Dict[str, Any]]:
+    return [
+        {
+            "health": rng.choice(["green", "green", "green", "yellow"]),
+            "status": "open",
+            "index": f"logs-{i:05d}",
+            "pri": str(rng.choice([1, 3, 5])),
+            "rep": "1",
+            "docs.count": str(rng.randint(0, 50_000_000)),
+            "store.size": f"{rng.randint(1, 900)}gb",
+        }
+        for i in range(count)
+    ]
+
+
+def cat_shards(rng: random.Random, indices: int = 5000, shards: int = 5, nodes: int = 60) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(indices):
+        for shard in range(shards):
+            for prirep in ("p", "r"):
+                rows.append({
+                    "index": f"logs-{i:05d}",
+                    "shard": str(shard),
+                    "prirep": prirep,
+                    "state": "STARTED",
+                    "docs": str(rng.randint(0, 10_000_000)),
+                    "store": str(rng.randint(0, 60 * 1024 ** 3)),
+                    "node": f"node-{rng.randrange(nodes):02d}",
+                })
+    return rows
+
+
+def capacity_payloads(rng: random.Random, count: int = 5000) -> Dict[str, Any]:
+    """_cat/indices and _cat/segments in bytes, _stats and _settings for the same indices."""
+    indices, segments, stats, settings = [], [], {"indices": {}}, {}
+    for i in range(count):
+        name = f"logs-{i:05d}"
+        primaries = rng.choice([1, 3, 5])
+        replicas = rng.choice([0, 1, 1, 1, 2])
+        shard_bytes = int(rng.lognormvariate(21, 2.5))
+        docs = shard_bytes // 500 * primaries
+        indices.append({
+            "index": name, "health": "green", "status": "open", "pri": str(primaries), "rep": str(replicas),
+            "docs.count": str(docs), "docs.deleted": str(int(docs * rng.random() * 0.4)),
+            "pri.store.size": str(shard_bytes * primaries), "store.size": str(shard_bytes * primaries * (1 + replicas)),
+        })
+        for shard in range(primaries):
+            count_segments = rng.randint(1, 20)
+            for prirep in ["p"] + ["r"] * replicas:
+                for segment in range(count_segments):
+                    segments.append({"index": name, "shard": str(shard), "prirep": prirep,
+                                     "size": str(shard_bytes // count_segments)})
+        stats["indices"][name] = {"primaries": {"indexing": {"index_total": rng.choice([0, 0, 1000]),
+                                                             "index_current": rng.choice([0, 0, 0, 2])},
+                                                "merges": {"current": 0}}}
+        settings[name] = {"settings": {"index": {"refresh_interval": rng.choice(["1s", "30s", "200ms", "-1"])}}}
+    return {"indices": indices, "segments": segments, "stats": stats, "settings": settings}
+
+
+def hits(rng: random.Random, count: int, start: int = 0) -> List[Dict[str, Any]]:
+    return [
+        {
+            "_index": INDEX,
+            "_id": f"doc-{start + i}",
+            "_score": 1.0,
+            "_source": {
+                "@timestamp": f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00Z",
+                "host": f"host-{rng.randrange(500)}",
+                "status": rng.choice([200, 200, 200, 404, 500]),
+                "bytes": rng.randint(100, 100_000),
+                "message": " ".join(rng.choice(["GET", "POST", "/api", "/v1", "user", "items", "ok"]) for _ in range(12)),
+            },
+            "sort": [start + i],
+        }
+        for i in range(count)
+    ]
+
+
+def search_response(rng: random.Random, count: int) -> Dict[str, Any]:
+    return {
+        "took": 42,
+        "timed_out": False,
+        "hits": {"total": {"value": count, "relation": "eq"}, "max_score": 1.0, "hits": hits(rng, count)},
+    }
+
+
+def aggregation_response(rng: random.Random, terms: int = 2000) -> Dict[str, Any]:
+    return {
+        "took": 12,
+        "hits": {"total": {"value": 10000, "relation": "gte"}},
+        "aggregations": {
+            "by_host": {
+                "buckets": [
+                    {
+                        "key": f"host-{i}",
+                        "doc_count": rng.randint(1, 10000),
+                        "latency": {"value": rng.random() * 1000},
+                        "by_status": {
+                            "buckets": [
+                                {"key": status, "doc_count": rng.randint(1, 1000)} for status in (200, 404, 500)
+                            ]
+                        },
+                    }
+                    for i in range(terms)
+                ]
+            }
+        },
+    }
+
+
+def _profile_node(rng: random.Random, depth: int, fanout: int) -> Dict[str, Any]:
+    breakdown = {phase: rng.randint(0, 500000) for phase in ("create_weight", "build_scorer", "next_doc", "advance", "score", "match")}
+    breakdown.update({f"{phase}_count": rng.randint(0, 1000) for phase in list(breakdown)})
+    children = [_profile_node(rng, depth - 1, fanout) for _ in range(fanout)] if depth else []
+    return {
+        "type": rng.choice(["BooleanQuery", "TermQuery", "PointRangeQuery", "WildcardQuery", "TermInSetQuery"]),
+        "description": f"field_{rng.randint(0, 4999)}:value-{rng.randint(0, 99)}",
+        "time_in_nanos": sum(breakdown.values()) + sum(child["time_in_nanos"] for child in children),
+        "breakdown": breakdown,
+        "children": children,
+    }
+
+
+def profile_response(rng: random.Random, shards: int = 50) -> Dict[str, Any]:
+    """A profiled search: one query tree (depth 3, fan-out 4), collector and aggregation per shard."""
+    return {
+        "took": 180,
+        "timed_out": False,
+        "hits": {"total": {"value": 10000, "relation": "gte"}},
+        "profile": {"shards": [
+            {
+                "id": f"[node-{shard % 10:02d}][{INDEX}][{shard}]",
+                "searches": [{
+                    "query": [_profile_node(rng, 3, 4)],
+                    "rewrite_time": rng.randint(0, 100000),
+                    "collector": [{"name": "SimpleTopScoreDocCollector", "reason": "search_top_hits",
+                                   "time_in_nanos": rng.randint(0, 1000000), "children": []}],
+                }],
+                "aggregations": [{"type": "GlobalOrdinalsStringTermsAggregator", "description": "by_host",
+                                  "time_in_nanos": rng.randint(0, 5000000), "breakdown": {}, "children": []}],
+            }
+            for shard in range(shards)
+        ]},
+    }
+
+
+def mapping(rng: random.Random, fields: int = 5000) -> Dict[str, Any]:
+    types = ["keyword", "text", "long", "date", "ip", "float", "boolean"]
+    properties = {}
+    for i in range(fields):
+        field_type = rng.choice(types)
+        definition: Dict[str, Any] = {"type": field_type}
+        if field_type == "text":
+            definition["fields"] = {"keyword": {"type": "keyword", "ignore_above": 256}}
+        properties[f"field_{i}"] = definition
+    return {INDEX: {"mappings": {"dynamic_templates": [], "properties": properties}}}
+
+
+def settings() -> Dict[str, Any]:
+    return {
+        INDEX: {
+            "settings": {
+                "index": {
+                    "number_of_shards": "5",
+                    "number_of_replicas": "1",
+                    "refresh_interval": "1s",
+                    "uuid": "bench-uuid",
+                    "creation_date": "1700000000000",
+                }
+            }
+        }
+    }
+
+
+def hot_threads(rng: random.Random, nodes: int = 60, threads: int = 3, frames: int = 25) -> str:
+    lines = []
+    for n in range(nodes):
+        lines.append(f"::: {{node-{n:02d}}}{{id{n}}}{{10.0.0.{n}}}{{10.0.0.{n}:9300}}")
+        lines.append("   Hot threads at 2024-01-01T00:00:00.000Z, interval=500ms, busiestThreads=3, ignoreIdleThreads=true:")
+        for t in range(threads):
+            cpu = rng.uniform(5, 99)
+            lines.append(
+                f"   {cpu:.1f}% ({cpu * 5:.1f}ms out of 500ms) cpu usage by thread "
+                f"'opensearch[node-{n:02d}][search][T#{t}]'"
+            )
+            lines.append("     10/10 snapshots sharing following 25 elements")
+            for f in range(frames):
+                lines.append(f"       org.opensearch.search.Query{f % 7}.execute(Query{f % 7}.java:{100 + f})")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def grouped_tasks(rng: random.Random, parents: int = 500, children: int = 4, nodes: int = 60) -> Dict[str, Any]:
+    """A `_tasks?detailed&group_by=parents` response."""
+    actions = ["indices:data/read/search", "indices:data/write/bulk", "indices:data/write/reindex"]
+    result: Dict[str, Any] = {"tasks": {}}
+    for i in range(parents):
+        node = f"node-{i % nodes:02d}"
+        action = rng.choice(actions)
+        running = rng.randint(1, 10 ** 12)
+        result["tasks"][f"{node}:{i}"] = {
+            "node": node,
+            "id": i,
+            "action": action,
+            "description": f"requests[1], indices[logs-{i:05d}]",
+            "start_time_in_millis": 1700000000000 + i,
+            "running_time_in_nanos": running,
+            "cancellable": True,
+            "children": [
+                {
+                    "node": f"node-{(i + c) % nodes:02d}",
+                    "id": parents + i * children + c,
+                    "action": action + "[s]",
+                    "running_time_in_nanos": rng.randint(1, running),
+                    "parent_task_id": f"{node}:{i}",
+                }
+                for c in range(children)
+            ],
+        }
+    return result
+
+
+def cat_recovery(rng: random.Random, count: int = 300) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        total = rng.randint(1, 50) * 1024 ** 3
+        recovered = rng.randint(0, total)
+        rows.append({
+            "index": f"logs-{i:05d}",
+            "shard": str(i % 5),
+            "time": str(rng.randint(1, 600) * 1000),
+            "type": "peer",
+            "stage": "index",
+            "files_percent": f"{rng.uniform(0, 100):.1f}%",
+            "bytes_percent": f"{recovered / total * 100:.1f}%",
+            "bytes_total": str(total),
+            "bytes_recovered": str(recovered),
+        })
+    return rows
+
+
+def tasks(rng: random.Random, count: int = 2000, nodes: int = 60) -> Dict[str, Any]:
+    actions = ["indices:data/read/search", "indices:data/write/bulk", "indices:data/write/reindex"]
+    result: Dict[str, Any] = {"nodes": {}}
+    for i in range(count):
+        node = f"node-{i % nodes:02d}"
+        task = {
+            "node": node,
+            "action": rng.choice(actions),
+            "start_time_in_millis": 1700000000000 + i,
+            "running_time_in_nanos": rng.randint(1, 10 ** 11),
+        }
+        if i % 3:
+            task["parent_task_id"] = f"{node}:{i - 1}"
+        result["nodes"].setdefault(node, {"tasks": {}})["tasks"][f"{node}:{i}"] = task
+    return result
+
+
+def cluster_stats(nodes: int = 60) -> Dict[str, Any]:
+    return {
+        "_nodes": {"total": nodes, "successful": nodes, "failed": 0},
+        "cluster_name": "bench",
+        "status": "green",
+        "indices": {"count": 5000, "shards": {"total": 50000}, "docs": {"count": 12_345_678_901}},
+        "nodes": {"count": {"total": nodes}, "versions": ["2.11.0"]},
+    }
+
+
+def ism_policies(count: int = 200) -> Dict[str, Any]:
+    return {
+        "policies": [
+            {
+                "_id": f"policy-{i}",
+                "policy": {
+                    "policy_id": f"policy-{i}",
+                    "description": "hot-warm-delete",
+                    "states": [
+                        {"name": "hot", "actions": [{"rollover": {"min_size": "50gb"}}], "transitions": [{"state_name": "delete", "conditions": {"min_index_age": "30d"}}]},
+                        {"name": "delete", "actions": [{"delete": {}}], "transitions": []},
+                    ],
+                    "ism_template": [{"index_patterns": [f"logs-{i}-*"]}],
+                },
+            }
+            for i in range(count)
+        ],
+        "total_policies": count,
+    }
+
+
+def index_templates(count: int = 200) -> Dict[str, Any]:
+    return {
+        "index_templates": [
+            {
+                "name": f"template-{i}",
+                "index_template": {
+                    "index_patterns": [f"logs-{i}-*"],
+                    "template": {"settings": {"index": {"number_of_shards": "5", "number_of_replicas": "1"}}},
+                },
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def index_patterns(count: int = 200) -> Dict[str, Any]:
+    return {
+        "hits": {
+            "hits": [
+                {"_id": f"index-pattern:{i}", "_source": {"index-pattern": {"title": f"logs-{i}-*"}}}
+                for i in range(count)
+            ]
+        }
+    }
+
+
+def bulk_ndjson(rng: random.Random, docs: int = 10000) -> str:
+    return "\n".join(json.dumps(hit["_source"]) for hit in hits(rng, docs))
+
+
+def _tasks_route(flat: bytes, grouped: bytes):
+    def route(method: str, path: str, query: str, body: bytes):
+        return grouped if "group_by=parents" in query else flat
+    return route
+
+
+def _bytes_route(human: bytes, in_bytes: bytes):
+    def route(method: str, path: str, query: str, body: bytes):
+        return in_bytes if "bytes=b" in query else human
+    return route
+
+
+def _encoded(payload: Any) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def routes(seed: int = 0, hits_count: int = 10000) -> Dict[str, Any]:
+    """Build the route table; large payloads are encoded once up front."""
+    rng = random.Random(seed)
+    aggs = _encoded(aggregation_response(rng))
+    profile = _encoded(profile_response(rng))
+    pages: Dict[int, bytes] = {}
+    capacity = {key: _encoded(value) for key, value in capacity_payloads(random.Random(seed + 1)).items()}
+
+    def page(size: int) -> bytes:
+        if size not in pages:
+            pages[size] = _encoded(dict(search_response(random.Random(seed), size), pit_id="bench-pit"))
+        return pages[size]
+
+    page(hits_count)
+
+    def index_search(method: str, path: str, query: str, body: bytes):
+        request = json.loads(body or b"{}")
+        if request.get("profile"):
+            return profile
+        if request.get("size") == 0:
+            return aggs
+        return page(min(request.get("size", 10), hits_count))
+
+    def pit_search(method: str, path: str, query: str, body: bytes):
+        # One full page, then an empty page once search_after is set
+        request = json.loads(body or b"{}")
+        size = request.get("size", 10)
+        if "search_after" in request:
+            return {"pit_id": "bench-pit", "hits": {"hits": []}}
+        return page(min(size, hits_count))
+
+    def msearch(method: str, path: str, query: str, body: bytes):
+        searches = len([line for line in body.splitlines() if line.strip()]) // 2
+        page = search_response(random.Random(seed), 100)
+        return {"took": 10, "responses": [dict(page, status=200) for _ in range(searches)]}
+
+    def bulk(method: str, path: str, query: str, body: bytes):
+        lines = [line for line in body.splitlines() if line.strip()]
+        items = []
+        for action in lines[::2]:
+            op = next(iter(json.loads(action)))
+            items.append({op: {"_index": INDEX, "_id": str(len(items)), "status": 201, "result": "created"}})
+        return {"took": 5, "errors": False, "items": items}
+
+    return {
+        "/_cat/indices": _bytes_route(_encoded(cat_indices(rng)), capacity["indices"]),
+        "/_cat/segments": capacity["segments"],
+        "/_stats": capacity["stats"],
+        "/_settings": capacity["settings"],
+        "/_cat/shards": _encoded(cat_shards(rng)),
+        "/_tasks": _tasks_route(_encoded(tasks(rng)), _encoded(grouped_tasks(rng))),
+        "/_cat/recovery": _encoded(cat_recovery(rng)),
+        "/_nodes/hot_threads": hot_threads(rng),
+        "/_cluster/stats": cluster_stats(),
+        "/_cluster/state/metadata": {"metadata": {"indices": {INDEX: {"mapping_version": 1, "settings_version": 1}}}},
+        f"/{INDEX}/_mapping": _encoded(mapping(rng)),
+        f"/{INDEX}/_mapping/field": {INDEX: {"mappings": {"field_1": {"full_name": "field_1", "mapping": {"field_1": {"type": "keyword"}}}}}},
+        f"/{INDEX}/_settings": settings(),
+        f"/{INDEX}/_search": index_search,
+        f"/{INDEX}/_search/point_in_time": {"pit_id": "bench-pit"},
+        "/_search/point_in_time": {"succeeded": True},
+        "/_search": pit_search,
+        f"/{INDEX}/_validate/query": {"valid": True, "explanations": [{"index": INDEX, "valid": True, "explanation": "+status:500 #*:*"}]},
+        f"/{INDEX}/_count": {"count": 12345},
+        f"/{INDEX}/_msearch": msearch,
+        "/_msearch": msearch,
+        f"/{INDEX}/_bulk": bulk,
+        "/_bulk": bulk,
+        "/.kibana/_search": _encoded(index_patterns()),
+        "/_plugins/_ism/policies": _encoded(ism_policies()),
+        "/_index_template": _encoded(index_templates()),
+    }
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: time and output size for large tool payloads.
+
+Compares the previous encodings (Python repr via str(), json.dumps with
+indent) against the shared serializer on a synthetic cluster.stats
+document, a 10k-hit search response and a large _cat/indices table.
+
+Usage:
+    python benchmarks/serialization.py [--hits 10000] [--rounds 5]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from opensearch_mcp_server import serialization
+from opensearch_mcp_server.serialization import serialize
+from opensearch_mcp_server.tools.document import format_search_response
+
+
+def cluster_stats_payload(nodes: int = 200) -> dict:
+    return {
+        "_nodes": {"total": nodes, "successful": nodes, "failed": 0},
+        "cluster_name": "bench",
+        "status": "green",
+        "indices": {
+            "count": 5000,
+            "shards": {"total": 30000, "primaries": 15000, "replication": 1.0},
+            "docs": {"count": 12_345_678_901, "deleted": 1234},
+            "store": {"size_in_bytes": 98_765_432_109_876},
+            "fielddata": {"memory_size_in_bytes": 0, "evictions": 0},
+            "segments": {"count": 450_000, "memory_in_bytes": 123_456_789},
+        },
+        "nodes": {
+            "count": {"total": nodes, "data": nodes - 3, "cluster_manager": 3},
+            "versions": ["2.11.0"],
+            "os": {"available_processors": nodes * 16, "names": [{"name": "Linux", "count": nodes}]},
+            "jvm": {"versions": [{"version": "17.0.8", "count": nodes}], "mem": {"heap_used_in_bytes": 1 << 40}},
+            "plugins": [
+                {"name": f"plugin-{i}", "version": "2.11.0", "description": "x" * 80, "classname": f"org.opensearch.plugin{i}"}
+                for i in range(40)
+            ],
+            "node_details": [
+                {"name": f"node-{i}", "roles": ["data", "ingest"], "heap_percent": random.randint(10, 90)}
+                for i in range(nodes)
+            ],
+        },
+    }
+
+
+def search_payload(hits: int) -> dict:
+    return {
+        "took": 42,
+        "hits": {
+            "total": {"value": hits, "relation": "eq"},
+            "max_score": 1.0,
+            "hits": [
+                {
+                    "_index": "logs-2024.01.01",
+                    "_id": f"doc-{i}",
+                    "_score": 1.0,
+                    "_source": {
+                        "@timestamp": "2024-01-01T00:00:00Z",
+                        "host": {"name": f"host-{i % 50}", "ip": "10.0.0.1"},
+                        "message": f"request {i} completed in {random.randint(1, 900)}ms",
+                        "status": random.choice([200, 201, 404, 500]),
+                        "tags": ["web", "prod"],
+                    },
+                }
+                for i in range(hits)
+            ],
+        },
+    }
+
+
+def cat_indices_payload(rows: int = 5000) -> list:
+    return [
+        {
+            "health": "green", "status": "open", "index": f"logs-{i:05d}", "uuid": f"uuid-{i:05d}",
+            "pri": "1", "rep": "1", "docs.count": str(i * 1000), "docs.deleted": "0",
+            "store.size": f"{i}mb", "pri.store.size": f"{i // 2}mb",
+        }
+        for i in range(rows)
+    ]
+
+
+def measure(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(out.encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hits", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson available: {serialization.orjson is not None}")
+    payloads = {
+        "cluster.stats": cluster_stats_payload(),
+        f"search ({args.hits} hits)": format_search_response(search_payload(args.hits)),
+        "_cat/indices (5000 rows)": cat_indices_payload(),
+    }
+    encoders = {
+        "str() repr": str,
+        "json indent=2": lambda d: json.dumps(d, indent=2),
+        "compact json": lambda d: serialize(d, "json", max_bytes=0),
+        "table": lambda d: serialize(d, "table", max_bytes=0),
+        "json, 256KB budget": lambda d: serialize(d, "json", max_bytes=256 * 1024),
+    }
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        for label, encode in encoders.items():
+            ms, size = measure(lambda: encode(payload), args.rounds)
+            print(f"  {label:<20} {ms:9.2f} ms  {size / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long a freshly spawned server takes to answer the MCP handshake.
+
+Usage:
+    python benchmarks/startup.py [--rounds 10]
+
+Every round starts a new interpreter, as an MCP host does. Measured:
+
+    import      importing the server module
+    construct   building the server and registering every tool
+    handshake   spawning the `opensearch-mcp-server` entry point until it has
+                answered `initialize` and `tools/list` over stdio
+
+No cluster and no credentials are needed: nothing connects before the first
+tool call. The import run also reports whether opensearch-py was loaded.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from opensearch_mcp_server.server import OpensearchMCPServer
+imported = time.perf_counter()
+OpensearchMCPServer()
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "construct": done - imported,
+                  "opensearchpy_loaded": "opensearchpy" in sys.modules}))
+"""
+
+SERVER_COMMAND = [sys.executable, "-c", "from opensearch_mcp_server import main; main()"]
+
+INITIALIZE = {
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {"protocolVersion": "2024-11-05", "capabilities": {},
+               "clientInfo": {"name": "startup-benchmark", "version": "0"}},
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+LIST_TOOLS = {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}
+
+
+def clean_env() -> dict:
+    """Environment without any OpenSearch credentials."""
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("OPENSEARCH_", "DASHBOARDS_"))}
+    env["OPENSEARCH_HOST"] = "http://127.0.0.1:9"
+    return env
+
+
+def read_response(process: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited: {process.stderr.read()[-2000:]}")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def handshake(env: dict) -> dict:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        SERVER_COMMAND, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE) + "\n")
+        process.stdin.flush()
+        read_response(process, 1)
+        initialized = time.perf_counter()
+        process.stdin.write(json.dumps(INITIALIZED) + "\n" + json.dumps(LIST_TOOLS) + "\n")
+        process.stdin.flush()
+        tools = read_response(process, 2)["result"]["tools"]
+        listed = time.perf_counter()
+    finally:
+        process.stdin.close()
+        process.wait(timeout=10)
+    return {"initialize": initialized - start, "tools_list": listed - start, "tools": len(tools)}
+
+
+def median_ms(samples: list, key: str) -> float:
+    return round(statistics.median(s[key] for s in samples) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    env = clean_env()
+    imports = []
+    handshakes = []
+    for _ in range(args.rounds):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True, env=env)
+        imports.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        handshakes.append(handshake(env))
+
+    print(f"rounds                     {args.rounds}")
+    print(f"import                     {median_ms(imports, 'import'):8.2f} ms")
+    print(f"construct                  {median_ms(imports, 'construct'):8.2f} ms")
+    print(f"spawn to initialize        {median_ms(handshakes, 'initialize'):8.2f} ms")
+    print(f"spawn to tools/list        {median_ms(handshakes, 'tools_list'):8.2f} ms  ({handshakes[-1]['tools']} tools)")
+    print(f"opensearch-py loaded       {any(s['opensearchpy_loaded'] for s in imports)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: every MCP tool against a local OpenSearch stand-in.
+
+Serves deterministic synthetic payloads (a 50k-row _cat/shards, 10k-hit
+searches, a 5000-field mapping, long hot_threads output...) from a local
+fake server and measures, for the current tree:
+
+    startup      import and server construction time, in fresh interpreters
+    clients      one shared client versus one client per tool class: time to
+                 build the clients and send a first request from each, and
+                 the connections the cluster sees
+    tools        per-call latency (p50/p95/mean), response bytes, requests
+                 sent to the cluster and peak Python memory of one call
+    concurrency  throughput of parallel calls for a few representative tools
+    process      peak resident memory of the whole run
+
+Tools are called through FastMCP exactly as a client would. The response
+cache is disabled so every call does its full work. Results are written as
+JSON keyed by commit; pass --compare to print the change against an
+earlier result file.
+
+Usage:
+    python benchmarks/suite.py [--rounds 5] [--concurrency 32] [--output results.json]
+    python benchmarks/suite.py --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_opensearch import FakeOpenSearch
+import payloads
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+STARTUP_SNIPPET = """
+import json, time
+start = time.perf_counter()
+from opensearch_mcp_server.server import OpensearchMCPServer
+imported = time.perf_counter()
+OpensearchMCPServer()
+built = time.perf_counter()
+print(json.dumps({"import": imported - start, "construct": built - imported}))
+"""
+
+# Tools run under concurrent load in the throughput phase
+CONCURRENCY_SCENARIOS = ("get_cluster_health", "get_cluster_stats", "get_hot_threads", "get_mapping", "search_documents[100]")
+
+
+def scenarios(tmpdir: str) -> list:
+    """(label, tool, arguments) for every benchmarked call."""
+    docs = payloads.bulk_ndjson(random.Random(0), docs=10000)
+    index = payloads.INDEX
+    return [
+        ("list_indices", "list_indices", {}),
+        ("get_mapping", "get_mapping", {"index": index}),
+        ("get_mapping[fields]", "get_mapping", {"index": index, "fields": ["field_1"]}),
+        ("get_settings", "get_settings", {"index": index}),
+        ("search_documents", "search_documents", {"index": index, "body": {"size": 10000}}),
+        ("search_documents[100]", "search_documents", {"index": index, "body": {"size": 100}}),
+        ("search_documents[paged]", "search_documents", {"index": index, "body": {}, "page_size": 1000}),
+        ("multi_search", "multi_search", {"searches": [{"index": index, "body": {"size": 100}}] * 10}),
+        ("estimate_query_cost", "estimate_query_cost", {"index": index, "body": {"query": {"match": {"status": 500}}}}),
+        ("profile_search", "profile_search", {"index": index, "body": {
+            "query": {"bool": {"must": [{"term": {"field_1": "x"}}, {"range": {"field_2": {"gte": "now-1h"}}}]}},
+        }}),
+        ("bulk_index", "bulk_index", {"index": index, "ndjson": docs}),
+        ("export_documents_to_file", "export_documents_to_file", {
+            "index": index, "body": {}, "path": os.path.join(tmpdir, "export.ndjson"), "page_size": 5000,
+        }),
+        ("aggregate", "aggregate", {
+            "index": index,
+            "aggs": {"by_host": {"terms": {"field": "host", "size": 2000},
+                                 "aggs": {"latency": {"avg": {"field": "took"}},
+                                          "by_status": {"terms": {"field": "status"}}}}},
+        }),
+        ("get_cluster_health", "get_cluster_health", {}),
+        ("get_cluster_stats", "get_cluster_stats", {}),
+        ("get_cluster_changes", "get_cluster_changes", {}),
+        ("list_index_patterns", "list_index_patterns", {}),
+        ("generate_discover_url", "generate_discover_url", {
+            "query": "status:500", "index_pattern_id": "logs", "from_time": "now-1h", "to_time": "now",
+        }),
+        ("get_cache_stats", "get_cache_stats", {}),
+        ("invalidate_cache", "invalidate_cache", {}),
+        ("get_server_metrics", "get_server_metrics", {}),
+        ("list_clusters", "list_clusters", {}),
+        ("get_cluster_health_all", "get_cluster_health_all", {}),
+        ("list_indices_all", "list_indices_all", {}),
+        ("get_ism_policies", "get_ism_policies", {}),
+        ("get_index_templates", "get_index_templates", {}),
+        ("get_shard_allocation", "get_shard_allocation", {}),
+        ("get_shard_allocation[rows]", "get_shard_allocation", {"include_rows": True, "page_size": 1000}),
+        # The fake cluster's counters never move; sampling would only add the sleep
+        ("analyze_index_health", "analyze_index_health", {"sample_seconds": 0}),
+        ("get_hot_threads", "get_hot_threads", {}),
+        ("get_tasks", "get_tasks", {}),
+        ("get_recovery_status", "get_recovery_status", {}),
+    ]
+
+
+def git_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "src"))}
+
+
+def measure_startup(rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        out = subprocess.run([sys.executable, "-c", STARTUP_SNIPPET], capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "rounds": rounds,
+        "import_ms": round(statistics.median(s["import"] for s in samples) * 1000, 2),
+        "construct_ms": round(statistics.median(s["construct"] for s in samples) * 1000, 2),
+        "total_ms": round(statistics.median(s["import"] + s["construct"] for s in samples) * 1000, 2),
+    }
+
+
+def measure_client_sharing(fake, rounds: int) -> dict:
+    """Every tool class building its own client, as before clients were shared, against the shared client."""
+    from opensearch_mcp_server.es_client import (
+        OpensearchClient, close_opensearch_client, create_opensearch_client, get_es_config, get_opensearch_client,
+    )
+    from opensearch_mcp_server import server  # noqa: F401  imports every tool class
+
+    logger = logging.getLogger("benchmark")
+    tool_classes = len(OpensearchClient.__subclasses__())
+
+    def per_class():
+        clients = [create_opensearch_client(get_es_config(logger)) for _ in range(tool_classes)]
+        for client in clients:
+            client.cluster.health()
+        for client in clients:
+            client.close()
+
+    def shared():
+        for _ in range(tool_classes):
+            get_opensearch_client(logger).cluster.health()
+        close_opensearch_client()
+
+    results = {"tool_classes": tool_classes}
+    for label, fn in (("per_class", per_class), ("shared", shared)):
+        close_opensearch_client()
+        samples = []
+        before = fake.connections
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        results[label] = {"ms": round(statistics.median(samples) * 1000, 3),
+                          "connections": (fake.connections - before) / rounds}
+    return results
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+    }
+
+
+async def call(server, tool: str, args: dict) -> str:
+    result = await server.mcp.call_tool(tool, args)
+    return "".join(getattr(item, "text", "") for item in result)
+
+
+async def measure_tools(server, fake, cases: list, rounds: int) -> dict:
+    results = {}
+    for label, tool, args in cases:
+        text = await call(server, tool, args)  # warm-up
+        if text.startswith("Error"):
+            results[label] = {"tool": tool, "error": text[:200]}
+            continue
+        before = fake.requests
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            text = await call(server, tool, args)
+            samples.append(time.perf_counter() - start)
+        requests = (fake.requests - before) / rounds
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        await call(server, tool, args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[label] = {
+            "tool": tool,
+            **summarize(samples),
+            "response_bytes": len(text.encode("utf-8")),
+            "requests": requests,
+            "peak_kib": round(peak / 1024, 1),
+        }
+    return results
+
+
+async def measure_concurrency(server, cases: list, concurrency: int) -> dict:
+    results = {}
+    for label, tool, args in cases:
+        if label not in CONCURRENCY_SCENARIOS:
+            continue
+        await asyncio.gather(*(call(server, tool, args) for _ in range(concurrency)))  # warm the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(call(server, tool, args) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        results[label] = {"calls": concurrency, "seconds": round(elapsed, 4), "calls_per_second": round(concurrency / elapsed, 1)}
+    return results
+
+
+def compare(current: dict, baseline: dict):
+    print(f"\nComparison against {baseline['meta'].get('commit')} (ratio < 1 is faster/smaller)")
+    print(f"{'scenario':<28} {'p50 base':>10} {'p50 now':>10} {'ratio':>7} {'bytes ratio':>12}")
+    for label, now in current["tools"].items():
+        base = baseline.get("tools", {}).get(label)
+        if not base or "p50_ms" not in base or "p50_ms" not in now:
+            continue
+        ratio = now["p50_ms"] / base["p50_ms"] if base["p50_ms"] else float("nan")
+        size = now["response_bytes"] / base["response_bytes"] if base["response_bytes"] else float("nan")
+        print(f"{label:<28} {base['p50_ms']:>10.2f} {now['p50_ms']:>10.2f} {ratio:>7.2f} {size:>12.2f}")
+    base_startup = baseline.get("startup", {}).get("total_ms")
+    if base_startup:
+        print(f"{'startup':<28} {base_startup:>10.2f} {current['startup']['total_ms']:>10.2f} "
+              f"{current['startup']['total_ms'] / base_startup:>7.2f}")
+    base_shared = baseline.get("clients", {}).get("shared", {}).get("ms")
+    if base_shared:
+        now_shared = current["clients"]["shared"]["ms"]
+        print(f"{'shared client':<28} {base_shared:>10.2f} {now_shared:>10.2f} {now_shared / base_shared:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="measured calls per tool")
+    parser.add_argument("--startup-rounds", type=int, default=5, help="fresh interpreters timed for startup")
+    parser.add_argument("--concurrency", type=int, default=32, help="parallel calls in the throughput phase")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server latency in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic payloads")
+    parser.add_argument("--output", help="result file, defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    meta = {
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+    }
+
+    with FakeOpenSearch(latency=args.latency, routes=payloads.routes(seed=args.seed)) as fake, \
+            tempfile.TemporaryDirectory() as tmpdir:
+        os.environ.update({
+            "OPENSEARCH_HOST": fake.url,
+            "OPENSEARCH_USERNAME": "admin",
+            "OPENSEARCH_PASSWORD": "admin",
+            "DASHBOARDS_HOST": "http://localhost:5601",
+            "OPENSEARCH_CACHE_ENABLED": "false",
+            "OPENSEARCH_TRACE": "false",
+            "OPENSEARCH_POOL_MAXSIZE": str(max(10, args.concurrency)),
+            # Keep the large-payload scenarios comparable across runs; the guard still checks every body
+            "OPENSEARCH_GUARD_MAX_SIZE": "10000",
+            "OPENSEARCH_GUARD_MAX_BUCKETS": "65535",
+        })
+        startup = measure_startup(args.startup_rounds)
+        clients = measure_client_sharing(fake, args.rounds)
+
+        from opensearch_mcp_server.es_client import close_opensearch_client
+        from opensearch_mcp_server.server import OpensearchMCPServer
+        from opensearch_mcp_server.watcher import stop_cluster_watcher
+
+        server = OpensearchMCPServer()
+        cases = scenarios(tmpdir)
+
+        async def run():
+            registered = {tool.name for tool in await server.mcp.list_tools()}
+            tools = await measure_tools(server, fake, cases, args.rounds)
+            concurrency = await measure_concurrency(server, cases, args.concurrency)
+            return registered, tools, concurrency
+
+        try:
+            registered, tools, concurrency = asyncio.run(run())
+        finally:
+            stop_cluster_watcher()
+            close_opensearch_client()
+
+    uncovered = sorted(registered - {tool for _, tool, _ in cases})
+    results = {
+        "meta": meta,
+        "startup": startup,
+        "clients": clients,
+        "tools": tools,
+        "concurrency": concurrency,
+        "process": {"max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss},
+        "uncovered_tools": uncovered,
+    }
+
+    print(f"startup: import {startup['import_ms']}ms, construct {startup['construct_ms']}ms")
+    print(f"clients ({clients['tool_classes']} tool classes): "
+          f"per-class {clients['per_class']['ms']}ms/{clients['per_class']['connections']:.0f} connections, "
+          f"shared {clients['shared']['ms']}ms/{clients['shared']['connections']:.0f} connections")
+    print(f"{'scenario':<28} {'p50 ms':>10} {'p95 ms':>10} {'bytes':>10} {'reqs':>6} {'peak KiB':>10}")
+    for label, row in tools.items():
+        if "error" in row:
+            print(f"{label:<28} ERROR {row['error']}")
+            continue
+        print(f"{label:<28} {row['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} {row['response_bytes']:>10} "
+              f"{row['requests']:>6.1f} {row['peak_kib']:>10.1f}")
+    for label, row in concurrency.items():
+        print(f"concurrency {label:<28} {row['calls_per_second']:>8.1f} calls/s")
+    if uncovered:
+        print(f"WARNING: no benchmark scenario for {', '.join(uncovered)}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{meta['commit'] or 'unknown'}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
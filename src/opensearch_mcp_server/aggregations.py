@@ -0,0 +1,113 @@
+"""
+Flattening of aggregation results into compact rows.
+
+Each path from the root to a leaf bucket becomes one row: a column per
+bucket aggregation holding the bucket key, the leaf `doc_count`, and a
+column per metric (`name` for single-value metrics, `name.stat` for
+multi-value metrics such as stats or percentiles).
+"""
+from typing import Any, Dict, Iterator, List, Optional
+
+# Response keys that describe the bucket itself rather than a sub-aggregation
+_BUCKET_KEYS = {
+    "key", "key_as_string", "doc_count", "doc_count_error_upper_bound", "sum_other_doc_count",
+    "meta", "after_key", "from", "from_as_string", "to", "to_as_string", "bg_count", "score",
+}
+
+
+def _bucket_key(bucket: Dict[str, Any]) -> Any:
+    return bucket.get("key_as_string", bucket.get("key"))
+
+
+def _iter_buckets(buckets: Any) -> Iterator[Dict[str, Any]]:
+    # Keyed bucket aggregations (filters, keyed ranges) return a dict instead of a list
+    if isinstance(buckets, dict):
+        for key, bucket in buckets.items():
+            yield dict(bucket, key=key)
+    else:
+        yield from buckets
+
+
+def _metric_columns(name: str, value: Dict[str, Any]) -> Dict[str, Any]:
+    if "value" in value:
+        return {name: value.get("value_as_string", value["value"])}
+    if "values" in value:
+        values = value["values"]
+        if isinstance(values, list):
+            return {f"{name}.{v.get('key')}": v.get("value") for v in values}
+        return {f"{name}.{k}": v for k, v in values.items() if not k.endswith("_as_string")}
+    return {
+        f"{name}.{k}": v for k, v in value.items()
+        if not isinstance(v, (dict, list)) and not k.endswith("_as_string") and k != "meta"
+    }
+
+
+def flatten_aggregations(node: Dict[str, Any], row: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Flatten an `aggregations` response object (or a bucket) into a list of rows."""
+    row = dict(row or {})
+    # Each bucket aggregation fans out into its own set of rows
+    branches = []
+    for name, value in node.items():
+        if name in _BUCKET_KEYS or not isinstance(value, dict):
+            continue
+        if "buckets" in value:
+            bucket_rows = _bucket_rows(name, value["buckets"])
+            # An empty bucket list keeps the parent row instead of dropping it
+            if bucket_rows:
+                branches.append(bucket_rows)
+        elif "doc_count" in value:
+            # Single-bucket aggregations (filter, nested, missing, global...)
+            row[f"{name}.doc_count"] = value["doc_count"]
+            sub_rows = [{f"{name}.{k}": v for k, v in sub.items()} for sub in flatten_aggregations(value)]
+            if len(sub_rows) == 1:
+                row.update(sub_rows[0])
+            else:
+                branches.append(sub_rows)
+        else:
+            row.update(_metric_columns(name, value))
+
+    if not branches:
+        return [row]
+    return [dict(row, **partial) for branch in branches for partial in branch]
+
+
+def _bucket_rows(name: str, buckets: Any) -> List[Dict[str, Any]]:
+    rows = []
+    for bucket in _iter_buckets(buckets):
+        key = _bucket_key(bucket)
+        if isinstance(key, dict):
+            # Composite aggregation keys hold one value per source
+            bucket_row = {f"{name}.{k}": v for k, v in key.items()}
+        else:
+            bucket_row = {name: key}
+        bucket_row["doc_count"] = bucket.get("doc_count")
+        rows.extend(flatten_aggregations(bucket, bucket_row))
+    return rows
+
+
+def resume_composite(aggs: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The top-level composite aggregations named in `after` (an after_key per aggregation, as
+    returned by a previous call), each set to continue after its key. The other aggregations
+    were complete on the earlier call and are left out.
+    """
+    resumed = {}
+    for name, after_key in after.items():
+        definition = aggs.get(name)
+        if not isinstance(definition, dict) or "composite" not in definition:
+            raise ValueError(f"after names '{name}', which is not a top-level composite aggregation")
+        resumed[name] = dict(definition, composite=dict(definition["composite"], after=after_key))
+    return resumed
+
+
+def composite_after_keys(aggs: Dict[str, Any], response_aggs: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the after_key of every top-level composite aggregation that has more pages."""
+    after_keys = {}
+    for name, definition in aggs.items():
+        if "composite" not in definition:
+            continue
+        result = response_aggs.get(name, {})
+        size = definition["composite"].get("size", 10)
+        if result.get("after_key") and len(result.get("buckets", [])) >= size:
+            after_keys[name] = result["after_key"]
+    return after_keys
@@ -0,0 +1,229 @@
+"""
+Chunked, parallel bulk indexing from NDJSON.
+
+Documents are read lazily, line by line, from a local file or an inline
+string and grouped into chunks bounded by document count and byte size.
+A bounded number of worker threads send the chunks through
+`helpers.streaming_bulk`, which retries 429 rejections with exponential
+backoff. At most two chunks per worker are held in memory at any time.
+"""
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# A line holding exactly one of these keys is bulk action metadata, as in the _bulk API format
+ACTION_TYPES = ("index", "create", "update", "delete")
+# Op types a plain document line can be sent with
+DOCUMENT_OP_TYPES = ("index", "create")
+
+MAX_ERROR_SAMPLES = 5
+
+
+def iter_ndjson(ndjson: Optional[str] = None, path: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield non-empty NDJSON lines with their 1-based line number, from an inline string or a
+    local file, without loading it whole.
+    """
+    if (ndjson is None) == (path is None):
+        raise ValueError("Provide exactly one of ndjson or path")
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield number, line
+    else:
+        for number, line in enumerate(ndjson.splitlines(), 1):
+            if line.strip():
+                yield number, line
+
+
+def _parse(number: int, line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON on line {number}: {e.msg} (column {e.colno})") from e
+
+
+def _action_type(doc: Any) -> Optional[str]:
+    if isinstance(doc, dict) and len(doc) == 1:
+        (key, meta), = doc.items()
+        if key in ACTION_TYPES and isinstance(meta, dict):
+            return key
+    return None
+
+
+def iter_actions(
+    lines: Iterable[Tuple[int, str]],
+    index: str,
+    op_type: str = "index",
+    id_field: Optional[str] = None,
+) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Turn numbered NDJSON lines into bulk helper actions, paired with their size in bytes.
+
+    Lines are plain documents, sent with `op_type` ("index" or "create"), or _bulk API pairs:
+    an action line with a single `index`, `create`, `update` or `delete` key holding its
+    metadata, followed by the document (or, for `update`, the partial `doc`/`script` body;
+    `delete` has none). An invalid op_type raises before any line is read.
+    """
+    if op_type not in DOCUMENT_OP_TYPES:
+        raise ValueError(f"Unknown op_type '{op_type}', expected one of {', '.join(DOCUMENT_OP_TYPES)}")
+    return _iter_actions(iter(lines), index, op_type, id_field)
+
+
+def _iter_actions(
+    lines: Iterator[Tuple[int, str]],
+    index: str,
+    op_type: str,
+    id_field: Optional[str],
+) -> Iterator[Tuple[Dict[str, Any], int]]:
+    for number, line in lines:
+        doc = _parse(number, line)
+        size = len(line.encode("utf-8"))
+        action_type = _action_type(doc)
+        if action_type is None:
+            if not isinstance(doc, dict):
+                raise ValueError(f"Line {number} is not a JSON object")
+            action = {"_op_type": op_type, "_index": index, "_source": doc}
+            if id_field and id_field in doc:
+                action["_id"] = doc[id_field]
+            yield action, size
+            continue
+
+        action = {"_op_type": action_type, "_index": index, **doc[action_type]}
+        if action_type != "delete":
+            source_number, source_line = next(lines, (None, None))
+            if source_line is None:
+                raise ValueError(f"Line {number}: {action_type} action has no document line after it")
+            body = _parse(source_number, source_line)
+            if not isinstance(body, dict):
+                raise ValueError(f"Line {source_number} is not a JSON object")
+            size += len(source_line.encode("utf-8"))
+            if action_type == "update":
+                action.update(body)
+            else:
+                action["_source"] = body
+        yield action, size
+
+
+def iter_chunks(
+    actions: Iterable[Tuple[Dict[str, Any], int]],
+    chunk_docs: int,
+    chunk_bytes: int,
+) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    """Group actions into chunks of at most `chunk_docs` documents and about `chunk_bytes` bytes."""
+    chunk, size = [], 0
+    for action, nbytes in actions:
+        if chunk and (len(chunk) >= chunk_docs or size + nbytes > chunk_bytes):
+            yield chunk, size
+            chunk, size = [], 0
+        chunk.append(action)
+        size += nbytes
+    if chunk:
+        yield chunk, size
+
+
+def _index_chunk(
+    client: Any,
+    number: int,
+    chunk: List[Dict[str, Any]],
+    nbytes: int,
+    max_retries: int,
+    initial_backoff: float,
+    max_backoff: float,
+) -> Dict[str, Any]:
+    from opensearchpy import helpers
+
+    start = time.perf_counter()
+    errors: Dict[str, Dict[str, Any]] = {}
+    failed = 0
+    for ok, item in helpers.streaming_bulk(
+        client,
+        chunk,
+        chunk_size=len(chunk),
+        max_chunk_bytes=max(nbytes * 2, 1024 * 1024),
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+        max_backoff=max_backoff,
+        raise_on_error=False,
+        raise_on_exception=False,
+        yield_ok=False,
+    ):
+        if ok:
+            continue
+        failed += 1
+        result = next(iter(item.values()))
+        error = result.get("error", {})
+        error_type = error.get("type", "unknown") if isinstance(error, dict) else str(error)
+        summary = errors.setdefault(error_type, {"count": 0, "status": result.get("status"), "samples": []})
+        summary["count"] += 1
+        if len(summary["samples"]) < MAX_ERROR_SAMPLES:
+            reason = error.get("reason") if isinstance(error, dict) else error
+            summary["samples"].append({"_id": result.get("_id"), "reason": reason})
+    return {
+        "chunk": number,
+        "docs": len(chunk),
+        "bytes": nbytes,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - start, 3),
+        "errors": errors,
+    }
+
+
+def bulk_load(
+    client: Any,
+    actions: Iterable[Tuple[Dict[str, Any], int]],
+    chunk_docs: int = 500,
+    chunk_bytes: int = 5 * 1024 * 1024,
+    workers: int = 4,
+    max_retries: int = 3,
+    initial_backoff: float = 2.0,
+    max_backoff: float = 60.0,
+) -> Dict[str, Any]:
+    """
+    Index `actions` with a synchronous client using `workers` parallel chunk senders.
+
+    Returns totals, throughput, per-chunk timings and errors grouped by type.
+    """
+    start = time.perf_counter()
+    chunks: List[Dict[str, Any]] = []
+    errors: Dict[str, Dict[str, Any]] = {}
+
+    def collect(future):
+        result = future.result()
+        chunks.append(result)
+        for error_type, summary in result.pop("errors").items():
+            total = errors.setdefault(error_type, {"count": 0, "status": summary["status"], "samples": []})
+            total["count"] += summary["count"]
+            total["samples"] = (total["samples"] + summary["samples"])[:MAX_ERROR_SAMPLES]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="opensearch-bulk") as executor:
+        pending = set()
+        for number, (chunk, nbytes) in enumerate(iter_chunks(actions, chunk_docs, chunk_bytes)):
+            # Backpressure: never read further ahead than two chunks per worker
+            while len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending.add(executor.submit(
+                _index_chunk, client, number, chunk, nbytes, max_retries, initial_backoff, max_backoff
+            ))
+        for future in wait(pending).done:
+            collect(future)
+
+    elapsed = time.perf_counter() - start
+    docs = sum(c["docs"] for c in chunks)
+    failed = sum(c["failed"] for c in chunks)
+    nbytes = sum(c["bytes"] for c in chunks)
+    return {
+        "docs": docs,
+        "indexed": docs - failed,
+        "failed": failed,
+        "bytes": nbytes,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(docs / elapsed, 1) if elapsed else None,
+        "mb_per_second": round(nbytes / 1024 / 1024 / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "chunks": sorted(chunks, key=lambda c: c["chunk"]),
+    }
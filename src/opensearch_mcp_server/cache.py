@@ -0,0 +1,211 @@
+"""
+Bounded in-process cache for slow-changing tool responses.
+
+Entries hold the serialized tool output and are evicted by per-tool TTL,
+least-recent use once the byte budget is exceeded, an explicit invalidate
+call, or when the index fingerprint (UUID, metadata, mapping and
+settings versions) recorded with the entry no longer matches the cluster.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Any, Dict, Optional
+
+from .env import env_bool, env_float, env_int
+
+# Default time-to-live in seconds per cached tool. 0 disables caching for that tool.
+DEFAULT_TTLS = {
+    "get_mapping": 300.0,
+    "get_settings": 300.0,
+    # Listings over every index carry no fingerprint, so they expire quickly instead
+    "list_indices": 5.0,
+    "list_index_patterns": 300.0,
+}
+
+# How long a fetched index fingerprint is trusted before it is re-read. Short, so a mapping or
+# settings change is noticed within seconds, but long enough that a burst of hits shares one
+# (filtered) cluster-state read.
+DEFAULT_FINGERPRINT_TTL = 5.0
+
+# Index patterns that cover every index; fingerprinting them would read the metadata of the
+# whole cluster, so their entries rely on the TTL alone
+UNSCOPED_INDICES = ("*", "_all")
+
+FINGERPRINT_FILTER_PATH = ",".join([
+    "metadata.indices.*.version",
+    "metadata.indices.*.mapping_version",
+    "metadata.indices.*.settings_version",
+    "metadata.indices.*.settings.index.uuid",
+])
+
+
+@dataclass
+class _Entry:
+    value: str
+    size: int
+    expires_at: float
+    tool: str
+    index: Optional[str]
+    fingerprint: Optional[str]
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, ttls: Dict[str, float], fingerprint_ttl: float = DEFAULT_FINGERPRINT_TTL):
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.fingerprint_ttl = fingerprint_ttl
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._fingerprints: Dict[tuple, tuple] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._per_tool: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(tool: str, **args: Any) -> tuple:
+        """Build a cache key from the tool name and its normalized arguments."""
+        return (tool, json.dumps(args, sort_keys=True, default=str))
+
+    def ttl(self, tool: str) -> float:
+        return self.ttls.get(tool, 0.0)
+
+    def _count(self, tool: str, counter: str):
+        self._counters[counter] += 1
+        per_tool = self._per_tool.setdefault(tool, {"hits": 0, "misses": 0})
+        if counter in per_tool:
+            per_tool[counter] += 1
+
+    def _drop(self, key: tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: tuple, fingerprint: Optional[str] = None) -> Optional[str]:
+        """Return the cached value, or None if missing, expired or stale."""
+        tool = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count(tool, "misses")
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self._count(tool, "expirations")
+                self._count(tool, "misses")
+                return None
+            if entry.fingerprint != fingerprint:
+                self._drop(key)
+                self._count(tool, "invalidations")
+                self._count(tool, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count(tool, "hits")
+            return entry.value
+
+    def put(self, key: tuple, value: str, index: Optional[str] = None, fingerprint: Optional[str] = None):
+        tool = key[0]
+        ttl = self.ttl(tool)
+        size = len(value.encode("utf-8"))
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + ttl, tool, index, fingerprint)
+            self._bytes += size
+            # Evict least recently used entries until the byte budget is met
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, tool: Optional[str] = None, index: Optional[str] = None) -> int:
+        """
+        Drop entries matching the tool name and/or index pattern; everything if neither is given.
+        Returns the number of entries removed.
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if (tool is None or entry.tool == tool)
+                and (index is None or (entry.index is not None and fnmatch(entry.index, index)))
+            ]
+            for key in keys:
+                self._drop(key)
+            if index is None:
+                self._fingerprints.clear()
+            else:
+                for scope in [scope for scope in self._fingerprints if fnmatch(scope[1], index)]:
+                    del self._fingerprints[scope]
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def cached_fingerprint(self, index: str, cluster: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            cached = self._fingerprints.get((cluster, index))
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+            return None
+
+    def store_fingerprint(self, index: str, fingerprint: str, cluster: Optional[str] = None):
+        """Remember a fingerprint for the fingerprint TTL."""
+        with self._lock:
+            self._fingerprints[(cluster, index)] = (fingerprint, time.monotonic() + self.fingerprint_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttls": dict(self.ttls),
+                "per_tool": {tool: dict(counts) for tool, counts in self._per_tool.items()},
+            }
+
+
+def fingerprint_from_metadata(response: Dict[str, Any]) -> str:
+    """Reduce filtered cluster-state metadata to a short, stable digest."""
+    indices = (response or {}).get("metadata", {}).get("indices", {})
+    parts = []
+    for name in sorted(indices):
+        meta = indices[name]
+        index_settings = meta.get("settings", {}).get("index", {})
+        parts.append([
+            name,
+            index_settings.get("uuid"),
+            meta.get("version"),
+            meta.get("mapping_version"),
+            meta.get("settings_version"),
+        ])
+    return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None if OPENSEARCH_CACHE_ENABLED=false."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if not env_bool("OPENSEARCH_CACHE_ENABLED", True):
+                    _cache = False
+                else:
+                    ttls = {
+                        tool: env_float(f"OPENSEARCH_CACHE_TTL_{tool.upper()}", default)
+                        for tool, default in DEFAULT_TTLS.items()
+                    }
+                    _cache = ResponseCache(
+                        max_bytes=env_int("OPENSEARCH_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+                        ttls=ttls,
+                        fingerprint_ttl=env_float("OPENSEARCH_CACHE_FINGERPRINT_TTL", DEFAULT_FINGERPRINT_TTL),
+                    )
+    return _cache or None
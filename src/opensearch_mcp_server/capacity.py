@@ -0,0 +1,239 @@
+"""
+Index and segment health analysis for merge, refresh and shard-size tuning.
+
+`analyze_capacity` joins, in one pass per response, the bulk responses of
+
+    _cat/indices    size, shard and replica counts and deleted documents
+    _cat/segments   segments and bytes of every primary shard
+    _stats          indexing activity and running merges per index, sampled
+                    twice so that only current writes count
+    _settings       refresh interval, write block and replica auto-expansion
+
+and ranks indices by what the usual maintenance actions would gain:
+
+    force_merge  read-only indices with many segments per shard or many
+                 deleted documents; gain is reclaimable bytes and segments
+    shrink       indices whose primary shards are far below the minimum
+                 size; gain is shard copies removed
+    rollover     indices with a primary shard above the maximum size;
+                 written indices should roll over, others be split
+
+An index is being written when indexing operations are in flight or its
+index_total grew between the two _stats samples; index_total alone only
+says it was written at some point.
+
+Refresh-interval and replica settings that are likely mistakes are listed
+as anomalies.
+"""
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+GB = 1024 ** 3
+
+INDEX_COLUMNS = "index,health,status,pri,rep,docs.count,docs.deleted,pri.store.size,store.size"
+SEGMENT_COLUMNS = "index,shard,prirep,size"
+STATS_METRICS = "indexing,merge"
+STATS_FILTER_PATH = ",".join(
+    f"indices.*.primaries.{field}"
+    for field in ("indexing.index_total", "indexing.index_current", "merges.current")
+)
+SETTINGS_FILTER_PATH = ",".join(
+    f"*.settings.index.{field}" for field in ("refresh_interval", "auto_expand_replicas", "blocks.write")
+)
+
+# Force-merge pays off once this share of documents is deleted
+DELETED_RATIO = 0.2
+# Refresh intervals below this create many tiny segments
+MIN_REFRESH_SECONDS = 1.0
+# Most severe anomalies are listed first
+ANOMALY_ORDER = ("health", "replicas", "refresh_interval")
+
+_DURATION = re.compile(r"^(-?\d+(?:\.\d+)?)(nanos|micros|ms|s|m|h|d)?$")
+_UNITS = {"nanos": 1e-9, "micros": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600, "d": 86400, None: 1e-3}
+
+
+def _number(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _gb(nbytes: float) -> float:
+    return round(nbytes / GB, 2)
+
+
+def duration_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds of an OpenSearch time value such as "500ms" or "30s"; -1 stays -1."""
+    match = _DURATION.match(str(value).strip()) if value is not None else None
+    if not match:
+        return None
+    amount = float(match.group(1))
+    return amount if amount < 0 else amount * _UNITS[match.group(2)]
+
+
+def _shrink_target(primaries: int, pri_bytes: int, target_bytes: int) -> int:
+    """Fewest shards, a factor of the current count as _shrink requires, that keep shards under the target."""
+    for shards in range(1, primaries + 1):
+        if primaries % shards == 0 and pri_bytes / shards <= target_bytes:
+            return shards
+    return primaries
+
+
+def _segments_per_shard(segments: List[Dict[str, Any]]) -> Dict[str, Dict[tuple, Dict[str, int]]]:
+    """Segment count and bytes of every primary shard, grouped by index."""
+    shards: Dict[str, Dict[tuple, Dict[str, int]]] = {}
+    for row in segments:
+        if row.get("prirep") != "p":
+            continue
+        shard = shards.setdefault(row.get("index"), {}).setdefault(row.get("shard"), {"segments": 0, "bytes": 0})
+        shard["segments"] += 1
+        shard["bytes"] += _number(row.get("size"))
+    return shards
+
+
+def _indexing(stats: Dict[str, Any], name: str) -> Dict[str, Any]:
+    return (((stats.get("indices") or {}).get(name) or {}).get("primaries") or {}).get("indexing") or {}
+
+
+def is_writing(name: str, stats: Dict[str, Any], earlier_stats: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether an index takes writes now: operations in flight or index_total grown since the earlier sample."""
+    indexing = _indexing(stats, name)
+    if _number(indexing.get("index_current")) > 0:
+        return True
+    if earlier_stats is None:
+        return False
+    return _number(indexing.get("index_total")) > _number(_indexing(earlier_stats, name).get("index_total"))
+
+
+def analyze_capacity(
+    indices: List[Dict[str, Any]],
+    segments: List[Dict[str, Any]],
+    stats: Dict[str, Any],
+    settings: Dict[str, Any],
+    data_nodes: int,
+    target_shard_gb: float = 30,
+    min_shard_gb: float = 1,
+    max_shard_gb: float = 50,
+    max_segments_per_shard: int = 30,
+    top: int = 20,
+    earlier_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Rank indices by force-merge, shrink and rollover gain and list settings anomalies.
+    `earlier_stats` is a _stats sample taken before `stats`; without it only in-flight
+    indexing marks an index as written.
+    """
+    target_bytes, min_bytes, max_bytes = target_shard_gb * GB, min_shard_gb * GB, max_shard_gb * GB
+    shards_by_index = _segments_per_shard(segments)
+    index_stats = stats.get("indices") or {}
+    force_merge, shrink, rollover, anomalies = [], [], [], []
+    totals = {"indices": 0, "primary_shards": 0, "primary_bytes": 0, "segments": 0,
+              "oversized_shards": 0, "tiny_shards": 0, "tiny_indices": 0}
+
+    for row in indices:
+        name = row.get("index")
+        if row.get("status") == "close":
+            continue
+        primaries = _number(row.get("pri")) or 1
+        replicas = _number(row.get("rep"))
+        copies = 1 + replicas
+        pri_bytes = _number(row.get("pri.store.size"))
+        docs, deleted = _number(row.get("docs.count")), _number(row.get("docs.deleted"))
+        shards = shards_by_index.get(name, {})
+        segment_count = sum(shard["segments"] for shard in shards.values())
+        most_segments = max((shard["segments"] for shard in shards.values()), default=0)
+        largest_shard = max((shard["bytes"] for shard in shards.values()), default=pri_bytes / primaries)
+        primary_stats = (index_stats.get(name) or {}).get("primaries") or {}
+        index_settings = ((settings.get(name) or {}).get("settings") or {}).get("index") or {}
+        write_blocked = str((index_settings.get("blocks") or {}).get("write")).lower() == "true"
+        writing = not write_blocked and is_writing(name, stats, earlier_stats)
+        merging = (primary_stats.get("merges") or {}).get("current", 0) > 0
+        avg_shard = pri_bytes / primaries
+
+        totals["indices"] += 1
+        totals["primary_shards"] += primaries
+        totals["primary_bytes"] += pri_bytes
+        totals["segments"] += segment_count
+        totals["oversized_shards"] += sum(shard["bytes"] > max_bytes for shard in shards.values())
+        totals["tiny_shards"] += primaries if avg_shard < min_bytes else 0
+        totals["tiny_indices"] += pri_bytes < min_bytes
+
+        deleted_ratio = deleted / (docs + deleted) if docs + deleted else 0.0
+        if not writing and not merging and (most_segments > max_segments_per_shard or deleted_ratio > DELETED_RATIO):
+            force_merge.append({
+                "index": name,
+                "primaries": primaries,
+                "max_segments_per_shard": most_segments,
+                "deleted_percent": round(100 * deleted_ratio, 1),
+                "reclaimable_gb": _gb(pri_bytes * deleted_ratio * copies),
+                "segments_removed": max(0, segment_count - primaries) * copies,
+            })
+
+        if primaries > 1 and avg_shard < min_bytes:
+            target = _shrink_target(primaries, pri_bytes, target_bytes)
+            if target < primaries:
+                shrink.append({
+                    "index": name,
+                    "primaries": primaries,
+                    "avg_shard_gb": _gb(avg_shard),
+                    "target_primaries": target,
+                    "shards_removed": (primaries - target) * copies,
+                    "writing": writing,
+                })
+
+        if largest_shard > max_bytes:
+            needed = math.ceil(pri_bytes / target_bytes)
+            rollover.append({
+                "index": name,
+                "primaries": primaries,
+                "max_shard_gb": _gb(largest_shard),
+                # _split needs a multiple of the current count; a rolled-over index can use any count
+                "target_primaries": needed if writing else math.ceil(needed / primaries) * primaries,
+                "excess_gb": _gb(sum(max(0, shard["bytes"] - target_bytes) for shard in shards.values())
+                                 or max(0, largest_shard - target_bytes)),
+                "action": "rollover" if writing else "split",
+            })
+
+        interval = duration_seconds(index_settings.get("refresh_interval"))
+        if interval is not None and 0 <= interval < MIN_REFRESH_SECONDS:
+            anomalies.append({"index": name, "kind": "refresh_interval",
+                              "detail": f"refresh_interval {index_settings['refresh_interval']} creates many small segments"})
+        elif interval is not None and interval < 0 and not write_blocked:
+            anomalies.append({"index": name, "kind": "refresh_interval",
+                              "detail": "refresh is disabled; new documents are not searchable until it is re-enabled"})
+        auto_expand = str(index_settings.get("auto_expand_replicas", "false")).lower()
+        if auto_expand == "false" and data_nodes and replicas >= data_nodes:
+            anomalies.append({"index": name, "kind": "replicas",
+                              "detail": f"{replicas} replicas cannot all be allocated on {data_nodes} data nodes"})
+        elif replicas == 0 and data_nodes > 1 and not name.startswith("."):
+            anomalies.append({"index": name, "kind": "replicas",
+                              "detail": "no replicas; losing a node loses data and no copy shares the search load"})
+        if row.get("health") == "red":
+            anomalies.append({"index": name, "kind": "health", "detail": "red: a primary shard is unassigned"})
+
+    force_merge.sort(key=lambda r: (r["reclaimable_gb"], r["segments_removed"]), reverse=True)
+    shrink.sort(key=lambda r: r["shards_removed"], reverse=True)
+    rollover.sort(key=lambda r: r["excess_gb"], reverse=True)
+    anomalies.sort(key=lambda r: ANOMALY_ORDER.index(r["kind"]))
+    return {
+        "indices": totals["indices"],
+        "data_nodes": data_nodes,
+        "primary_shards": totals["primary_shards"],
+        "primary_gb": _gb(totals["primary_bytes"]),
+        "avg_shard_gb": _gb(totals["primary_bytes"] / totals["primary_shards"]) if totals["primary_shards"] else 0.0,
+        "avg_segments_per_shard": round(totals["segments"] / totals["primary_shards"], 1) if totals["primary_shards"] else 0.0,
+        "oversized_shards": totals["oversized_shards"],
+        "tiny_shards": totals["tiny_shards"],
+        "tiny_indices": totals["tiny_indices"],
+        "force_merge_candidates": len(force_merge),
+        "shrink_candidates": len(shrink),
+        "rollover_candidates": len(rollover),
+        "anomaly_count": len(anomalies),
+        "reclaimable_gb": round(sum(r["reclaimable_gb"] for r in force_merge), 2),
+        "force_merge": force_merge[:top],
+        "shrink": shrink[:top],
+        "rollover": rollover[:top],
+        "anomalies": anomalies[:top],
+    }
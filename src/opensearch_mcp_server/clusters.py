@@ -0,0 +1,162 @@
+"""
+Named OpenSearch clusters served by one MCP server.
+
+Without configuration the server talks to a single cluster, named
+"default", configured by the OPENSEARCH_* environment variables. Setting
+OPENSEARCH_CLUSTERS_FILE to a JSON file registers several:
+
+    {
+      "default": "us-east",
+      "clusters": {
+        "us-east": {"host": "https://search-us-east:9200", "password_env": "US_EAST_PASSWORD"},
+        "eu-west": {"host": "https://search-eu-west:9200", "username": "mcp", "timeout": 10}
+      }
+    }
+
+Each entry overrides the connection settings read from the environment
+(host, username, password, dashboards_host, pool and transport tuning);
+a key ending in `_env` names an environment variable holding the value,
+so secrets can stay out of the file. Clients are created per cluster on
+first use (see `es_client.py`).
+
+Every cluster-facing tool takes an optional `cluster` argument. The
+router wraps each tool so the selected cluster is held in a context
+variable for the duration of the call, and the client, cache and watcher
+lookups below it pick the cluster up from there.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Annotated, Any, Callable, Dict, Iterator, List, Optional
+
+from mcp.types import TextContent
+from pydantic import Field
+
+from .env import load_env
+
+DEFAULT_CLUSTER = "default"
+
+# Tools that never reach a cluster, or address several of them themselves
+UNROUTED_TOOLS = frozenset({
+    "get_cache_stats",
+    "invalidate_cache",
+    "get_server_metrics",
+    "list_clusters",
+    "get_cluster_health_all",
+    "list_indices_all",
+})
+
+_current_cluster: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "opensearch_mcp_cluster", default=None
+)
+
+
+class ClusterRegistry:
+    def __init__(self, clusters: Dict[str, Dict[str, Any]], default: str):
+        self.clusters = clusters
+        self.default = default
+
+    def names(self) -> List[str]:
+        return list(self.clusters)
+
+    def resolve(self, name: Optional[str]) -> str:
+        """Return the cluster name to use, raising ValueError for an unknown one."""
+        name = name or self.default
+        if name not in self.clusters:
+            raise ValueError(f"Unknown cluster '{name}', expected one of {', '.join(self.clusters)}")
+        return name
+
+    def overrides(self, name: str) -> Dict[str, Any]:
+        """Connection settings of a cluster that replace the environment defaults."""
+        overrides = {}
+        for key, value in self.clusters[self.resolve(name)].items():
+            if key.endswith("_env"):
+                load_env()
+                key, value = key[:-len("_env")], os.getenv(value)
+            overrides[key] = value
+        return overrides
+
+
+def load_cluster_registry(path: Optional[str]) -> ClusterRegistry:
+    """Load the registry from a JSON clusters file, or register only the environment cluster."""
+    if not path:
+        return ClusterRegistry({DEFAULT_CLUSTER: {}}, DEFAULT_CLUSTER)
+    with open(os.path.expanduser(path), encoding="utf-8") as f:
+        document = json.load(f)
+    clusters = document.get("clusters") if isinstance(document, dict) else None
+    if not clusters or not isinstance(clusters, dict):
+        raise ValueError(f"{path} must hold a non-empty \"clusters\" object")
+    for name, entry in clusters.items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"Cluster '{name}' in {path} must be an object")
+    default = document.get("default") or next(iter(clusters))
+    if default not in clusters:
+        raise ValueError(f"Default cluster '{default}' is not defined in {path}")
+    return ClusterRegistry(clusters, default)
+
+
+_registry: Optional[ClusterRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_cluster_registry() -> ClusterRegistry:
+    """Return the process-wide cluster registry, loaded from OPENSEARCH_CLUSTERS_FILE."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                load_env()
+                _registry = load_cluster_registry(os.getenv("OPENSEARCH_CLUSTERS_FILE"))
+    return _registry
+
+
+def current_cluster() -> str:
+    """Name of the cluster the running tool call addresses."""
+    return _current_cluster.get() or get_cluster_registry().default
+
+
+@contextmanager
+def use_cluster(name: str) -> Iterator[str]:
+    """Address `name` from the calls made inside the block."""
+    token = _current_cluster.set(name)
+    try:
+        yield name
+    finally:
+        _current_cluster.reset(token)
+
+
+class ClusterRouter:
+    """Adds the `cluster` argument to tools and routes each call to the selected cluster."""
+
+    def __init__(self, registry: ClusterRegistry):
+        self.registry = registry
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        if name in UNROUTED_TOOLS:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(cluster: Optional[str] = None, **kwargs: Any) -> Any:
+            try:
+                cluster = self.registry.resolve(cluster)
+            except ValueError as e:
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+            with use_cluster(cluster):
+                return await fn(**kwargs)
+
+        signature = inspect.signature(fn)
+        parameter = inspect.Parameter(
+            "cluster",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=None,
+            annotation=Annotated[Optional[str], Field(
+                description=f"Cluster to query: {', '.join(self.registry.names())}. Defaults to {self.registry.default}."
+            )],
+        )
+        params = [p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in signature.parameters.values()]
+        wrapper.__signature__ = signature.replace(parameters=params + [parameter])
+        return wrapper
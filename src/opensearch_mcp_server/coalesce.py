@@ -0,0 +1,100 @@
+"""
+Single-flight coalescing of identical concurrent tool calls.
+
+When several clients ask for the same read-only tool with the same
+arguments while a call is already running, they wait for that call
+instead of sending their own request to the cluster, and all of them
+receive its serialized result. Only calls that overlap are shared;
+nothing is kept once the leading call returns (see `cache.py` for
+responses reused over time).
+
+The leading call runs as its own task, so a caller that goes away does
+not cancel the request the others are waiting on.
+"""
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from .cache import ResponseCache
+from .env import env_bool
+
+# Read-only tools whose identical concurrent calls are shared. Tools with side
+# effects (bulk_index, export_documents_to_file, invalidate_cache) and tools
+# answered from process state are never coalesced.
+DEFAULT_TOOLS = frozenset({
+    "list_indices",
+    "get_mapping",
+    "get_settings",
+    "search_documents",
+    "multi_search",
+    "estimate_query_cost",
+    "profile_search",
+    "aggregate",
+    "get_cluster_health",
+    "get_cluster_stats",
+    "list_index_patterns",
+    "get_ism_policies",
+    "get_index_templates",
+    "get_shard_allocation",
+    "analyze_index_health",
+    "get_hot_threads",
+    "get_tasks",
+    "get_recovery_status",
+})
+
+
+class SingleFlight:
+    def __init__(self, tools: FrozenSet[str]):
+        self.tools = tools
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._per_tool: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, counter: str):
+        with self._lock:
+            per_tool = self._per_tool.setdefault(tool, {"leaders": 0, "shared": 0})
+            per_tool[counter] += 1
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an async tool function so overlapping identical calls share one execution."""
+        if name not in self.tools:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(**kwargs: Any) -> Any:
+            key = ResponseCache.make_key(name, **kwargs)
+            future = self._inflight.get(key)
+            if future is None:
+                self._count(name, "leaders")
+                future = asyncio.ensure_future(fn(**kwargs))
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            else:
+                self._count(name, "shared")
+            return await asyncio.shield(future)
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-tool count of calls that ran (leaders) and calls that joined one in flight (shared)."""
+        with self._lock:
+            rows = [{"tool": tool, **counts} for tool, counts in sorted(self._per_tool.items())]
+        return {"in_flight": len(self._inflight), "tools": rows}
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Return the process-wide single-flight registry, or None if OPENSEARCH_COALESCE_ENABLED=false."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                if not env_bool("OPENSEARCH_COALESCE_ENABLED", True):
+                    _single_flight = False
+                else:
+                    _single_flight = SingleFlight(DEFAULT_TOOLS)
+    return _single_flight or None
@@ -0,0 +1,33 @@
+"""Typed access to environment-variable configuration."""
+import os
+from dotenv import load_dotenv
+
+_dotenv_loaded = False
+
+
+def load_env():
+    """Load environment variables from the .env file once per process."""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def env_int(name: str, default: int) -> int:
+    load_env()
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    load_env()
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    load_env()
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
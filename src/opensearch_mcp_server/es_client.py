@@ -1,49 +1,375 @@
+import asyncio
+import contextvars
 import logging
 import os
-from dotenv import load_dotenv
-from opensearchpy import OpenSearch
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .cache import FINGERPRINT_FILTER_PATH, UNSCOPED_INDICES, fingerprint_from_metadata, get_response_cache
+from .clusters import current_cluster, get_cluster_registry, use_cluster
+from .env import env_bool, env_float, env_int, load_env
+from .instrumentation import span
+from .query_guard import QueryRejected, get_query_guard
 import warnings
 
+# opensearch-py is imported when the first client is created, not at startup
+if TYPE_CHECKING:
+    from opensearchpy import OpenSearch
+
+
+# One OpenSearch client (and therefore one urllib3 connection pool) per cluster
+# is shared by every tool class in the process, created on the first call that needs it.
+_shared_clients: Dict[str, "OpenSearch"] = {}
+_shared_client_lock = threading.Lock()
+_shared_async_clients: Dict[str, Any] = {}
+_executor = None
+
+# Settings that apply to the whole process and cannot be set per cluster
+PROCESS_SETTINGS = ("client_mode", "max_workers")
+
+
+def resolve_filter_path(filter_path: Optional[str], default: Optional[str]) -> Optional[str]:
+    """Pick the filter_path sent to OpenSearch: None keeps the tool default, "" disables filtering."""
+    if filter_path is None:
+        return default
+    return filter_path or None
+
+
+def request_params(**params: Any) -> dict:
+    """Drop unset values from query parameters passed to transport.perform_request."""
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def get_es_config(logger: logging.Logger, cluster: Optional[str] = None) -> dict:
+    """
+    Get the configuration of a cluster: environment variables overridden by its clusters file entry.
+
+    Args:
+        cluster: Cluster name; defaults to the cluster of the running tool call.
+    """
+    load_env()
+    config = {
+        "host": os.getenv("OPENSEARCH_HOST"),
+        "username": os.getenv("OPENSEARCH_USERNAME"),
+        "password": os.getenv("OPENSEARCH_PASSWORD"),
+        "dashboards_host": os.getenv("DASHBOARDS_HOST"),
+        # Connection pool and transport tuning
+        "pool_maxsize": env_int("OPENSEARCH_POOL_MAXSIZE", 10),
+        "keep_alive": env_bool("OPENSEARCH_KEEP_ALIVE", True),
+        "timeout": env_float("OPENSEARCH_TIMEOUT", 30.0),
+        "max_retries": env_int("OPENSEARCH_MAX_RETRIES", 3),
+        "retry_on_timeout": env_bool("OPENSEARCH_RETRY_ON_TIMEOUT", False),
+        "http_compress": env_bool("OPENSEARCH_HTTP_COMPRESS", False),
+        "sniff_on_start": env_bool("OPENSEARCH_SNIFF_ON_START", False),
+        "sniff_on_connection_fail": env_bool("OPENSEARCH_SNIFF_ON_CONNECTION_FAIL", False),
+        "sniffer_timeout": env_float("OPENSEARCH_SNIFFER_TIMEOUT", 0) or None,
+        # How tool handlers reach the cluster without blocking the event loop
+        "client_mode": os.getenv("OPENSEARCH_CLIENT_MODE", "thread").strip().lower(),
+        "max_workers": env_int("OPENSEARCH_MAX_WORKERS", 0),
+    }
+
+    name = cluster or current_cluster()
+    overrides = get_cluster_registry().overrides(name)
+    unknown = [key for key in overrides if key not in config or key in PROCESS_SETTINGS]
+    if unknown:
+        raise ValueError(f"Unsupported settings for cluster '{name}': {', '.join(unknown)}")
+    config.update(overrides)
+    config["cluster"] = name
+    return config
+
+
+def require_credentials(config: dict, logger: logging.Logger):
+    """
+    Raise ValueError if the cluster has no username or password.
+    Checked when a client is created, so the server starts and tools that
+    need no client keep working without credentials.
+    """
+    if not all([config["username"], config["password"]]):
+        logger.error(
+            "Missing required OpenSearch configuration. Please check environment variables:"
+        )
+        required = f"OPENSEARCH_USERNAME and OPENSEARCH_PASSWORD (or username and password of cluster '{config['cluster']}') are required"
+        logger.error(required)
+        raise ValueError(f"Missing required OpenSearch configuration: {required}")
+
+
+def create_opensearch_client(config: dict) -> "OpenSearch":
+    """Create a new OpenSearch client from a configuration dictionary."""
+    from opensearchpy import OpenSearch
+    from .transport import TimedJSONSerializer, TimedTransport
+
+    # Disable SSL warnings
+    warnings.filterwarnings(
+        "ignore",
+        message=".*TLS with verify_certs=False is insecure.*",
+    )
+
+    return OpenSearch(
+        config["host"],
+        http_auth=(config["username"], config["password"]),
+        verify_certs=False,
+        pool_maxsize=config["pool_maxsize"],
+        headers=None if config["keep_alive"] else {"connection": "close"},
+        timeout=config["timeout"],
+        max_retries=config["max_retries"],
+        retry_on_timeout=config["retry_on_timeout"],
+        http_compress=config["http_compress"],
+        sniff_on_start=config["sniff_on_start"],
+        sniff_on_connection_fail=config["sniff_on_connection_fail"],
+        sniffer_timeout=config["sniffer_timeout"],
+        transport_class=TimedTransport,
+        serializer=TimedJSONSerializer(),
+    )
+
+
+def create_async_opensearch_client(config: dict):
+    """Create a new AsyncOpenSearch client, or return None if aiohttp is not installed."""
+    try:
+        from opensearchpy import AsyncOpenSearch, AsyncTransport
+    except ImportError:
+        return None
+    from .transport import TimedJSONSerializer
+
+    class TimedAsyncTransport(AsyncTransport):
+        async def perform_request(self, *args: Any, **kwargs: Any) -> Any:
+            with span("transport"):
+                return await super().perform_request(*args, **kwargs)
+
+    warnings.filterwarnings(
+        "ignore",
+        message=".*TLS with verify_certs=False is insecure.*",
+    )
+
+    return AsyncOpenSearch(
+        config["host"],
+        http_auth=(config["username"], config["password"]),
+        verify_certs=False,
+        maxsize=config["pool_maxsize"],
+        headers=None if config["keep_alive"] else {"connection": "close"},
+        timeout=config["timeout"],
+        max_retries=config["max_retries"],
+        retry_on_timeout=config["retry_on_timeout"],
+        http_compress=config["http_compress"],
+        sniff_on_start=config["sniff_on_start"],
+        sniff_on_connection_fail=config["sniff_on_connection_fail"],
+        sniffer_timeout=config["sniffer_timeout"],
+        transport_class=TimedAsyncTransport,
+        serializer=TimedJSONSerializer(),
+    )
+
+
+def get_opensearch_client(logger: logging.Logger, cluster: Optional[str] = None) -> "OpenSearch":
+    """Return the process-wide OpenSearch client of a cluster, creating it on first use."""
+    name = cluster or current_cluster()
+    client = _shared_clients.get(name)
+    if client is None:
+        with _shared_client_lock:
+            client = _shared_clients.get(name)
+            if client is None:
+                config = get_es_config(logger, name)
+                require_credentials(config, logger)
+                logger.info(
+                    f"Creating shared OpenSearch client for cluster '{name}' at {config['host']} "
+                    f"(pool_maxsize={config['pool_maxsize']}, timeout={config['timeout']}s, "
+                    f"max_retries={config['max_retries']})"
+                )
+                client = _shared_clients[name] = create_opensearch_client(config)
+    return client
+
+
+def get_async_opensearch_client(logger: logging.Logger, cluster: Optional[str] = None):
+    """
+    Return the process-wide AsyncOpenSearch client of a cluster when OPENSEARCH_CLIENT_MODE=async.
+    Returns None in thread mode, or when the async extra (aiohttp) is not installed.
+    """
+    name = cluster or current_cluster()
+    client = _shared_async_clients.get(name)
+    if client is None:
+        with _shared_client_lock:
+            client = _shared_async_clients.get(name)
+            if client is None:
+                config = get_es_config(logger, name)
+                if config["client_mode"] == "async":
+                    require_credentials(config, logger)
+                    client = create_async_opensearch_client(config)
+                    if client is None:
+                        logger.warning(
+                            "OPENSEARCH_CLIENT_MODE=async requires aiohttp "
+                            "(pip install opensearch-py[async]); falling back to thread mode"
+                        )
+                # False records "thread mode" so the configuration is read only once
+                client = _shared_async_clients[name] = client or False
+    return client or None
+
+
+def opened_clusters() -> List[str]:
+    """Names of the clusters a client has been created for."""
+    return [name for name in get_cluster_registry().names() if _shared_clients.get(name) or _shared_async_clients.get(name)]
+
+
+def get_executor(logger: logging.Logger) -> ThreadPoolExecutor:
+    """Return the bounded thread pool used to run blocking client calls."""
+    global _executor
+    if _executor is None:
+        with _shared_client_lock:
+            if _executor is None:
+                config = get_es_config(logger)
+                _executor = ThreadPoolExecutor(
+                    max_workers=config["max_workers"] or config["pool_maxsize"],
+                    thread_name_prefix="opensearch",
+                )
+    return _executor
+
+
+async def close_async_opensearch_clients():
+    """Close the shared AsyncOpenSearch clients; await it on the event loop the tools ran on."""
+    with _shared_client_lock:
+        clients = [client for client in _shared_async_clients.values() if client]
+        _shared_async_clients.clear()
+    for client in clients:
+        await client.close()
+
+
+def close_opensearch_client():
+    """Close the shared OpenSearch clients and release their connection pools."""
+    global _executor
+    with _shared_client_lock:
+        for client in _shared_clients.values():
+            client.close()
+        _shared_clients.clear()
+        # The async clients are bound to the server's event loop and are closed on it by
+        # close_async_opensearch_clients; any left over belong to a loop that is gone.
+        _shared_async_clients.clear()
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
 
 class OpensearchClient:
     def __init__(self, logger: logging.Logger):
         self.logger = logger
-        self.es_client = self._create_opensearch_client()
 
-    def _get_es_config(self):
-        """Get OpenSearch configuration from environment variables."""
-        # Load environment variables from .env file
-        load_dotenv()
-        config = {
-            "host": os.getenv("OPENSEARCH_HOST"),
-            "username": os.getenv("OPENSEARCH_USERNAME"),
-            "password": os.getenv("OPENSEARCH_PASSWORD"),
-            "dashboards_host": os.getenv("DASHBOARDS_HOST"),
-        }
-
-        if not all([config["username"], config["password"]]):
-            self.logger.error(
-                "Missing required OpenSearch configuration. Please check environment variables:"
-            )
-            self.logger.error(
-                "OPENSEARCH_USERNAME and OPENSEARCH_PASSWORD are required"
+    @property
+    def es_client(self) -> "OpenSearch":
+        """Client of the cluster the running tool call addresses."""
+        return get_opensearch_client(self.logger)
+
+    async def _run(self, request: Callable[[Any], Any]) -> Any:
+        """
+        Run a client request without blocking the MCP event loop.
+
+        `request` receives the client and performs the call, e.g.
+        `await self._run(lambda client: client.cluster.health())`.
+        In async mode it is given the AsyncOpenSearch client and awaited;
+        otherwise it runs on the bounded thread pool with the sync client.
+        """
+        async_client = get_async_opensearch_client(self.logger)
+        if async_client is not None:
+            return await request(async_client)
+        return await self._run_blocking(request, self.es_client)
+
+    async def _run_blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking function on the bounded thread pool."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(get_executor(self.logger), context.run, fn, *args)
+
+    async def _cached(
+        self,
+        tool: str,
+        loader: Callable[[], Awaitable[str]],
+        index: Optional[str] = None,
+        **args: Any,
+    ) -> str:
+        """
+        Return the cached response of `tool` for these arguments, calling `loader` on a miss.
+        Entries scoped to an index are dropped once the index fingerprint changes.
+        """
+        cache = get_response_cache()
+        if cache is None or cache.ttl(tool) <= 0:
+            return await loader()
+        key = cache.make_key(tool, cluster=current_cluster(), index=index, **args)
+        scoped = index and index not in UNSCOPED_INDICES
+        fingerprint = await self._index_fingerprint(index) if scoped else None
+        value = cache.get(key, fingerprint)
+        if value is None:
+            value = await loader()
+            cache.put(key, value, index=index, fingerprint=fingerprint)
+        return value
+
+    async def _index_fingerprint(self, index: str) -> str:
+        """Digest of UUID and metadata/mapping/settings versions of the matching indices."""
+        cache = get_response_cache()
+        cluster = current_cluster()
+        fingerprint = cache.cached_fingerprint(index, cluster)
+        if fingerprint is None:
+            response = await self._run(lambda client: client.transport.perform_request(
+                'GET',
+                f'/_cluster/state/metadata/{index}',
+                params={'filter_path': FINGERPRINT_FILTER_PATH}
+            ))
+            fingerprint = fingerprint_from_metadata(response)
+            cache.store_fingerprint(index, fingerprint, cluster)
+        return fingerprint
+
+    async def _guard(
+        self, index: str, body: Dict[str, Any], preflight: Optional[bool] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Check a search body against the query cost guard.
+
+        Returns the body to send (rewritten if over budget, with timeout limits applied)
+        and the guard report, or the body unchanged and None when the guard is disabled.
+        Raises QueryRejected. With pre-flight (OPENSEARCH_GUARD_PREFLIGHT, or `preflight`)
+        the query is also checked with `_validate/query?explain` and counted with `_count`.
+        """
+        guard = get_query_guard()
+        if guard is None:
+            return body, None
+        body, report = guard.check(index, body)
+        if guard.preflight if preflight is None else preflight:
+            query = {"query": body["query"]} if body.get("query") else {}
+            validation, count = await asyncio.gather(
+                self._run(lambda client: client.indices.validate_query(index=index, body=query, explain=True)),
+                self._run(lambda client: client.count(index=index, body=query)),
             )
-            raise ValueError("Missing required OpenSearch configuration")
+            explanations = validation.get("explanations") or []
+            if not validation.get("valid", True):
+                errors = [e.get("error") for e in explanations if e.get("error")]
+                raise QueryRejected(f"Query rejected by cost guard: invalid query: {'; '.join(errors[:3]) or validation}")
+            report["explanation"] = [e["explanation"][:1000] for e in explanations if e.get("explanation")][:5]
+            report["matched_docs"] = count.get("count")
+            guard.check_matches(report["matched_docs"] or 0)
+        return body, report
 
-        return config
+    async def _fan_out(self, request: Callable[[Any], Any], clusters: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Run a client request on several clusters concurrently.
 
-    def _create_opensearch_client(self) -> OpenSearch:
-        """Create and return an OpenSearch client using configuration from environment."""
-        config = self._get_es_config()
+        Returns one entry per cluster, in registry order, with the cluster name, "ok" or
+        "error" status, the latency and either the response or the error message.
+        Defaults to every registered cluster.
+        """
+        registry = get_cluster_registry()
+        names = [registry.resolve(name) for name in clusters] if clusters else registry.names()
 
-        # Disable SSL warnings
-        warnings.filterwarnings(
-            "ignore",
-            message=".*TLS with verify_certs=False is insecure.*",
-        )
+        async def one(name: str) -> Dict[str, Any]:
+            start = time.perf_counter()
+            try:
+                with use_cluster(name):
+                    response = await self._run(request)
+                return {"cluster": name, "status": "ok", "took_ms": _elapsed_ms(start), "response": response}
+            except Exception as e:
+                self.logger.error(f"Error querying cluster '{name}': {e}")
+                return {"cluster": name, "status": "error", "took_ms": _elapsed_ms(start), "error": str(e)}
 
-        return OpenSearch(
-            config["host"],
-            http_auth=(config["username"], config["password"]),
-            verify_certs=False,
-        )
+        return list(await asyncio.gather(*(one(name) for name in dict.fromkeys(names))))
+
+    def _get_es_config(self):
+        """Get the configuration of the cluster the running tool call addresses."""
+        return get_es_config(self.logger)
@@ -0,0 +1,378 @@
+"""
+Streaming export of search results to local NDJSON or Parquet files.
+
+Reader threads, one per slice, page through the results with a shared
+point-in-time and `search_after` (sliced scroll on clusters without PIT).
+They hand pages to a single writer through a bounded queue, so memory stays
+at a few pages no matter how large the result set is.
+
+After each page the writer records a checkpoint next to the output file:
+the byte offset of the output and the `search_after` position of every
+slice. An interrupted NDJSON export can be resumed from there. Gzip output
+is written as one gzip member per page so the offset stays a valid cut point.
+
+Parquet files have one schema for the whole file, so it is derived from the
+index mapping before the first page rather than inferred from the data.
+"""
+import gzip
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .pagination import (
+    DEFAULT_KEEP_ALIVE,
+    close_point_in_time,
+    open_point_in_time,
+    page_body,
+    with_tiebreaker,
+)
+
+FORMATS = ("ndjson", "parquet")
+NDJSON_COMPRESSIONS = (None, "gzip")
+PARQUET_COMPRESSIONS = (None, "snappy", "gzip", "zstd", "brotli", "lz4")
+
+PIT_FILTER_PATH = "pit_id,hits.hits._id,hits.hits._index,hits.hits._source,hits.hits.sort"
+SCROLL_FILTER_PATH = "_scroll_id,hits.hits._id,hits.hits._index,hits.hits._source"
+
+
+def _checkpoint_path(path: str) -> str:
+    return path + ".checkpoint"
+
+
+def _job_id(index: str, body: Dict[str, Any], fmt: str, compression: Optional[str], slices: int) -> str:
+    raw = json.dumps([index, body, fmt, compression, slices], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    tmp = _checkpoint_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, _checkpoint_path(path))
+
+
+def _load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_checkpoint_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str, compression: Optional[str], offset: int):
+        self.compression = compression
+        mode = "r+b" if offset else "wb"
+        if offset and not os.path.exists(path):
+            raise ValueError(f"Cannot resume: output file {path} is missing")
+        self.file = open(path, mode)
+        if offset:
+            # Drop anything written after the last checkpoint
+            self.file.truncate(offset)
+            self.file.seek(offset)
+
+    def write(self, hits: List[Dict[str, Any]]) -> int:
+        data = "".join(
+            json.dumps({"_index": h.get("_index"), "_id": h.get("_id"), "_source": h.get("_source")},
+                       ensure_ascii=False) + "\n"
+            for h in hits
+        ).encode("utf-8")
+        if self.compression == "gzip":
+            data = gzip.compress(data)
+        self.file.write(data)
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+# Parquet column type of each mapping type; other types (text, keyword, date, ip, ...) are strings
+INTEGER_TYPES = ("long", "integer", "short", "byte")
+FLOAT_TYPES = ("double", "float", "half_float", "scaled_float", "unsigned_long")
+# Objects, nested documents and other structured values are kept as JSON text
+STRUCTURED_TYPES = ("object", "nested", "flattened", "flat_object", "geo_point", "geo_shape", "join", "percolator")
+UNMAPPED_COLUMN = "_unmapped"
+
+
+def parquet_columns(mapping: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Column kind ("int", "float", "bool", "string" or "json") of every top-level field of a
+    get_mapping response. A field mapped differently in two indices becomes "json".
+    """
+    columns: Dict[str, str] = {}
+    for index_mapping in (mapping or {}).values():
+        for field, spec in ((index_mapping.get("mappings") or {}).get("properties") or {}).items():
+            field_type = spec.get("type", "object")
+            if field_type in INTEGER_TYPES:
+                kind = "int"
+            elif field_type in FLOAT_TYPES:
+                kind = "float"
+            elif field_type == "boolean":
+                kind = "bool"
+            elif field_type in STRUCTURED_TYPES or "properties" in spec:
+                kind = "json"
+            else:
+                kind = "string"
+            columns[field] = kind if columns.get(field, kind) == kind else "json"
+    return columns
+
+
+def _coerce(value: Any, kind: str, field: str, doc_id: Any) -> Any:
+    """Convert a _source value to its column's type, failing loudly instead of dropping it."""
+    if value is None:
+        return None
+    if kind == "json":
+        return json.dumps(value, ensure_ascii=False)
+    if kind == "string":
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    try:
+        if isinstance(value, (list, dict)):
+            raise ValueError("arrays and objects need a JSON column")
+        if kind == "bool":
+            if isinstance(value, str) and value.lower() in ("true", "false"):
+                return value.lower() == "true"
+            if isinstance(value, bool):
+                return value
+            raise ValueError(f"{value!r} is not a boolean")
+        if kind == "int":
+            return int(value)
+        return float(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"Document {doc_id}: field {field} does not fit its mapped type ({kind}): {e}; export it as ndjson"
+        ) from e
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, compression: Optional[str], columns: Dict[str, str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet export requires pyarrow (pip install opensearch-mcp-server[parquet])") from e
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.compression = compression or "none"
+        # The schema comes from the mapping, so every page has the same columns and types no
+        # matter which fields it happens to contain; fields outside the mapping go to _unmapped
+        self.columns = columns
+        types = {"int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "string": pa.string(), "json": pa.string()}
+        self.schema = pa.schema(
+            [("_index", pa.string()), ("_id", pa.string())]
+            + [(field, types[kind]) for field, kind in columns.items()]
+            + [(UNMAPPED_COLUMN, pa.string())]
+        )
+        self.writer = None
+
+    def write(self, hits: List[Dict[str, Any]]) -> int:
+        data: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+        for hit in hits:
+            source = hit.get("_source") or {}
+            data["_index"].append(hit.get("_index"))
+            data["_id"].append(hit.get("_id"))
+            for field, kind in self.columns.items():
+                data[field].append(_coerce(source.get(field), kind, field, hit.get("_id")))
+            unmapped = {k: v for k, v in source.items() if k not in self.columns}
+            data[UNMAPPED_COLUMN].append(json.dumps(unmapped, ensure_ascii=False) if unmapped else None)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(self.pa.Table.from_pydict(data, schema=self.schema))
+        return 0
+
+    def close(self):
+        # An export without hits still produces a file, with the mapping's columns and no rows
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.close()
+
+
+def _read_pit_slice(client, pit, body, page_size, keep_alive, slice_id, slices, search_after, pages, stop):
+    request = dict(body, size=page_size)
+    if slices > 1:
+        request["slice"] = {"id": slice_id, "max": slices}
+    while not stop.is_set():
+        request["pit"] = {"id": pit["id"], "keep_alive": keep_alive}
+        if search_after is not None:
+            request["search_after"] = search_after
+        response = client.search(body=request, filter_path=PIT_FILTER_PATH)
+        pit["id"] = response.get("pit_id", pit["id"])
+        hits = response.get("hits", {}).get("hits", [])
+        if hits:
+            search_after = hits[-1]["sort"]
+            pages.put((slice_id, hits, search_after))
+        if len(hits) < page_size:
+            return
+
+
+def _read_scroll_slice(client, index, body, page_size, keep_alive, slice_id, slices, pages, stop):
+    request = dict(body, size=page_size)
+    request.setdefault("sort", ["_doc"])
+    if slices > 1:
+        request["slice"] = {"id": slice_id, "max": slices}
+    response = client.search(index=index, body=request, scroll=keep_alive, filter_path=SCROLL_FILTER_PATH)
+    scroll_id = response.get("_scroll_id")
+    try:
+        while not stop.is_set():
+            hits = response.get("hits", {}).get("hits", [])
+            if hits:
+                pages.put((slice_id, hits, None))
+            if len(hits) < page_size:
+                return
+            response = client.scroll(
+                body={"scroll_id": scroll_id, "scroll": keep_alive}, filter_path=SCROLL_FILTER_PATH
+            )
+            scroll_id = response.get("_scroll_id", scroll_id)
+    finally:
+        if scroll_id:
+            client.clear_scroll(body={"scroll_id": [scroll_id]})
+
+
+def export_documents(
+    client: Any,
+    index: str,
+    body: Dict[str, Any],
+    path: str,
+    fmt: str = "ndjson",
+    compression: Optional[str] = None,
+    slices: int = 1,
+    page_size: int = 1000,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Export every hit of `body` on `index` to `path` with a synchronous client.
+
+    Returns the path, row count, bytes written, elapsed seconds and throughput.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(FORMATS)}")
+    allowed = NDJSON_COMPRESSIONS if fmt == "ndjson" else PARQUET_COMPRESSIONS
+    if compression not in allowed:
+        raise ValueError(f"Unsupported compression '{compression}' for {fmt}")
+    slices = max(1, slices)
+    body = dict(body or {})
+    job = _job_id(index, body, fmt, compression, slices)
+
+    checkpoint = _load_checkpoint(path) if resume else None
+    if checkpoint is not None:
+        if fmt != "ndjson":
+            raise ValueError("Resume is only supported for NDJSON exports")
+        if checkpoint.get("job") != job:
+            raise ValueError("Checkpoint belongs to a different export; remove it or change the path")
+    else:
+        checkpoint = {
+            "job": job,
+            "offset": 0,
+            "rows": 0,
+            "slices": {str(i): {"search_after": None, "done": False} for i in range(slices)},
+        }
+
+    start = time.perf_counter()
+    rows_before = checkpoint["rows"]
+    sort = with_tiebreaker(body.get("sort"))
+    query_body = dict(page_body(body), sort=sort)
+
+    pit_id = open_point_in_time(client, index, keep_alive)
+    mode = "pit" if pit_id is not None else "scroll"
+    # Scroll positions are not checkpointed, whether the earlier run or this one scrolls
+    if checkpoint["rows"] and "scroll" in (mode, checkpoint.get("mode")):
+        if pit_id is not None:
+            close_point_in_time(client, pit_id)
+        raise ValueError("Cannot resume a scroll-based export; start it again without resume")
+    checkpoint["mode"] = mode
+
+    if fmt == "ndjson":
+        writer = _NdjsonWriter(path, compression, checkpoint["offset"])
+    else:
+        mapping = client.indices.get_mapping(index=index, filter_path="*.mappings.properties.*.type,*.mappings.properties.*.properties")
+        writer = _ParquetWriter(path, compression, parquet_columns(mapping))
+    pages: "queue.Queue" = queue.Queue(maxsize=slices * 2)
+    stop = threading.Event()
+    pit = {"id": pit_id}
+    errors: List[BaseException] = []
+    _done = object()
+
+    def reader(slice_id: int):
+        state = checkpoint["slices"][str(slice_id)]
+        try:
+            if state["done"]:
+                return
+            if mode == "pit":
+                _read_pit_slice(client, pit, query_body, page_size, keep_alive, slice_id, slices,
+                                state["search_after"], pages, stop)
+            else:
+                _read_scroll_slice(client, index, page_body(body), page_size, keep_alive, slice_id, slices,
+                                   pages, stop)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            pages.put((slice_id, _done, None))
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(slices)]
+    for thread in threads:
+        thread.start()
+
+    running = slices
+    try:
+        while running:
+            slice_id, hits, search_after = pages.get()
+            if hits is _done:
+                running -= 1
+                if not errors:
+                    checkpoint["slices"][str(slice_id)]["done"] = True
+                    if fmt == "ndjson":
+                        _save_checkpoint(path, checkpoint)
+                continue
+            if errors:
+                # A reader failed: stop the others and keep the last checkpoint
+                stop.set()
+                continue
+            offset = writer.write(hits)
+            checkpoint["rows"] += len(hits)
+            checkpoint["offset"] = offset
+            checkpoint["slices"][str(slice_id)]["search_after"] = search_after
+            if fmt == "ndjson":
+                _save_checkpoint(path, checkpoint)
+    finally:
+        stop.set()
+        # Unblock readers waiting on a full queue before joining them
+        while any(t.is_alive() for t in threads):
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        writer.close()
+        if pit["id"] is not None:
+            try:
+                close_point_in_time(client, pit["id"])
+            except Exception:
+                pass
+
+    if errors:
+        raise errors[0]
+
+    if os.path.exists(_checkpoint_path(path)):
+        os.remove(_checkpoint_path(path))
+
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    rows = checkpoint["rows"] - rows_before
+    return {
+        "path": os.path.abspath(path),
+        "format": fmt,
+        "compression": compression,
+        "mode": mode,
+        "slices": slices,
+        "rows": checkpoint["rows"],
+        "rows_this_run": rows,
+        "resumed": rows_before > 0,
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "mb_per_second": round(size / 1024 / 1024 / elapsed, 2) if elapsed else None,
+    }
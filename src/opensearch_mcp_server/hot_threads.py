@@ -0,0 +1,178 @@
+"""
+Parsing and cluster-wide aggregation of `_nodes/hot_threads` output.
+
+The API answers with plain text, one section per node:
+
+    ::: {node-1}{nodeId}{ephemeralId}{10.0.0.1}{10.0.0.1:9300}{dimr}
+       Hot threads at 2024-01-01T00:00:00Z, interval=500ms, busiestThreads=3, ignoreIdleThreads=true:
+
+       87.5% (437.5ms out of 500ms) cpu usage by thread 'opensearch[node-1][search][T#3]'
+         8/10 snapshots sharing following 30 elements
+           org.apache.lucene...
+         2/10 snapshots sharing following 12 elements
+           ...
+
+`parse_hot_threads` walks the lines once and yields one record per stack
+group (a thread can report several when its snapshots differ).
+`aggregate_stacks` merges records whose top frames are identical, across
+threads, nodes and snapshots, and ranks them by CPU share.
+"""
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+HOT_THREADS_TYPES = ("cpu", "wait", "block")
+
+_NODE = re.compile(r"^:::\s*\{([^}]*)\}(?:\{([^}]*)\})?")
+_HEADER = re.compile(r"interval=(\d+(?:\.\d+)?)(ms|s|micros|nanos)?")
+_THREAD = re.compile(
+    r"^\s*([\d.]+)%\s*(?:\[[^\]]*\]\s*)?\(([\d.]+)(ms|s|micros|nanos)?\s*out of\s*([\d.]+)(ms|s|micros|nanos)?\)\s*"
+    r"(\w+) usage by thread '([^']*)'"
+)
+_SNAPSHOTS = re.compile(r"^\s*(\d+)/(\d+) snapshots sharing following (\d+) elements")
+_UNIQUE = re.compile(r"^\s*unique snapshot")
+# opensearch[node-1][search][T#3] -> search
+_POOL = re.compile(r"\[([^\]]+)\]\[T#\d+\]")
+
+_UNIT_MS = {"ms": 1.0, "s": 1000.0, "micros": 0.001, "nanos": 0.000001, None: 1.0}
+
+
+def _ms(value: str, unit: Optional[str]) -> float:
+    return float(value) * _UNIT_MS.get(unit, 1.0)
+
+
+def thread_pool(thread: str) -> Optional[str]:
+    match = _POOL.search(thread)
+    return match.group(1) if match else None
+
+
+def parse_hot_threads(lines: Iterable[str], max_frames: int = 10) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per stack group: node, node_id, thread, thread_pool, type, percent,
+    busy_ms, interval_ms, snapshots (sharing / total) and at most `max_frames` top frames.
+    """
+    node = node_id = None
+    interval_ms = None
+    thread: Optional[Dict[str, Any]] = None
+    group: Optional[Dict[str, Any]] = None
+
+    def finish():
+        nonlocal group
+        if group is not None:
+            record, group = group, None
+            return record
+        return None
+
+    for line in lines:
+        if line.startswith(":::"):
+            record = finish()
+            if record:
+                yield record
+            match = _NODE.match(line)
+            node, node_id = (match.group(1), match.group(2)) if match else (line[3:].strip(), None)
+            thread = None
+            continue
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("Hot threads at"):
+            match = _HEADER.search(stripped)
+            interval_ms = _ms(match.group(1), match.group(2)) if match else None
+            continue
+        match = _THREAD.match(line)
+        if match:
+            record = finish()
+            if record:
+                yield record
+            name = match.group(7)
+            thread = {
+                "node": node,
+                "node_id": node_id,
+                "thread": name,
+                "thread_pool": thread_pool(name),
+                "type": match.group(6),
+                "percent": float(match.group(1)),
+                "busy_ms": _ms(match.group(2), match.group(3)),
+                "interval_ms": interval_ms or _ms(match.group(4), match.group(5)),
+            }
+            continue
+        if thread is None:
+            continue
+        match = _SNAPSHOTS.match(line)
+        if match or _UNIQUE.match(line):
+            record = finish()
+            if record:
+                yield record
+            if match:
+                sharing, total = int(match.group(1)), int(match.group(2))
+                thread["snapshots_total"] = total
+            else:
+                # A unique snapshot is one of the total reported by the thread's other groups
+                sharing, total = 1, thread.get("snapshots_total")
+            group = dict(thread, snapshots=sharing, snapshots_total=total, frames=[])
+            continue
+        if group is not None and len(group["frames"]) < max_frames:
+            group["frames"].append(stripped)
+
+    record = finish()
+    if record:
+        yield record
+
+
+def aggregate_stacks(records: Iterable[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    """
+    Merge stack groups with identical frames and rank them by CPU share.
+
+    A group's share is the thread's percentage weighted by the fraction of
+    snapshots that showed this stack, so a thread split across two stacks is
+    not counted twice. Shares add up across threads: 100 is one busy core.
+    Groups without frames say nothing about what ran and are kept per thread.
+    """
+    stacks: Dict[tuple, Dict[str, Any]] = {}
+    threads: Dict[tuple, Dict[str, Any]] = {}
+    nodes = set()
+    for record in records:
+        nodes.add(record["node"])
+        key = (record["node"], record["thread"])
+        threads.setdefault(key, {
+            "node": record["node"],
+            "thread": record["thread"],
+            "type": record["type"],
+            "percent": record["percent"],
+        })
+        total = record.get("snapshots_total") or record.get("snapshots") or 1
+        share = record["percent"] * (record.get("snapshots") or 1) / total
+        frames = tuple(record["frames"])
+        stack_key = frames or ("",) + key
+        stack = stacks.get(stack_key)
+        if stack is None:
+            stack = stacks[stack_key] = {
+                "percent": 0.0, "occurrences": 0, "nodes": set(), "thread_pools": set(),
+                "top_frame": frames[0] if frames else None, "frames": list(frames),
+            }
+        stack["percent"] += share
+        stack["occurrences"] += 1
+        stack["nodes"].add(record["node"])
+        if record.get("thread_pool"):
+            stack["thread_pools"].add(record["thread_pool"])
+
+    ranked = sorted(stacks.values(), key=lambda s: s["percent"], reverse=True)[:top]
+    hot_stacks: List[Dict[str, Any]] = []
+    for rank, stack in enumerate(ranked, 1):
+        hot_stacks.append({
+            "rank": rank,
+            "total_percent": round(stack["percent"], 1),
+            "occurrences": stack["occurrences"],
+            "nodes": len(stack["nodes"]),
+            "node_names": sorted(stack["nodes"])[:10],
+            "thread_pools": sorted(stack["thread_pools"]),
+            "top_frame": stack["top_frame"],
+            "frames": stack["frames"],
+        })
+    busiest = sorted(threads.values(), key=lambda t: t["percent"], reverse=True)[:top]
+    return {
+        "nodes": len(nodes),
+        "threads": len(threads),
+        "distinct_stacks": len(stacks),
+        "hot_stacks": hot_stacks,
+        "busiest_threads": busiest,
+    }
@@ -0,0 +1,351 @@
+"""
+Per-tool latency, payload-size and error metrics.
+
+Every registered tool is wrapped so each call records its latency, the
+size of the text it returns and whether it failed (tools report failures
+as an "Error: ..." text rather than raising). While a call runs, a trace
+collects the time spent in the OpenSearch transport, in JSON decoding of
+responses and in formatting the tool output; these phases are recorded
+per tool as well.
+
+Metrics are read through the `get_server_metrics` tool or, when
+OPENSEARCH_METRICS_PORT is set, scraped from a local endpoint in the Prometheus
+text exposition format. With OPENSEARCH_TRACE=true each tool response carries its
+own phase breakdown.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from mcp.types import TextContent
+
+from .env import env_bool, env_int
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Phases broken out of every call; transport excludes the decode time it contains
+PHASES = ("transport", "decode", "format")
+
+# Recent samples kept per histogram for percentile estimates
+SAMPLE_WINDOW = 1024
+RECENT_TRACES = 50
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "opensearch_mcp_trace", default=None
+)
+
+
+class Histogram:
+    """Cumulative bucket counts plus a sliding window of samples for percentiles."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def cumulative(self) -> Iterator[tuple]:
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Trace:
+    """Phase timings of a single tool call, filled in from any thread it runs on."""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.phases = {phase: 0.0 for phase in PHASES}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] += seconds
+            if phase == "transport":
+                self.requests += 1
+
+    def breakdown(self, total: float) -> Dict[str, Any]:
+        transport = max(0.0, self.phases["transport"] - self.phases["decode"])
+        spans = {
+            "transport": transport,
+            "decode": self.phases["decode"],
+            "format": self.phases["format"],
+        }
+        spans["other"] = max(0.0, total - sum(spans.values()))
+        return {
+            "tool": self.tool,
+            "requests": self.requests,
+            "total_ms": round(total * 1000, 3),
+            **{f"{name}_ms": round(value * 1000, 3) for name, value in spans.items()},
+        }
+
+
+@contextmanager
+def span(phase: str):
+    """Attribute the time spent in the block to `phase` of the current tool call, if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(phase, time.perf_counter() - start)
+
+
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.bytes = Histogram(BYTES_BUCKETS)
+        self.phases = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+
+
+class ServerMetrics:
+    """Thread-safe registry of per-tool counters and histograms."""
+
+    def __init__(self, trace_responses: bool = False):
+        self.trace_responses = trace_responses
+        self.started = time.time()
+        self._tools: Dict[str, _ToolStats] = {}
+        self._traces: deque = deque(maxlen=RECENT_TRACES)
+        self._lock = threading.Lock()
+
+    def record(self, tool: str, seconds: float, nbytes: int, error: bool, trace: Dict[str, Any]):
+        with self._lock:
+            stats = self._tools.setdefault(tool, _ToolStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(seconds)
+            stats.bytes.observe(nbytes)
+            for phase in PHASES:
+                stats.phases[phase].observe(trace[f"{phase}_ms"] / 1000)
+            self._traces.append(dict(trace, error=error, bytes=nbytes))
+
+    def instrument(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an async tool function so every call is measured."""
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            trace = Trace(name)
+            token = _current_trace.set(trace)
+            start = time.perf_counter()
+            error = True
+            result = None
+            try:
+                result = await fn(*args, **kwargs)
+                error = _is_error(result)
+                return self._attach_trace(result, trace, time.perf_counter() - start)
+            finally:
+                _current_trace.reset(token)
+                seconds = time.perf_counter() - start
+                self.record(name, seconds, _payload_bytes(result), error, trace.breakdown(seconds))
+
+        return wrapper
+
+    def _attach_trace(self, result: Any, trace: Trace, seconds: float) -> Any:
+        if not self.trace_responses or not isinstance(result, list):
+            return result
+        return result + [TextContent(type="text", text="trace: " + json.dumps(trace.breakdown(seconds)))]
+
+    def summary(self, include_traces: bool = False) -> Dict[str, Any]:
+        """Per-tool call counts, error rates, latency percentiles, payload sizes and phase means."""
+        with self._lock:
+            rows = []
+            for tool, stats in sorted(self._tools.items()):
+                rows.append({
+                    "tool": tool,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "error_rate": round(stats.errors / stats.calls, 4),
+                    "p50_ms": _ms(stats.latency.percentile(0.5)),
+                    "p99_ms": _ms(stats.latency.percentile(0.99)),
+                    "mean_ms": _ms(stats.latency.sum / stats.calls),
+                    "bytes_total": int(stats.bytes.sum),
+                    "bytes_p99": stats.bytes.percentile(0.99),
+                    **{f"{phase}_mean_ms": _ms(stats.phases[phase].sum / stats.calls) for phase in PHASES},
+                })
+            result: Dict[str, Any] = {"uptime_seconds": round(time.time() - self.started, 1), "tools": rows}
+            if include_traces:
+                result["recent_traces"] = list(self._traces)
+            return result
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram(metric: str, help_text: str, values: Dict[tuple, Histogram]):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, hist in values.items():
+                label = ",".join(f'{k}="{v}"' for k, v in labels)
+                for bound, count in hist.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label},le="{le}"}} {count}')
+                lines.append(f"{metric}_sum{{{label}}} {hist.sum}")
+                lines.append(f"{metric}_count{{{label}}} {hist.count}")
+
+        with self._lock:
+            tools = sorted(self._tools.items())
+            lines.append("# HELP opensearch_mcp_tool_calls_total Tool calls.")
+            lines.append("# TYPE opensearch_mcp_tool_calls_total counter")
+            for tool, stats in tools:
+                lines.append(f'opensearch_mcp_tool_calls_total{{tool="{tool}"}} {stats.calls}')
+            lines.append("# HELP opensearch_mcp_tool_errors_total Tool calls that returned an error.")
+            lines.append("# TYPE opensearch_mcp_tool_errors_total counter")
+            for tool, stats in tools:
+                lines.append(f'opensearch_mcp_tool_errors_total{{tool="{tool}"}} {stats.errors}')
+            histogram(
+                "opensearch_mcp_tool_duration_seconds", "Tool call latency.",
+                {(("tool", tool),): stats.latency for tool, stats in tools},
+            )
+            histogram(
+                "opensearch_mcp_tool_response_bytes", "Size of tool responses.",
+                {(("tool", tool),): stats.bytes for tool, stats in tools},
+            )
+            histogram(
+                "opensearch_mcp_tool_phase_seconds", "Time per tool call spent in transport, decode and format.",
+                {(("tool", tool), ("phase", phase)): stats.phases[phase] for tool, stats in tools for phase in PHASES},
+            )
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedMCP:
+    """
+    Stand-in for the FastMCP server that instruments every tool registered through it.
+
+    When a single-flight registry is given, tools are coalesced inside the
+    measurement, so every caller's latency is still recorded. A cluster
+    router, innermost, adds the `cluster` argument, which then takes part
+    in the coalescing key.
+    """
+
+    def __init__(self, mcp: Any, metrics: ServerMetrics, single_flight: Any = None, router: Any = None):
+        self._mcp = mcp
+        self._metrics = metrics
+        self._single_flight = single_flight
+        self._router = router
+
+    def tool(self, name: Optional[str] = None, description: Optional[str] = None) -> Callable:
+        register = self._mcp.tool(name=name, description=description)
+
+        def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+            tool_name = name or fn.__name__
+            wrapped = self._router.wrap(tool_name, fn) if self._router else fn
+            wrapped = self._single_flight.wrap(tool_name, wrapped) if self._single_flight else wrapped
+            register(self._metrics.instrument(tool_name, wrapped))
+            return fn
+
+        return decorator
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._mcp, attr)
+
+
+class MetricsHTTPServer:
+    """Local HTTP endpoint serving the metrics in Prometheus text format on any path."""
+
+    def __init__(self, metrics: ServerMetrics, host: str, port: int):
+        self.metrics = metrics
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="opensearch-metrics", daemon=True)
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                data = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def address(self) -> tuple:
+        return self._server.server_address[:2]
+
+    def start(self) -> "MetricsHTTPServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _is_error(result: Any) -> bool:
+    if isinstance(result, list) and result:
+        text = getattr(result[0], "text", "")
+        return isinstance(text, str) and text.startswith("Error:")
+    return False
+
+
+def _payload_bytes(result: Any) -> int:
+    if not isinstance(result, list):
+        return 0
+    return sum(len(getattr(item, "text", "").encode("utf-8")) for item in result)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+_metrics: Optional[ServerMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> ServerMetrics:
+    """Return the process-wide metrics registry."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = ServerMetrics(trace_responses=env_bool("OPENSEARCH_TRACE", False))
+    return _metrics
+
+
+def start_metrics_server(logger: logging.Logger) -> Optional[MetricsHTTPServer]:
+    """Start the metrics endpoint when OPENSEARCH_METRICS_PORT is set."""
+    port = env_int("OPENSEARCH_METRICS_PORT", 0)
+    if not port:
+        return None
+    host = os.getenv("OPENSEARCH_METRICS_HOST", "127.0.0.1")
+    server = MetricsHTTPServer(get_metrics(), host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,207 @@
+"""
+Deep pagination for search requests.
+
+Pages are read with a point-in-time (PIT) and a `search_after` cursor. On
+clusters without PIT support a scroll context is used instead. The state
+needed to fetch the next page is packed into an opaque, URL-safe token so
+the server keeps nothing between calls and only one page is ever held in
+memory. Tokens are signed with an HMAC, so a caller cannot edit the query
+stored in them; set OPENSEARCH_CURSOR_SECRET to share cursors between
+server processes (by default each process signs with its own random key).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from .env import load_env
+
+DEFAULT_KEEP_ALIVE = "1m"
+MAX_PAGE_SIZE = 1000
+
+# Appended to the sort so every hit has a unique search_after position
+TIEBREAKER_SORT = {"_id": "asc"}
+
+# Response fields search_page reads to build the next cursor
+PAGINATION_FILTER_PATHS = ("hits.hits.sort", "pit_id", "_scroll_id")
+
+SIGNATURE_BYTES = 16
+
+_cursor_key: Optional[bytes] = None
+
+
+def _signing_key() -> bytes:
+    global _cursor_key
+    if _cursor_key is None:
+        load_env()
+        secret = os.getenv("OPENSEARCH_CURSOR_SECRET")
+        _cursor_key = secret.encode("utf-8") if secret else secrets.token_bytes(32)
+    return _cursor_key
+
+
+def _signature(payload: bytes) -> bytes:
+    return hmac.new(_signing_key(), payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Pack pagination state into an opaque, signed continuation token."""
+    payload = zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+    return base64.urlsafe_b64encode(_signature(payload) + payload).decode("ascii")
+
+
+def decode_cursor(token: str, cluster: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Unpack a continuation token created by `encode_cursor`, rejecting altered tokens and,
+    when `cluster` is given, tokens issued for another cluster.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token.encode("ascii"))
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    signature, payload = data[:SIGNATURE_BYTES], data[SIGNATURE_BYTES:]
+    if not hmac.compare_digest(signature, _signature(payload)):
+        raise ValueError("Invalid cursor: it was altered or issued by another server process")
+    try:
+        state = json.loads(zlib.decompress(payload))
+    except (ValueError, zlib.error) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if cluster is not None and state.get("cluster") != cluster:
+        raise ValueError(
+            f"Cursor belongs to cluster {state.get('cluster')}, not {cluster}; pass cluster={state.get('cluster')}"
+        )
+    return state
+
+
+def pagination_filter_path(filter_path: Optional[str]) -> Optional[str]:
+    """Extend a filter_path with the fields needed to continue paging; None keeps the full response."""
+    if filter_path is None:
+        return None
+    paths = filter_path.split(",")
+    return ",".join(paths + [path for path in PAGINATION_FILTER_PATHS if path not in paths])
+
+
+def page_body(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip parts of the query that only make sense on the first page."""
+    return {k: v for k, v in body.items() if k not in ("size", "from", "aggs", "aggregations", "search_after", "pit")}
+
+
+def with_tiebreaker(sort: Any) -> list:
+    """Normalize `sort` to a list that ends with a unique tiebreaker."""
+    if sort is None:
+        sort = []
+    elif not isinstance(sort, list):
+        sort = [sort]
+    if not any(s == "_id" or (isinstance(s, dict) and "_id" in s) for s in sort):
+        sort = sort + [TIEBREAKER_SORT]
+    return sort
+
+
+def open_point_in_time(client: Any, index: str, keep_alive: str) -> Optional[str]:
+    """Open a PIT on `index`, or return None if the cluster does not support it."""
+    from opensearchpy.exceptions import TransportError
+
+    try:
+        response = client.transport.perform_request(
+            "POST",
+            f"/{index}/_search/point_in_time",
+            params={"keep_alive": keep_alive},
+        )
+    except TransportError as e:
+        # 400/405: the endpoint is unknown on this cluster version
+        if e.status_code in (400, 405):
+            return None
+        raise
+    return response["pit_id"]
+
+
+def close_point_in_time(client: Any, pit_id: str):
+    client.transport.perform_request(
+        "DELETE", "/_search/point_in_time", body={"pit_id": [pit_id]}
+    )
+
+
+def search_page(
+    client: Any,
+    index: str,
+    body: Dict[str, Any],
+    page_size: int,
+    state: Optional[Dict[str, Any]] = None,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Fetch one page of hits with a synchronous client.
+
+    Args:
+        client: A synchronous OpenSearch client.
+        index: Index or pattern to search; ignored when continuing from `state`.
+        body: Query DSL; ignored when continuing from `state`.
+        page_size: Maximum hits per page, capped at MAX_PAGE_SIZE.
+        state: Decoded cursor from a previous page, or None for the first page.
+        keep_alive: How long the PIT or scroll context stays open between pages.
+        params: Extra query parameters such as _source_includes or filter_path. A
+            filter_path must keep hits.hits.sort, pit_id and _scroll_id (see
+            `pagination_filter_path`).
+
+    Returns:
+        The raw search response and the state for the next page, or None once
+        the result set is exhausted (the PIT or scroll context is then released).
+    """
+    params = params or {}
+    if state is None:
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        pit_id = open_point_in_time(client, index, keep_alive)
+        if pit_id is not None:
+            state = {
+                "mode": "pit",
+                "pit_id": pit_id,
+                "body": dict(page_body(body), sort=with_tiebreaker(body.get("sort"))),
+                "size": page_size,
+            }
+            request = dict(state["body"], size=page_size, pit={"id": pit_id, "keep_alive": keep_alive})
+            # Aggregations are computed once, on the first page only
+            for key in ("aggs", "aggregations"):
+                if key in body:
+                    request[key] = body[key]
+            response = client.search(body=request, **params)
+        else:
+            request = dict(body, size=page_size)
+            request.setdefault("sort", ["_doc"])
+            response = client.search(index=index, body=request, scroll=keep_alive, **params)
+            state = {"mode": "scroll", "size": page_size}
+    elif state["mode"] == "pit":
+        request = dict(
+            state["body"],
+            size=state["size"],
+            pit={"id": state["pit_id"], "keep_alive": keep_alive},
+            search_after=state["search_after"],
+        )
+        response = client.search(body=request, **params)
+    elif state["mode"] == "scroll":
+        response = client.scroll(
+            body={"scroll_id": state["scroll_id"], "scroll": keep_alive},
+            filter_path=params.get("filter_path"),
+        )
+    else:
+        raise ValueError(f"Invalid cursor mode: {state.get('mode')}")
+
+    hits = response.get("hits", {}).get("hits", [])
+    state = dict(state)
+    if state["mode"] == "pit":
+        state["pit_id"] = response.get("pit_id", state["pit_id"])
+        if len(hits) < state["size"]:
+            close_point_in_time(client, state["pit_id"])
+            return response, None
+        if "sort" not in hits[-1]:
+            raise ValueError("Hits have no sort values to continue from; filter_path must keep hits.hits.sort")
+        state["search_after"] = hits[-1]["sort"]
+    else:
+        state["scroll_id"] = response.get("_scroll_id", state.get("scroll_id"))
+        if len(hits) < state["size"]:
+            client.clear_scroll(body={"scroll_id": [state["scroll_id"]]})
+            return response, None
+    return response, state
@@ -0,0 +1,318 @@
+"""
+Pre-flight cost checks for search bodies written by agents.
+
+Before a search is sent, its body is checked against configurable limits:
+
+    size            hits requested (from + size) above the maximum
+    buckets         estimated bucket count of the aggregations above the maximum
+    indices         target not covered by the allowed index patterns
+    time range      a search on a time-series index without a range filter
+                    on a time field
+    wildcards       wildcard, regexp or query_string terms starting with a
+                    wildcard, which scan the whole term dictionary
+
+Size and bucket overruns, and a missing time range when a default window is
+configured, are rewritten in "rewrite" mode (the default) and rejected in
+"reject" mode; the other checks always reject. Every accepted body gets a
+`timeout`, and `terminate_after` when configured and the body has no
+aggregations (which would be skewed by it) and is not profiled. Paged
+searches are checked again on every page, against the body stored in the
+cursor.
+
+The bucket estimate multiplies the sizes of nested bucket aggregations
+(terms, multi_terms, composite, significant_terms default to 10 buckets;
+range and filters count their entries) and sums siblings. Histograms depend
+on the data and are listed as unestimated.
+"""
+import copy
+import os
+import re
+import threading
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional, Tuple
+
+from .env import env_bool, env_int, load_env
+
+MODES = ("rewrite", "reject")
+
+DEFAULT_MAX_SIZE = 1000
+DEFAULT_MAX_BUCKETS = 10000
+# Below the 30 s client timeout, so partial results arrive before the client gives up
+DEFAULT_TIMEOUT = "25s"
+DEFAULT_TIME_FIELDS = ("@timestamp", "timestamp")
+
+# Bucket aggregations with a `size` and the bucket count OpenSearch uses without one
+SIZED_AGGREGATIONS = {"terms": 10, "multi_terms": 10, "composite": 10, "significant_terms": 10}
+UNESTIMATED_AGGREGATIONS = ("histogram", "date_histogram", "auto_date_histogram", "variable_width_histogram")
+# Keys of an aggregation object that are not its type
+AGGREGATION_META = ("aggs", "aggregations", "meta")
+
+# A query_string term that starts with a wildcard; a lone "*" (match all / exists) is cheap
+_LEADING_WILDCARD = re.compile(r"(?:^|[\s(:\[])([*?][^\s)\]]*)")
+
+
+class QueryRejected(ValueError):
+    """A search body that exceeds the cost limits and cannot be rewritten."""
+
+
+def _split(value: Optional[str]) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in (value or "").split(",") if part.strip())
+
+
+def _index_parts(index: str) -> List[str]:
+    return [part for part in _split(index) if not part.startswith("-")]
+
+
+def _covers(part: str, pattern: str) -> bool:
+    """Whether an index expression and a configured pattern can address the same indices."""
+    return fnmatch(part, pattern) or fnmatch(pattern, part)
+
+
+def _walk(node: Any):
+    """Yield every (key, value) pair of a nested query."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield key, value
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _term_values(clause: Any, *value_keys: str) -> List[str]:
+    """Values of a {field: value} or {field: {value_key: value}} leaf query."""
+    values = []
+    if isinstance(clause, dict):
+        for spec in clause.values():
+            if isinstance(spec, dict):
+                spec = next((spec[key] for key in value_keys if key in spec), None)
+            if isinstance(spec, str):
+                values.append(spec)
+    return values
+
+
+def leading_wildcards(query: Any) -> List[str]:
+    """Terms of the query that start with a wildcard."""
+    found = []
+    for key, value in _walk(query):
+        if key == "wildcard":
+            found += [v for v in _term_values(value, "value", "wildcard") if v[:1] in ("*", "?")]
+        elif key == "regexp":
+            found += [v for v in _term_values(value, "value") if v.startswith((".*", ".+"))]
+        elif key in ("query_string", "simple_query_string") and isinstance(value, dict):
+            text = value.get("query")
+            if isinstance(text, str):
+                found += [term for term in _LEADING_WILDCARD.findall(text) if term != "*"]
+    return found
+
+
+def has_time_range(query: Any, time_fields: Tuple[str, ...]) -> bool:
+    for key, value in _walk(query):
+        if key == "range" and isinstance(value, dict) and any(field in value for field in time_fields):
+            return True
+    return False
+
+
+def _aggregation_type(agg: Dict[str, Any]) -> Optional[str]:
+    for key in agg:
+        if key not in AGGREGATION_META:
+            return key
+    return None
+
+
+def _sub_aggregations(agg: Dict[str, Any]) -> Dict[str, Any]:
+    return agg.get("aggs") or agg.get("aggregations") or {}
+
+
+def estimate_buckets(aggs: Dict[str, Any], unestimated: Optional[List[str]] = None, path: str = "") -> int:
+    """Estimated number of buckets the aggregations produce (see module docstring)."""
+    total = 0
+    for name, agg in (aggs or {}).items():
+        if not isinstance(agg, dict):
+            continue
+        kind = _aggregation_type(agg)
+        spec = agg.get(kind) if isinstance(agg.get(kind), dict) else {}
+        if kind in SIZED_AGGREGATIONS:
+            buckets = int(spec.get("size", SIZED_AGGREGATIONS[kind]))
+        elif kind in ("range", "date_range", "ip_range"):
+            buckets = len(spec.get("ranges") or []) or 1
+        elif kind == "filters":
+            filters = spec.get("filters") or {}
+            buckets = len(filters) + bool(spec.get("other_bucket"))
+        else:
+            if kind in UNESTIMATED_AGGREGATIONS and unestimated is not None:
+                unestimated.append(f"{path}{name}")
+            buckets = 1
+        children = _sub_aggregations(agg)
+        nested = estimate_buckets(children, unestimated, f"{path}{name}>") if children else 0
+        total += buckets * max(1, nested) if children else buckets
+    return total
+
+
+def _clamp_buckets(aggs: Dict[str, Any], budget: int, path: str, rewrites: List[str]):
+    """Lower sizes so that the aggregations stay within `budget` buckets, split evenly between siblings."""
+    budget = max(1, budget // max(1, len(aggs or {})))
+    for name, agg in (aggs or {}).items():
+        if not isinstance(agg, dict):
+            continue
+        kind = _aggregation_type(agg)
+        buckets = 1
+        if kind in SIZED_AGGREGATIONS and isinstance(agg.get(kind), dict):
+            spec = agg[kind]
+            buckets = int(spec.get("size", SIZED_AGGREGATIONS[kind]))
+            if buckets > budget:
+                spec["size"] = budget
+                rewrites.append(f"aggs {path}{name}: size {buckets} -> {budget}")
+                buckets = budget
+        children = _sub_aggregations(agg)
+        if children:
+            _clamp_buckets(children, max(1, budget // max(1, buckets)), f"{path}{name}>", rewrites)
+
+
+class QueryGuard:
+    def __init__(
+        self,
+        mode: str = "rewrite",
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_buckets: int = DEFAULT_MAX_BUCKETS,
+        allowed_indices: Tuple[str, ...] = (),
+        time_series_indices: Tuple[str, ...] = (),
+        time_fields: Tuple[str, ...] = DEFAULT_TIME_FIELDS,
+        default_time_range: Optional[str] = None,
+        allow_leading_wildcards: bool = False,
+        timeout: Optional[str] = DEFAULT_TIMEOUT,
+        terminate_after: int = 0,
+        preflight: bool = False,
+        max_docs: int = 0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown query guard mode '{mode}', expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.max_size = max_size
+        self.max_buckets = max_buckets
+        self.allowed_indices = allowed_indices
+        self.time_series_indices = time_series_indices
+        self.time_fields = time_fields or DEFAULT_TIME_FIELDS
+        self.default_time_range = default_time_range
+        self.allow_leading_wildcards = allow_leading_wildcards
+        self.timeout = timeout
+        self.terminate_after = terminate_after
+        self.preflight = preflight
+        self.max_docs = max_docs
+
+    def is_time_series(self, index: str) -> bool:
+        return any(_covers(part, pattern) for part in _index_parts(index) for pattern in self.time_series_indices)
+
+    def _rewrite_or_reject(self, message: str, rewrites: List[str], rewrite: str):
+        """Record a rewrite about to be applied, or raise in reject mode."""
+        if self.mode == "reject":
+            raise QueryRejected(f"Query rejected by cost guard: {message}")
+        rewrites.append(rewrite)
+
+    def check_index(self, index: str):
+        """Reject an index expression not covered by the allowed index patterns."""
+        if self.allowed_indices:
+            denied = [part for part in _index_parts(index)
+                      if not any(fnmatch(part, pattern) for pattern in self.allowed_indices)]
+            if denied or not _index_parts(index):
+                raise QueryRejected(
+                    f"Query rejected by cost guard: index {', '.join(denied) or index} is outside the allowed "
+                    f"patterns {', '.join(self.allowed_indices)}"
+                )
+
+    def check(self, index: str, body: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Check a search body. Returns the (possibly rewritten) copy to send and a report
+        with the rewrites applied and the bucket estimate; raises QueryRejected.
+        """
+        body = copy.deepcopy(body or {})
+        rewrites: List[str] = []
+
+        self.check_index(index)
+
+        query = body.get("query")
+        if not self.allow_leading_wildcards:
+            wildcards = leading_wildcards(query)
+            if wildcards:
+                raise QueryRejected(
+                    f"Query rejected by cost guard: leading wildcard in {', '.join(wildcards[:5])}. "
+                    "Anchor the pattern, or search a keyword field with a prefix or match query instead."
+                )
+
+        if self.is_time_series(index) and not has_time_range(query, self.time_fields):
+            message = f"{index} is a time-series index; add a range filter on {' or '.join(self.time_fields)}"
+            if not self.default_time_range:
+                raise QueryRejected(f"Query rejected by cost guard: {message}")
+            self._rewrite_or_reject(message, rewrites, f"added range filter {self.time_fields[0]} >= {self.default_time_range}")
+            time_filter = {"range": {self.time_fields[0]: {"gte": self.default_time_range}}}
+            body["query"] = {"bool": {"filter": [time_filter], **({"must": [query]} if query else {})}}
+
+        start = int(body.get("from", 0) or 0)
+        size = int(body.get("size", 0) or 0)
+        if start + size > self.max_size:
+            if start >= self.max_size:
+                raise QueryRejected(
+                    f"Query rejected by cost guard: from {start} is beyond the {self.max_size} hit limit; "
+                    "use page_size and cursors to read deep result sets"
+                )
+            self._rewrite_or_reject(f"from + size {start + size} exceeds {self.max_size}", rewrites,
+                                    f"size {size} -> {self.max_size - start}")
+            body["size"] = self.max_size - start
+
+        aggs = body.get("aggs") or body.get("aggregations")
+        unestimated: List[str] = []
+        buckets = estimate_buckets(aggs, unestimated) if aggs else 0
+        if buckets > self.max_buckets:
+            message = f"aggregations produce an estimated {buckets} buckets, over {self.max_buckets}"
+            self._rewrite_or_reject(message, rewrites, f"estimated buckets {buckets} exceed {self.max_buckets}")
+            _clamp_buckets(aggs, self.max_buckets, "", rewrites)
+            buckets = estimate_buckets(aggs)
+
+        if self.timeout and "timeout" not in body:
+            body["timeout"] = self.timeout
+        # A profiled search must run in full, or its timings describe a truncated query
+        if self.terminate_after and not aggs and not body.get("profile") and "terminate_after" not in body:
+            body["terminate_after"] = self.terminate_after
+
+        report: Dict[str, Any] = {"rewrites": rewrites, "estimated_buckets": buckets}
+        if unestimated:
+            report["unestimated_aggregations"] = unestimated
+        return body, report
+
+    def check_matches(self, count: int):
+        """Reject a query that matches more documents than allowed (pre-flight `_count`)."""
+        if self.max_docs and count > self.max_docs:
+            raise QueryRejected(
+                f"Query rejected by cost guard: it matches {count} documents, over {self.max_docs}; narrow the query"
+            )
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_query_guard() -> Optional[QueryGuard]:
+    """Return the process-wide query guard, or None if OPENSEARCH_GUARD_ENABLED=false."""
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                if not env_bool("OPENSEARCH_GUARD_ENABLED", True):
+                    _guard = False
+                else:
+                    load_env()
+                    _guard = QueryGuard(
+                        mode=os.getenv("OPENSEARCH_GUARD_MODE", "rewrite").strip().lower(),
+                        max_size=env_int("OPENSEARCH_GUARD_MAX_SIZE", DEFAULT_MAX_SIZE),
+                        max_buckets=env_int("OPENSEARCH_GUARD_MAX_BUCKETS", DEFAULT_MAX_BUCKETS),
+                        allowed_indices=_split(os.getenv("OPENSEARCH_GUARD_ALLOWED_INDICES")),
+                        time_series_indices=_split(os.getenv("OPENSEARCH_GUARD_TIME_SERIES_INDICES")),
+                        time_fields=_split(os.getenv("OPENSEARCH_GUARD_TIME_FIELDS")) or DEFAULT_TIME_FIELDS,
+                        default_time_range=os.getenv("OPENSEARCH_GUARD_DEFAULT_TIME_RANGE") or None,
+                        allow_leading_wildcards=env_bool("OPENSEARCH_GUARD_ALLOW_LEADING_WILDCARDS", False),
+                        timeout=os.getenv("OPENSEARCH_GUARD_TIMEOUT", DEFAULT_TIMEOUT) or None,
+                        terminate_after=env_int("OPENSEARCH_GUARD_TERMINATE_AFTER", 0),
+                        preflight=env_bool("OPENSEARCH_GUARD_PREFLIGHT", False),
+                        max_docs=env_int("OPENSEARCH_GUARD_MAX_DOCS", 0),
+                    )
+    return _guard or None
@@ -0,0 +1,287 @@
+"""
+Summaries of search `profile` output and query tuning hints.
+
+A profiled search returns, per shard, a tree of Lucene query components,
+the collectors that gathered hits and the aggregators, each with its time
+in nanoseconds and a breakdown by low-level phase. The raw tree is large
+and repeats per shard, so `summarize_profile` reduces it to:
+
+    shards        query, rewrite, collector and aggregation time per shard
+    components    query components merged across shards by type and
+                  description, ranked by self time (own time minus children)
+    collectors    collectors merged across shards by name
+    aggregations  aggregators merged across shards, ranked by self time
+
+`suggest_fixes` combines the request body, the index mapping and that
+summary into hints for common mistakes: term-level clauses scored in query
+context, term queries on analyzed text, aggregations or sorts on text
+fields, unrounded `now` in date ranges, and costly multi-term or script
+components.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAX_DESCRIPTION = 120
+
+# filter_path for a profiled search: timing only, no hits
+PROFILE_FILTER_PATH = "took,timed_out,hits.total,profile"
+
+_SHARD_ID = re.compile(r"^\[([^\]]*)\]\[([^\]]*)\]\[(\d+)\]")
+
+# Term-level queries that only filter; scoring them is wasted work
+FILTER_ONLY_QUERIES = ("term", "terms", "range", "exists", "ids")
+# Queries that compare the raw value, which is wrong against analyzed text
+TERM_LEVEL_QUERIES = ("term", "terms", "prefix", "wildcard", "regexp", "fuzzy")
+FULL_TEXT_QUERIES = ("match", "match_phrase")
+# Clauses of a bool / constant_score query that run in filter context
+FILTER_CONTEXT_KEYS = ("filter", "must_not")
+
+MULTI_TERM_COMPONENTS = ("WildcardQuery", "AutomatonQuery", "PrefixQuery", "RegexpQuery", "FuzzyQuery",
+                         "MultiTermQueryConstantScoreWrapper", "TermInSetQuery")
+SCRIPT_COMPONENTS = ("ScriptQuery", "ScriptScoreQuery", "FunctionScoreQuery")
+
+
+def _ms(nanos: float) -> float:
+    return round(nanos / 1e6, 3)
+
+
+def _trim(text: Optional[str]) -> str:
+    text = text or ""
+    return text[:MAX_DESCRIPTION] + ("..." if len(text) > MAX_DESCRIPTION else "")
+
+
+def _dominant_phase(breakdown: Dict[str, int]) -> Optional[str]:
+    phases = {k: v for k, v in (breakdown or {}).items() if not k.endswith("_count") and v}
+    return max(phases, key=phases.get) if phases else None
+
+
+def _walk_tree(nodes: Iterable[Dict[str, Any]], depth: int = 0) -> Iterable[Tuple[Dict[str, Any], float, int]]:
+    """Yield each profile node with its self time (own time minus its children) and depth."""
+    for node in nodes or []:
+        children = node.get("children") or []
+        own = node.get("time_in_nanos", 0) - sum(child.get("time_in_nanos", 0) for child in children)
+        yield node, max(0, own), depth
+        yield from _walk_tree(children, depth + 1)
+
+
+def _merge(target: Dict[tuple, Dict[str, Any]], key: tuple, node: Dict[str, Any], self_nanos: float, shard: str):
+    entry = target.get(key)
+    if entry is None:
+        entry = target[key] = {"total": 0, "self": 0, "shards": set(), "phases": {}}
+    entry["total"] += node.get("time_in_nanos", 0)
+    entry["self"] += self_nanos
+    entry["shards"].add(shard)
+    for phase, nanos in (node.get("breakdown") or {}).items():
+        if not phase.endswith("_count"):
+            entry["phases"][phase] = entry["phases"].get(phase, 0) + nanos
+
+
+def _ranked(merged: Dict[tuple, Dict[str, Any]], fields: Tuple[str, ...], total: float, top: int) -> List[Dict[str, Any]]:
+    rows = []
+    for key, entry in sorted(merged.items(), key=lambda item: item[1]["self"], reverse=True)[:top]:
+        rows.append({
+            **dict(zip(fields, key)),
+            "shards": len(entry["shards"]),
+            "self_ms": _ms(entry["self"]),
+            "total_ms": _ms(entry["total"]),
+            "self_percent": round(100.0 * entry["self"] / total, 1) if total else 0.0,
+            "dominant_phase": _dominant_phase(entry["phases"]),
+        })
+    return rows
+
+
+def summarize_profile(response: Dict[str, Any], top: int = 10) -> Dict[str, Any]:
+    """Reduce a profiled search response to per-shard timings and ranked components."""
+    shards = []
+    components: Dict[tuple, Dict[str, Any]] = {}
+    collectors: Dict[tuple, Dict[str, Any]] = {}
+    aggregators: Dict[tuple, Dict[str, Any]] = {}
+    query_nanos = aggregation_nanos = 0
+
+    for shard in (response.get("profile") or {}).get("shards", []):
+        shard_id = shard.get("id", "")
+        match = _SHARD_ID.match(shard_id)
+        node, index, number = match.groups() if match else (None, None, shard_id)
+        row = {"index": index, "shard": number, "node": node,
+               "query_ms": 0.0, "rewrite_ms": 0.0, "collector_ms": 0.0, "aggregation_ms": 0.0}
+        shard_query = shard_rewrite = shard_collector = shard_aggs = 0
+        for search in shard.get("searches", []):
+            shard_query += sum(q.get("time_in_nanos", 0) for q in search.get("query", []))
+            shard_rewrite += search.get("rewrite_time", 0)
+            shard_collector += sum(c.get("time_in_nanos", 0) for c in search.get("collector", []))
+            for component, self_nanos, _ in _walk_tree(search.get("query", [])):
+                key = (component.get("type"), _trim(component.get("description")))
+                _merge(components, key, component, self_nanos, shard_id)
+            for collector, self_nanos, _ in _walk_tree(search.get("collector", [])):
+                _merge(collectors, (collector.get("name"), collector.get("reason")), collector, self_nanos, shard_id)
+        for aggregator, self_nanos, _ in _walk_tree(shard.get("aggregations", [])):
+            key = (aggregator.get("type"), aggregator.get("description"))
+            _merge(aggregators, key, aggregator, self_nanos, shard_id)
+        shard_aggs = sum(a.get("time_in_nanos", 0) for a in shard.get("aggregations", []))
+        query_nanos += shard_query
+        aggregation_nanos += shard_aggs
+        row.update(query_ms=_ms(shard_query), rewrite_ms=_ms(shard_rewrite),
+                   collector_ms=_ms(shard_collector), aggregation_ms=_ms(shard_aggs))
+        shards.append(row)
+
+    shards.sort(key=lambda s: s["query_ms"] + s["collector_ms"] + s["aggregation_ms"], reverse=True)
+    total = response.get("hits", {}).get("total")
+    collector_rows = [
+        {"name": name, "reason": reason, "shards": len(entry["shards"]), "total_ms": _ms(entry["total"])}
+        for (name, reason), entry in sorted(collectors.items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+    ]
+    return {
+        "took_ms": response.get("took"),
+        "timed_out": response.get("timed_out", False),
+        "total_hits": total.get("value") if isinstance(total, dict) else total,
+        "shard_count": len(shards),
+        "query_ms": _ms(query_nanos),
+        "aggregation_ms": _ms(aggregation_nanos),
+        "slowest_shards": shards[:top],
+        "components": _ranked(components, ("type", "description"), query_nanos, top),
+        "collectors": collector_rows,
+        "aggregations": _ranked(aggregators, ("type", "name"), aggregation_nanos, top),
+    }
+
+
+def field_types(mapping_response: Dict[str, Any]) -> Dict[str, str]:
+    """Map every field path (including multi-fields such as `name.keyword`) to its type."""
+    types: Dict[str, str] = {}
+
+    def visit(properties: Dict[str, Any], prefix: str):
+        for name, spec in (properties or {}).items():
+            path = f"{prefix}{name}"
+            types.setdefault(path, spec.get("type", "object"))
+            for sub, sub_spec in (spec.get("fields") or {}).items():
+                types.setdefault(f"{path}.{sub}", sub_spec.get("type", "object"))
+            if "properties" in spec:
+                visit(spec["properties"], f"{path}.")
+
+    for index_mapping in (mapping_response or {}).values():
+        visit((index_mapping.get("mappings") or {}).get("properties"), "")
+    return types
+
+
+def _leaf_fields(kind: str, spec: Any) -> List[Tuple[str, Any]]:
+    """(field, value) pairs addressed by a leaf query."""
+    if not isinstance(spec, dict):
+        return []
+    if kind == "exists":
+        return [(spec.get("field"), None)]
+    if kind == "ids":
+        return []
+    return [(field, value) for field, value in spec.items() if not field.startswith("_") and field != "boost"]
+
+
+def _query_leaves(query: Any, filter_context: bool = False) -> Iterable[Tuple[str, Any, bool]]:
+    """Yield (query type, spec, in filter context) for every leaf query of a query DSL tree."""
+    if isinstance(query, list):
+        for item in query:
+            yield from _query_leaves(item, filter_context)
+        return
+    if not isinstance(query, dict):
+        return
+    for kind, spec in query.items():
+        if kind == "bool" and isinstance(spec, dict):
+            for clause, sub in spec.items():
+                yield from _query_leaves(sub, filter_context or clause in FILTER_CONTEXT_KEYS)
+        elif kind == "constant_score" and isinstance(spec, dict):
+            yield from _query_leaves(spec.get("filter"), True)
+        elif kind in ("nested", "has_child", "has_parent", "function_score", "boosting", "dis_max") and isinstance(spec, dict):
+            for sub_key in ("query", "queries", "positive", "negative"):
+                if sub_key in spec:
+                    yield from _query_leaves(spec[sub_key], filter_context)
+        else:
+            yield kind, spec, filter_context
+
+
+def _keyword_variant(field: str, types: Dict[str, str]) -> Optional[str]:
+    for path, kind in types.items():
+        if kind == "keyword" and path.startswith(f"{field}."):
+            return path
+    return None
+
+
+def _agg_fields(aggs: Any) -> Iterable[Tuple[str, str]]:
+    """(aggregation name, field) for every aggregation that reads a field."""
+    for name, agg in (aggs or {}).items():
+        if not isinstance(agg, dict):
+            continue
+        for kind, spec in agg.items():
+            if kind in ("aggs", "aggregations"):
+                yield from _agg_fields(spec)
+            elif isinstance(spec, dict) and isinstance(spec.get("field"), str):
+                yield name, spec["field"]
+
+
+def _sort_fields(sort: Any) -> Iterable[str]:
+    for item in sort if isinstance(sort, list) else [sort]:
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, dict):
+            yield from (field for field in item if not field.startswith("_"))
+
+
+def suggest_fixes(body: Dict[str, Any], types: Dict[str, str], summary: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Tuning hints for the request, from its body, the mapping and the profile summary."""
+    suggestions: List[Dict[str, str]] = []
+    seen = set()
+
+    def add(kind: str, field: Optional[str], text: str):
+        if (kind, field) not in seen:
+            seen.add((kind, field))
+            suggestions.append({"kind": kind, "field": field or "", "suggestion": text})
+
+    for kind, spec, filter_context in _query_leaves(body.get("query")):
+        for field, value in _leaf_fields(kind, spec):
+            field_type = types.get(field)
+            if kind in FILTER_ONLY_QUERIES and not filter_context:
+                add("filter_context", field,
+                    f"`{kind}` on `{field}` runs in query context and is scored; move it to bool.filter "
+                    "to skip scoring and let the cluster cache it")
+            if kind in TERM_LEVEL_QUERIES and field_type == "text":
+                keyword = _keyword_variant(field, types)
+                add("text_field", field,
+                    f"`{kind}` on text field `{field}` compares against analyzed tokens; "
+                    + (f"use `{keyword}` for exact values" if keyword else "use match, or map the field as keyword"))
+            if kind in FULL_TEXT_QUERIES and field_type == "keyword":
+                add("keyword_field", field,
+                    f"`{kind}` on keyword field `{field}` is an exact match; a term query in bool.filter avoids analysis and scoring")
+            if kind == "range" and isinstance(value, dict):
+                for bound in ("gt", "gte", "lt", "lte", "from", "to"):
+                    if isinstance(value.get(bound), str) and "now" in value[bound] and "/" not in value[bound]:
+                        add("date_rounding", field,
+                            f"`{value[bound]}` changes every millisecond, so the request cannot be cached; "
+                            f"round it, e.g. `{value[bound]}/m`")
+
+    for name, field in _agg_fields(body.get("aggs") or body.get("aggregations")):
+        if types.get(field) == "text":
+            keyword = _keyword_variant(field, types)
+            add("text_aggregation", field,
+                f"aggregation `{name}` reads text field `{field}`, which needs fielddata; "
+                + (f"aggregate on `{keyword}` instead" if keyword else "map a keyword sub-field and aggregate on it"))
+    for field in _sort_fields(body.get("sort")):
+        if types.get(field) == "text":
+            keyword = _keyword_variant(field, types)
+            add("text_sort", field,
+                f"sorting on text field `{field}` needs fielddata; "
+                + (f"sort on `{keyword}` instead" if keyword else "sort on a keyword sub-field"))
+
+    for component in summary.get("components", [])[:3]:
+        if component["self_percent"] < 20:
+            continue
+        if component["type"] in MULTI_TERM_COMPONENTS:
+            add("multi_term", component["type"],
+                f"{component['type']} takes {component['self_percent']}% of query time expanding terms; "
+                "anchor patterns, or use index_prefixes or the wildcard field type")
+        elif component["type"] in SCRIPT_COMPONENTS:
+            add("script", component["type"],
+                f"{component['type']} takes {component['self_percent']}% of query time; "
+                "index the computed value instead of evaluating a script per document")
+        elif component["dominant_phase"] == "score":
+            add("scoring", component["type"],
+                f"{component['type']} spends most time scoring; use filter context if relevance is not needed")
+    if summary.get("aggregation_ms", 0) > 2 * summary.get("query_ms", 0) and summary.get("aggregation_ms", 0) > 10:
+        add("aggregations", None,
+            "aggregations dominate; narrow the query or lower bucket sizes, and page large results with a composite aggregation")
+    return suggestions
@@ -0,0 +1,181 @@
+"""
+Shared serialization of tool responses.
+
+Formats:
+    json   - compact JSON (orjson when installed, stdlib json otherwise)
+    pretty - indented JSON, for human reading
+    table  - tab-separated columns for lists of records such as `_cat` output
+
+Every response is held to a byte budget. Oversized responses drop trailing
+records from their largest list and say so in a `_truncated` marker; text
+that still does not fit is cut with a trailing marker line.
+"""
+import json
+import os
+from typing import Any, Callable, List, Optional, Tuple
+
+from .env import env_int
+from .instrumentation import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+FORMATS = ("json", "pretty", "table")
+DEFAULT_FORMAT = "json"
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+
+def to_json(data: Any, pretty: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, default=str, option=option).decode("utf-8")
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return to_json(value)
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+def _is_records(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+def records_to_table(records: List[dict]) -> str:
+    """Render a list of flat records as a header row plus tab-separated rows."""
+    columns = []
+    seen = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    lines = ["\t".join(columns)]
+    lines.extend("\t".join(_cell(record.get(c)) for c in columns) for record in records)
+    return "\n".join(lines)
+
+
+def to_table(data: Any) -> str:
+    """
+    Tabular rendering: lists of records become tables, other top-level keys
+    become `key: value` lines. Anything else falls back to compact JSON.
+    """
+    if _is_records(data):
+        if list(data[-1]) == ["_truncated"]:
+            return records_to_table(data[:-1]) + f"\n# truncated: {to_json(data[-1]['_truncated'])}"
+        return records_to_table(data)
+    if isinstance(data, dict):
+        lines = []
+        for key, value in data.items():
+            if _is_records(value):
+                lines.append(f"{key}:")
+                lines.append(records_to_table(value))
+            else:
+                lines.append(f"{key}: {_cell(value)}")
+        return "\n".join(lines)
+    return to_json(data)
+
+
+def default_format() -> str:
+    return (os.getenv("OPENSEARCH_RESPONSE_FORMAT") or DEFAULT_FORMAT).strip().lower()
+
+
+def _encoder(fmt: str) -> Callable[[Any], str]:
+    if fmt == "pretty":
+        return lambda data: to_json(data, pretty=True)
+    if fmt == "table":
+        return to_table
+    if fmt == "json":
+        return to_json
+    raise ValueError(f"Unknown output format '{fmt}', expected one of {', '.join(FORMATS)}")
+
+
+def _largest_list(data: Any, path: Tuple = ()) -> Optional[Tuple[Tuple, list]]:
+    """Find the longest list in the top two levels of `data`, with its key path."""
+    if isinstance(data, list):
+        return path, data
+    best = None
+    if isinstance(data, dict) and len(path) < 2:
+        for key, value in data.items():
+            found = _largest_list(value, path + (key,))
+            if found and (best is None or len(found[1]) > len(best[1])):
+                best = found
+    return best
+
+
+def _replace_list(data: Any, path: Tuple, items: list, omitted: int) -> Any:
+    """Copy `data` with the list at `path` replaced and a truncation marker added."""
+    marker = {"omitted": omitted, "path": ".".join(map(str, path)) or "$"}
+    if not path:
+        return items + [{"_truncated": marker}]
+    result = dict(data)
+    node = result
+    for key in path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    node[path[-1]] = items
+    result["_truncated"] = marker
+    return result
+
+
+def _hard_cut(text: str, max_bytes: int) -> str:
+    encoded = text.encode("utf-8")
+    marker = f"\n...[truncated {len(encoded) - max_bytes} bytes]"
+    keep = max(0, max_bytes - len(marker.encode("utf-8")))
+    return encoded[:keep].decode("utf-8", errors="ignore") + marker
+
+
+def serialize(data: Any, fmt: Optional[str] = None, max_bytes: Optional[int] = None) -> str:
+    """
+    Serialize a tool response.
+
+    Args:
+        data: The response (dict, list or string). Strings are passed through.
+        fmt: One of FORMATS; defaults to OPENSEARCH_RESPONSE_FORMAT or json.
+        max_bytes: Byte budget; defaults to OPENSEARCH_MAX_RESPONSE_BYTES. 0 disables it.
+    """
+    with span("format"):
+        return _serialize(data, fmt, max_bytes)
+
+
+def _serialize(data: Any, fmt: Optional[str], max_bytes: Optional[int]) -> str:
+    if max_bytes is None:
+        max_bytes = env_int("OPENSEARCH_MAX_RESPONSE_BYTES", DEFAULT_MAX_BYTES)
+    if isinstance(data, str):
+        text = data
+    else:
+        encode = _encoder(fmt or default_format())
+        text = encode(data)
+        size = len(text.encode("utf-8"))
+        if max_bytes and size > max_bytes:
+            text = _fit(data, encode, max_bytes, size) or text
+    if max_bytes and len(text.encode("utf-8")) > max_bytes:
+        text = _hard_cut(text, max_bytes)
+    return text
+
+
+def _fit(data: Any, encode: Callable[[Any], str], max_bytes: int, size: int) -> Optional[str]:
+    """Binary-search the number of records of the largest list that fits the budget."""
+    found = _largest_list(data)
+    if not found or not found[1]:
+        return None
+    path, items = found
+    # Records are roughly uniform in size, so the proportional share of the
+    # budget bounds the search and keeps every trial encode small.
+    high = min(len(items), int(len(items) * max_bytes / size * 1.5) + 1)
+    low, best = 0, None
+    while low <= high:
+        keep = (low + high) // 2
+        text = encode(_replace_list(data, path, items[:keep], len(items) - keep))
+        if len(text.encode("utf-8")) <= max_bytes:
+            best, low = text, keep + 1
+        else:
+            high = keep - 1
+    return best
@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
+import asyncio
 import logging
 from fastmcp import FastMCP
+from .es_client import close_async_opensearch_clients, close_opensearch_client
+from .clusters import ClusterRouter, get_cluster_registry
+from .coalesce import get_single_flight
+from .instrumentation import InstrumentedMCP, get_metrics, start_metrics_server
+from .watcher import stop_cluster_watcher
 from .tools.index import IndexTools
 from .tools.document import DocumentTools
+from .tools.aggregation import AggregationTools
 from .tools.cluster import ClusterTools
 from .tools.dashboards import DashboardTools
+from .tools.cache import CacheTools
+from .tools.export import ExportTools
+from .tools.metrics import MetricsTools
+from .tools.multi_cluster import MultiClusterTools
 from .tools.es_admin.admin_index import AdminIndexTools
 from .tools.es_admin.admin_cluster import AdminClusterTools
 class OpensearchMCPServer:
@@ -27,22 +38,48 @@ class OpensearchMCPServer:
         # Initialize tool classes
         index_tools = IndexTools(self.logger)
         document_tools = DocumentTools(self.logger)
+        aggregation_tools = AggregationTools(self.logger)
         cluster_tools = ClusterTools(self.logger)
         dashboard_tools = DashboardTools(self.logger)
+        cache_tools = CacheTools(self.logger)
+        export_tools = ExportTools(self.logger)
+        metrics_tools = MetricsTools(self.logger)
+        multi_cluster_tools = MultiClusterTools(self.logger)
         admin_index_tools = AdminIndexTools(self.logger)
         admin_cluster_tools = AdminClusterTools(self.logger)
 
-        # Register tools from each module
-        index_tools.register_tools(self.mcp)
-        document_tools.register_tools(self.mcp)
-        cluster_tools.register_tools(self.mcp)
-        dashboard_tools.register_tools(self.mcp)
-        admin_index_tools.register_tools(self.mcp)
-        admin_cluster_tools.register_tools(self.mcp)
+        # Register tools from each module, measuring every call, sharing identical concurrent
+        # reads and routing each call to the cluster it names
+        mcp = InstrumentedMCP(self.mcp, get_metrics(), get_single_flight(), ClusterRouter(get_cluster_registry()))
+        index_tools.register_tools(mcp)
+        document_tools.register_tools(mcp)
+        aggregation_tools.register_tools(mcp)
+        cluster_tools.register_tools(mcp)
+        dashboard_tools.register_tools(mcp)
+        cache_tools.register_tools(mcp)
+        export_tools.register_tools(mcp)
+        metrics_tools.register_tools(mcp)
+        multi_cluster_tools.register_tools(mcp)
+        admin_index_tools.register_tools(mcp)
+        admin_cluster_tools.register_tools(mcp)
 
     def run(self):
         """Run the MCP server."""
-        self.mcp.run()
+        metrics_server = start_metrics_server(self.logger)
+        try:
+            asyncio.run(self._serve())
+        finally:
+            if metrics_server is not None:
+                metrics_server.stop()
+            stop_cluster_watcher()
+            close_opensearch_client()
+
+    async def _serve(self):
+        """Serve over stdio, then close the async clients while their event loop still runs."""
+        try:
+            await self.mcp.run_stdio_async()
+        finally:
+            await close_async_opensearch_clients()
 
 def main():
     server = OpensearchMCPServer()
@@ -0,0 +1,104 @@
+"""
+Grouping of `_tasks?detailed&group_by=parents` responses.
+
+With `group_by=parents` every top-level task carries its descendants under
+`children`. `iter_tasks` flattens that tree, remembering the root of each
+task, and `summarize_tasks` groups the result by action, node or root task
+with counts, total and maximum running time, and flags tasks running
+longer than a threshold.
+"""
+from typing import Any, Dict, Iterator, Optional
+
+GROUP_BY = ("action", "node", "parent")
+
+TASK_FIELDS = (
+    "node", "id", "action", "description", "start_time_in_millis", "running_time_in_nanos",
+    "cancellable", "cancelled", "parent_task_id",
+)
+TASKS_FILTER_PATH = ",".join(f"tasks.**.{field}" for field in TASK_FIELDS)
+
+MAX_DESCRIPTION = 200
+
+
+def _seconds(task: Dict[str, Any]) -> float:
+    return (task.get("running_time_in_nanos") or 0) / 1e9
+
+
+def iter_tasks(tasks: Dict[str, Any], root: Optional[str] = None, depth: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield every task of a `group_by=parents` tree with its id, root task id and depth."""
+    items = tasks.items() if isinstance(tasks, dict) else ((None, t) for t in tasks)
+    for task_id, task in items:
+        task_id = task_id or f"{task.get('node')}:{task.get('id')}"
+        yield {
+            "task_id": task_id,
+            "root": root or task_id,
+            "depth": depth,
+            "action": task.get("action"),
+            "node": task.get("node"),
+            "running_seconds": _seconds(task),
+            "cancellable": task.get("cancellable"),
+            "parent_task_id": task.get("parent_task_id"),
+            "description": task.get("description"),
+        }
+        yield from iter_tasks(task.get("children") or [], root or task_id, depth + 1)
+
+
+def summarize_tasks(
+    tasks: Dict[str, Any],
+    group_by: str = "action",
+    long_running_seconds: float = 60.0,
+    top: int = 20,
+) -> Dict[str, Any]:
+    """Group a `group_by=parents` task tree and list long-running top-level tasks."""
+    if group_by not in GROUP_BY:
+        raise ValueError(f"Unknown group_by '{group_by}', expected one of {', '.join(GROUP_BY)}")
+    groups: Dict[str, Dict[str, Any]] = {}
+    roots: Dict[str, Dict[str, Any]] = {}
+    total = 0
+    for task in iter_tasks(tasks):
+        total += 1
+        if task["depth"] == 0:
+            roots[task["task_id"]] = dict(task, children=0)
+        else:
+            roots[task["root"]]["children"] += 1
+        key = task["root"] if group_by == "parent" else task[group_by]
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {group_by: key, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "long_running": 0}
+            if group_by == "parent":
+                group["action"] = task["action"]
+        group["count"] += 1
+        group["total_seconds"] += task["running_seconds"]
+        group["max_seconds"] = max(group["max_seconds"], task["running_seconds"])
+        group["long_running"] += task["running_seconds"] >= long_running_seconds
+
+    rows = sorted(groups.values(), key=lambda g: g["total_seconds"], reverse=True)
+    for row in rows:
+        row["total_seconds"] = round(row["total_seconds"], 3)
+        row["max_seconds"] = round(row["max_seconds"], 3)
+
+    long_running = []
+    for task in sorted(roots.values(), key=lambda t: t["running_seconds"], reverse=True):
+        if task["running_seconds"] < long_running_seconds:
+            break
+        description = task["description"] or ""
+        long_running.append({
+            "task_id": task["task_id"],
+            "action": task["action"],
+            "node": task["node"],
+            "running_seconds": round(task["running_seconds"], 1),
+            "children": task["children"],
+            "cancellable": task["cancellable"],
+            "description": description[:MAX_DESCRIPTION] + ("..." if len(description) > MAX_DESCRIPTION else ""),
+        })
+
+    return {
+        "tasks": total,
+        "top_level_tasks": len(roots),
+        "long_running_threshold_seconds": long_running_seconds,
+        "long_running_count": len(long_running),
+        "group_by": group_by,
+        "groups": rows[:top],
+        "groups_omitted": max(0, len(rows) - top),
+        "long_running": long_running[:top],
+    }
@@ -0,0 +1,99 @@
+import logging
+from typing import Dict, Any, Optional, Union
+from ..aggregations import composite_after_keys, flatten_aggregations, resume_composite
+from ..es_client import OpensearchClient
+from ..serialization import serialize
+from mcp.types import TextContent
+
+AGGREGATE_FILTER_PATH = "took,timed_out,hits.total,aggregations"
+
+# Upper bound on composite pages fetched in one call, whatever max_rows says
+MAX_COMPOSITE_PAGES = 100
+
+class AggregationTools(OpensearchClient):
+    def register_tools(self, mcp: Any):
+        """Register aggregation-related tools."""
+
+        @mcp.tool(description="Run aggregations without fetching documents and return the buckets as a compact table")
+        async def aggregate(
+            index: str,
+            aggs: dict,
+            query: Optional[dict] = None,
+            track_total_hits: Union[bool, int] = False,
+            max_rows: int = 10000,
+            after: Optional[dict] = None,
+            output_format: str = "table",
+        ) -> list[TextContent]:
+            """
+            Compute statistics server-side instead of pulling raw documents.
+            Bucket sizes over the query cost guard's limit are lowered (reported under `guard`).
+            The search always runs with size 0, and nested buckets are flattened into one row
+            per leaf bucket: a column per bucket aggregation holding its key, the leaf doc_count
+            and a column per metric. Top-level composite aggregations are paged automatically
+            with their after_key until exhausted or max_rows is reached.
+
+            Args:
+                index: Name of the index or pattern.
+                aggs: Opensearch aggregations DSL, e.g. {"by_status": {"terms": {"field": "status"}}}.
+                query: Optional query DSL restricting the documents aggregated.
+                track_total_hits: False (fastest, default), True for an exact total, or a number to count accurately up to.
+                max_rows: Stop paging composite aggregations once this many rows are collected; the after_key to continue from is returned.
+                after: The after_key returned by a previous call, to continue its composite aggregations. Pass the
+                    same aggs and query; only the composite aggregations named in it are run.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info(f"Aggregating index: {index}")
+            try:
+                if after:
+                    aggs = resume_composite(aggs, after)
+                body: Dict[str, Any] = {"size": 0, "track_total_hits": track_total_hits, "aggs": aggs}
+                if query:
+                    body["query"] = query
+                body, report = await self._guard(index, body)
+                first_aggs = body["aggs"]
+
+                rows = []
+                pages = 0
+                took = 0
+                total = None
+                timed_out = False
+                while True:
+                    response = await self._run(lambda client: client.search(
+                        index=index, body=body, filter_path=AGGREGATE_FILTER_PATH
+                    ))
+                    pages += 1
+                    took += response.get("took", 0)
+                    timed_out = timed_out or response.get("timed_out", False)
+                    if total is None:
+                        total = response.get("hits", {}).get("total")
+                    response_aggs = response.get("aggregations", {})
+                    rows.extend(flatten_aggregations(response_aggs))
+
+                    after_keys = composite_after_keys(body["aggs"], response_aggs)
+                    if not after_keys or len(rows) >= max_rows or pages >= MAX_COMPOSITE_PAGES:
+                        break
+                    # Later pages only re-run the composite aggregations that still have buckets left
+                    body = dict(body, aggs={
+                        name: dict(first_aggs[name], composite=dict(first_aggs[name]["composite"], after=after_key))
+                        for name, after_key in after_keys.items()
+                    })
+
+                result = {
+                    "total_hits": total.get("value") if isinstance(total, dict) else total,
+                    "took": took,
+                    "pages": pages,
+                    "row_count": len(rows),
+                    "truncated": bool(after_keys),
+                }
+                if report and report["rewrites"]:
+                    result["guard"] = report["rewrites"]
+                result["rows"] = rows
+                if timed_out:
+                    result["timed_out"] = True
+                if after_keys:
+                    # Whole pages are kept, so this resumes exactly where the rows stop
+                    result["after_key"] = after_keys
+                return [TextContent(type="text", text=serialize(result, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error running aggregation: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -0,0 +1,39 @@
+import logging
+from typing import Dict, Any, Optional
+from ..cache import get_response_cache
+from ..es_client import OpensearchClient
+from ..serialization import serialize
+from mcp.types import TextContent
+
+class CacheTools(OpensearchClient):
+    def register_tools(self, mcp: Any):
+        """Register response-cache tools."""
+
+        @mcp.tool(description="Get response cache statistics")
+        async def get_cache_stats() -> list[TextContent]:
+            """
+            Get hit/miss counters, evictions, size and TTLs of the response cache used by
+            get_mapping, get_settings, list_indices and list_index_patterns.
+            """
+            self.logger.info("Getting cache stats")
+            cache = get_response_cache()
+            if cache is None:
+                return [TextContent(type="text", text="Response cache is disabled.")]
+            return [TextContent(type="text", text=serialize(cache.stats()))]
+
+        @mcp.tool(description="Invalidate cached mappings, settings, index lists and index patterns")
+        async def invalidate_cache(index: Optional[str] = None, tool: Optional[str] = None) -> list[TextContent]:
+            """
+            Drop cached responses so the next call reads fresh data from the cluster.
+            Use this after changing mappings, settings or index patterns.
+
+            Args:
+                index: Only drop entries for indices matching this name or wildcard pattern.
+                tool: Only drop entries of this tool, e.g. get_mapping.
+            """
+            self.logger.info(f"Invalidating cache (index={index}, tool={tool})")
+            cache = get_response_cache()
+            if cache is None:
+                return [TextContent(type="text", text="Response cache is disabled.")]
+            removed = cache.invalidate(tool=tool, index=index)
+            return [TextContent(type="text", text=f"Invalidated {removed} cached entries.")]
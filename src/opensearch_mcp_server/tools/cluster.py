@@ -1,38 +1,120 @@
 import logging
-from typing import Dict, Any
-from ..es_client import OpensearchClient
+from typing import Dict, Any, Optional
+from ..clusters import current_cluster
+from ..es_client import OpensearchClient, get_opensearch_client, resolve_filter_path
+from ..pagination import decode_cursor, encode_cursor
+from ..serialization import serialize
+from ..watcher import get_cluster_watcher
 from mcp.types import TextContent
 
+# Default projection of _cluster/stats; pass filter_path="" to get the full document
+CLUSTER_STATS_FILTER_PATH = ",".join([
+    "cluster_name",
+    "status",
+    "indices.count",
+    "indices.shards.total",
+    "indices.shards.primaries",
+    "indices.docs",
+    "indices.store.size_in_bytes",
+    "indices.segments.count",
+    "indices.segments.memory_in_bytes",
+    "nodes.count",
+    "nodes.versions",
+    "nodes.os.mem",
+    "nodes.process.cpu",
+    "nodes.jvm.mem",
+    "nodes.jvm.versions",
+    "nodes.plugins",
+    "nodes.fs",
+])
+
+# Longest a get_cluster_changes call may block waiting for something to change
+MAX_WAIT_SECONDS = 30.0
+FIRST_SAMPLE_TIMEOUT = 10.0
+
 class ClusterTools(OpensearchClient):
     def register_tools(self, mcp: Any):
         """Register cluster-related tools."""
         
         @mcp.tool(description="Get cluster health status")
-        async def get_cluster_health() -> list[TextContent]:
+        async def get_cluster_health(filter_path: Optional[str] = None) -> list[TextContent]:
             """
             Get health status of the Opensearch cluster.
             Returns information about the number of nodes, shards, etc.
+
+            Args:
+                filter_path: Response filter, e.g. "status,number_of_nodes,unassigned_shards". Omit or pass "" for the full response.
             """
             self.logger.info("Getting cluster health")
             try:
-                response = self.es_client.cluster.health()
-                return [TextContent(type="text", text=str(response))]
+                response = await self._run(lambda client: client.cluster.health(
+                    filter_path=resolve_filter_path(filter_path, None)
+                ))
+                return [TextContent(type="text", text=serialize(response))]
             except Exception as e:
                 self.logger.error(f"Error getting cluster health: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get cluster statistics")
-        async def get_cluster_stats() -> list[TextContent]:
+        async def get_cluster_stats(filter_path: Optional[str] = None) -> list[TextContent]:
             """
             Get statistics from a cluster wide perspective. 
             The API returns basic index metrics (shard numbers, store size, memory usage) and information 
             about the current nodes that form the cluster (number, roles, os, jvm versions, memory usage, cpu and installed plugins).
             https://opensearch.org/docs/latest/tuning-your-cluster/
+
+            Args:
+                filter_path: Response filter. Defaults to a summary of index, shard, document, store,
+                    memory, cpu and filesystem figures; pass "" for the full stats document.
             """
             self.logger.info("Getting cluster stats")
             try:
-                response = self.es_client.cluster.stats()
-                return [TextContent(type="text", text=str(response))]
+                response = await self._run(lambda client: client.cluster.stats(
+                    filter_path=resolve_filter_path(filter_path, CLUSTER_STATS_FILTER_PATH)
+                ))
+                return [TextContent(type="text", text=serialize(response))]
             except Exception as e:
                 self.logger.error(f"Error getting cluster stats: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Get cluster health, task and recovery changes since a cursor")
+        async def get_cluster_changes(
+            cursor: Optional[str] = None,
+            wait_seconds: float = 0,
+            output_format: Optional[str] = None,
+        ) -> list[TextContent]:
+            """
+            Report what changed in the cluster since the previous call, from a background watcher
+            that polls health, tasks and active recoveries. Prefer this over repeatedly calling
+            get_cluster_health, get_tasks and get_recovery_status while following an incident.
+
+            Without a cursor (or with an expired one) the full current state is returned.
+            With a cursor, only changes after it are returned: health transitions, top-level tasks
+            that started or finished, recoveries that started, changed stage or finished. Active
+            recoveries always report progress since the cursor, the observed transfer rate across
+            samples and the resulting ETA. Pass the returned `cursor` to the next call.
+
+            Args:
+                cursor: Cursor returned by the previous call.
+                wait_seconds: Wait up to this long (max 30) for a change before returning.
+                output_format: "json" (compact, default), "pretty" or "table".
+            """
+            self.logger.info(f"Getting cluster changes (cursor={'yes' if cursor else 'no'})")
+            try:
+                # The watcher thread polls outside any tool call, so bind it to this call's cluster
+                cluster = current_cluster()
+                watcher = get_cluster_watcher(cluster, lambda: get_opensearch_client(self.logger, cluster), self.logger)
+                watcher.ensure_running()
+                state = decode_cursor(cursor) if cursor else {}
+                since = state.get("sample")
+                if watcher.sample == 0:
+                    await watcher.wait_for_sample(0, FIRST_SAMPLE_TIMEOUT)
+                if since is not None and state.get("epoch") == watcher.epoch and wait_seconds > 0:
+                    # Awaited on the event loop so long polls do not hold workers of the cluster-call pool
+                    await watcher.wait_for_events(since, min(wait_seconds, MAX_WAIT_SECONDS))
+                changes = watcher.changes(since, state.get("epoch"))
+                result = {"cursor": encode_cursor({"epoch": watcher.epoch, "sample": changes["sample"]}), **changes}
+                return [TextContent(type="text", text=serialize(result, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error getting cluster changes: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
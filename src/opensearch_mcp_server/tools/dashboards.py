@@ -1,7 +1,7 @@
 import logging
-import json
 from typing import Dict, Any
 from ..es_client import OpensearchClient
+from ..serialization import serialize
 from mcp.types import TextContent
 from urllib.parse import urlencode
 
@@ -23,19 +23,24 @@ class DashboardTools(OpensearchClient):
             """
             self.logger.info("Searching for index patterns")
             try:
-                response = self.es_client.search(
-                    index=".kibana",
-                    body={
-                        '_source': ['index-pattern.title', '_id'],
-                        'query': {
-                            'term': {
-                                'type': 'index-pattern'
+                async def load():
+                    response = await self._run(lambda client: client.search(
+                        index=".kibana",
+                        filter_path="hits.hits._id,hits.hits._source",
+                        body={
+                            '_source': ['index-pattern.title', '_id'],
+                            'query': {
+                                'term': {
+                                    'type': 'index-pattern'
+                                }
                             }
                         }
-                    }
-                )
-                patterns = json.dumps([{hit["_source"]["index-pattern"]["title"]: hit["_id"].replace('index-pattern:', '')} 
-                            for hit in response["hits"]["hits"]], indent=4)
+                    ))
+                    patterns = serialize([{hit["_source"]["index-pattern"]["title"]: hit["_id"].replace('index-pattern:', '')}
+                                for hit in response.get("hits", {}).get("hits", [])])
+                    return patterns
+
+                patterns = await self._cached("list_index_patterns", load)
                 return [TextContent(type="text", text=(patterns))]
             except Exception as e:
                 self.logger.error(f"Error finding index patterns: {e}")
@@ -62,8 +67,11 @@ class DashboardTools(OpensearchClient):
             list[TextContent]: A list containing the generated URL or an error message.
             """
             self.logger.info("Generating Discover view URL")
-            config = self._get_es_config()
             try:
+                # Only the Dashboards host is needed; no OpenSearch client is created
+                config = self._get_es_config()
+                if not config["dashboards_host"]:
+                    raise ValueError("DASHBOARDS_HOST is not configured")
                 base_url = config["dashboards_host"] + "/app/data-explorer/discover#?" #"http[s]://host[:port]/app/data-explorer/discover#? + query_params"
                 query_params = {
                     "_g": "(filters:!(),refreshInterval:(pause:!t,value:0),time:(from:'"+from_time+"',to:'"+to_time+"'))",
@@ -1,49 +1,378 @@
+import asyncio
 import logging
-import json
-from typing import Dict, Any
-from ..es_client import OpensearchClient
+from typing import Dict, Any, List, Optional, Tuple
+from ..bulk import bulk_load, iter_actions, iter_ndjson
+from ..clusters import current_cluster
+from ..env import env_int
+from ..es_client import OpensearchClient, resolve_filter_path
+from ..pagination import decode_cursor, encode_cursor, page_body, pagination_filter_path, search_page
+from ..query_guard import QueryRejected, get_query_guard
+from ..search_profile import PROFILE_FILTER_PATH, field_types, suggest_fixes, summarize_profile
+from ..serialization import serialize
+from .index import MAPPING_FILTER_PATH
 from mcp.types import TextContent
 
+# Default projection of search responses; pass filter_path="" to get the raw response
+SEARCH_FILTER_PATH = ",".join([
+    "took",
+    "timed_out",
+    "terminated_early",
+    "hits.total",
+    "hits.max_score",
+    "hits.hits._id",
+    "hits.hits._score",
+    "hits.hits._source",
+    "hits.hits.sort",
+    "aggregations",
+    "pit_id",
+    "_scroll_id",
+])
+
+# Kept in every _msearch filter_path so each search keeps its slot and its failure stays visible
+MSEARCH_REQUIRED_PATHS = ("responses.status", "responses.error")
+MSEARCH_FILTER_PATH = ",".join(
+    list(MSEARCH_REQUIRED_PATHS)
+    + [f"responses.{path}" for path in SEARCH_FILTER_PATH.split(",") if path not in ("pit_id", "_scroll_id")]
+)
+
+
+def msearch_filter_path(filter_path: Optional[str]) -> Optional[str]:
+    """Resolve a multi_search filter_path and extend it with the per-search status and error."""
+    resolved = resolve_filter_path(filter_path, MSEARCH_FILTER_PATH)
+    if resolved is None:
+        return None
+    paths = resolved.split(",")
+    return ",".join(paths + [path for path in MSEARCH_REQUIRED_PATHS if path not in paths])
+
+
+def format_search_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract hits, scores and aggregations from a raw search response."""
+    # filter_path omits keys that are empty or filtered out, so nothing here is assumed present
+    hits = response.get('hits', {})
+    total = hits.get('total')
+    formatted_response = {
+        'total_hits': total.get('value') if isinstance(total, dict) else total,
+        'max_score': hits.get('max_score'),
+        'hits': []
+    }
+
+    # Process each hit
+    for hit in hits.get('hits', []):
+        hit_data = {
+            '_id': hit.get('_id'),
+            '_score': hit.get('_score'),
+            'source': hit.get('_source')
+        }
+        formatted_response['hits'].append(hit_data)
+
+    # Include aggregations if present
+    if 'aggregations' in response:
+        formatted_response['aggregations'] = response['aggregations']
+
+    # Flag partial results cut short by the search timeout or terminate_after
+    for flag in ('timed_out', 'terminated_early'):
+        if response.get(flag):
+            formatted_response[flag] = True
+
+    return formatted_response
+
+
+def with_guard_report(formatted_response: Dict[str, Any], report: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Tell the caller how the cost guard changed the request, when it did."""
+    if report and (report["rewrites"] or "matched_docs" in report):
+        formatted_response['guard'] = report
+    return formatted_response
+
+
+def match_msearch_responses(
+    searches: List[Dict[str, Any]],
+    checked: List[Tuple[Optional[Dict[str, Any]], Any]],
+    responses: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Pair each search with its _msearch response, in order. `checked` holds the guarded body of
+    every search, or None and the rejection for searches that were not sent.
+    """
+    sent = sum(body is not None for body, _ in checked)
+    if len(responses) != sent:
+        raise ValueError(
+            f"_msearch returned {len(responses)} responses for {sent} searches; "
+            "they cannot be matched to their queries"
+        )
+    items = iter(responses)
+    results = []
+    for search, (body, report) in zip(searches, checked):
+        if body is None:
+            results.append({'index': search['index'], 'status': None, 'error': report})
+            continue
+        item = next(items)
+        if 'error' in item:
+            error = item['error']
+            results.append({
+                'index': search['index'],
+                'status': item.get('status'),
+                'error': error.get('reason', error) if isinstance(error, dict) else error,
+            })
+        else:
+            results.append({'index': search['index'], **with_guard_report(format_search_response(item), report)})
+    return results
+
+
 class DocumentTools(OpensearchClient):
     def register_tools(self, mcp: Any):
         """Register document-related tools."""
 
         @mcp.tool(description="Search documents in an opensearch index with a custom query")
-        async def search_documents(index: str, body: dict) -> list[TextContent]:
+        async def search_documents(
+            index: str,
+            body: dict,
+            page_size: Optional[int] = None,
+            cursor: Optional[str] = None,
+            output_format: Optional[str] = None,
+            source_includes: Optional[list[str]] = None,
+            source_excludes: Optional[list[str]] = None,
+            filter_path: Optional[str] = None,
+        ) -> list[TextContent]:
             """
             Search documents in a specified opensearch index using a custom query.
-            
+
+            The body is checked by the query cost guard first: oversized `size` and bucket
+            counts are lowered (reported under `guard`), and leading wildcards, disallowed
+            indices and unbounded searches of time-series indices are rejected. Use
+            estimate_query_cost to check a body without running it.
+
+            For large result sets, set page_size to read hits page by page. The response
+            then contains a `next_cursor` token; pass it back as `cursor` to get the next
+            page until `next_cursor` is null. Pages are read with a point-in-time and
+            search_after (scroll on clusters without point-in-time support).
+
             Args:
                 index: Name of the index to search
                 body: Opensearch query DSL. If size is not specified, defaults to 20 results.
+                page_size: Enable paginated mode with this many hits per page (max 1000).
+                cursor: Continuation token from a previous page. Index and body are taken from the cursor.
+                output_format: "json" (compact, default), "pretty" or "table" (one row per hit).
+                source_includes: Only return these _source fields (wildcards allowed). Prefer this over full documents.
+                source_excludes: Drop these _source fields.
+                filter_path: Response filter; defaults to hits, scores, sort values and aggregations. "" returns the raw response.
             """
+            params = {
+                '_source_includes': source_includes or None,
+                '_source_excludes': source_excludes or None,
+                'filter_path': resolve_filter_path(filter_path, SEARCH_FILTER_PATH),
+            }
+            if page_size is not None or cursor is not None:
+                return await paginated_search(index, body, page_size, cursor, output_format, params)
+
             # Ensure reasonable default size limit is set
             if 'size' not in body:
                 body['size'] = 20
             self.logger.info(f"Searching in index: {index} with query: {body}")
             try:
-                response = self.es_client.search(index=index, body=body)
-                # Extract and format relevant information
-                formatted_response = {
-                    'total_hits': response['hits']['total']['value'],
-                    'max_score': response['hits']['max_score'],
-                    'hits': []
-                }
-
-                # Process each hit
-                for hit in response['hits']['hits']:
-                    hit_data = {
-                        '_id': hit['_id'],
-                        '_score': hit['_score'],
-                        'source': hit['_source']
-                    }
-                    formatted_response['hits'].append(hit_data)
-
-                # Include aggregations if present
-                if 'aggregations' in response:
-                    formatted_response['aggregations'] = response['aggregations']
-
-                return [TextContent(type="text", text=json.dumps(formatted_response, indent=2))]
+                body, report = await self._guard(index, body)
+                response = await self._run(lambda client: client.search(index=index, body=body, **params))
+                formatted_response = with_guard_report(format_search_response(response), report)
+                return [TextContent(type="text", text=serialize(formatted_response, output_format))]
             except Exception as e:
                 self.logger.error(f"Error searching documents: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        async def paginated_search(
+            index: str, body: dict, page_size: Optional[int], cursor: Optional[str],
+            output_format: Optional[str], params: Dict[str, Any]
+        ) -> list[TextContent]:
+            self.logger.info(f"Paginated search in index: {index} (cursor={'yes' if cursor else 'no'})")
+            try:
+                cluster = current_cluster()
+                state = decode_cursor(cursor, cluster) if cursor else None
+                params = dict(params, filter_path=pagination_filter_path(params.get('filter_path')))
+                report = None
+                if state is None:
+                    # The page size counts against the guard's size limit like `size` does
+                    body, report = await self._guard(index, dict(body, size=page_size or 100))
+                    page_size = body["size"]
+                elif state.get("body") is not None:
+                    # Later pages run the body stored in the cursor; hold it to the current limits too
+                    checked, _ = await self._guard(state["index"], dict(state["body"], size=state["size"]), preflight=False)
+                    state = dict(state, body=page_body(checked), size=checked.get("size", state["size"]))
+                response, next_state = await self._run_blocking(
+                    lambda: search_page(self.es_client, index, body, page_size or 100, state, params=params)
+                )
+                formatted_response = with_guard_report(format_search_response(response), report)
+                if next_state:
+                    next_state.update(cluster=cluster, index=next_state.get("index", index))
+                formatted_response['next_cursor'] = encode_cursor(next_state) if next_state else None
+                return [TextContent(type="text", text=serialize(formatted_response, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error searching documents: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Run several searches in a single _msearch round trip")
+        async def multi_search(
+            searches: list[dict],
+            max_concurrent_searches: Optional[int] = None,
+            output_format: Optional[str] = None,
+            filter_path: Optional[str] = None,
+        ) -> list[TextContent]:
+            """
+            Run several searches, against the same or different indices, in one request.
+            Prefer this over consecutive search_documents calls. A failing search does not
+            affect the others; its entry carries the error instead of hits. Searches rejected
+            by the query cost guard are not sent and carry the rejection as their error.
+
+            Args:
+                searches: List of {"index": str, "body": dict} objects. Each body is Opensearch
+                    query DSL; if size is not specified, defaults to 20 results.
+                max_concurrent_searches: Maximum searches the cluster runs in parallel for this request.
+                    Defaults to OPENSEARCH_MAX_CONCURRENT_SEARCHES (5).
+                output_format: "json" (compact, default), "pretty" or "table".
+                filter_path: Response filter applied to the whole _msearch response; responses.status and
+                    responses.error are always kept. "" returns raw responses.
+            """
+            self.logger.info(f"Running multi search with {len(searches)} searches")
+            try:
+                async def guarded(search: Dict[str, Any]):
+                    body = dict(search.get('body') or {})
+                    body.setdefault('size', 20)
+                    try:
+                        return await self._guard(search['index'], body)
+                    except QueryRejected as e:
+                        return None, str(e)
+
+                # Searches rejected by the cost guard are reported in place and never sent
+                checked = await asyncio.gather(*(guarded(search) for search in searches))
+                lines = []
+                for search, (body, _) in zip(searches, checked):
+                    if body is not None:
+                        lines.append({'index': search['index']})
+                        lines.append(body)
+                max_concurrent = max_concurrent_searches or env_int("OPENSEARCH_MAX_CONCURRENT_SEARCHES", 5)
+                response = {'responses': []}
+                if lines:
+                    response = await self._run(lambda client: client.msearch(
+                        body=lines,
+                        max_concurrent_searches=max_concurrent,
+                        filter_path=msearch_filter_path(filter_path),
+                    ))
+
+                results = match_msearch_responses(searches, checked, response.get('responses', []))
+                return [TextContent(type="text", text=serialize({'responses': results}, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error running multi search: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Check a search body against the query cost guard without running it")
+        async def estimate_query_cost(index: str, body: dict) -> list[TextContent]:
+            """
+            Run the query cost guard's checks on a search body and report what search_documents
+            would do with it: whether it is accepted, the rewrites applied (size and bucket
+            limits, time range, timeout), the estimated aggregation buckets, the number of
+            matching documents (`_count`) and Lucene's explanation of the rewritten query
+            (`_validate/query?explain`), which shows costly expansions such as wildcards.
+
+            Args:
+                index: Name of the index or pattern.
+                body: Opensearch query DSL as it would be passed to search_documents.
+            """
+            self.logger.info(f"Estimating query cost on index: {index}")
+            try:
+                if get_query_guard() is None:
+                    return [TextContent(type="text", text="Query cost guard is disabled.")]
+                body = dict(body)
+                body.setdefault('size', 20)
+                try:
+                    checked, report = await self._guard(index, body, preflight=True)
+                    result = {'accepted': True, **report, 'body': checked}
+                except QueryRejected as e:
+                    result = {'accepted': False, 'reason': str(e)}
+                return [TextContent(type="text", text=serialize(result, "pretty"))]
+            except Exception as e:
+                self.logger.error(f"Error estimating query cost: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Profile a search and summarize where its time goes, with tuning suggestions")
+        async def profile_search(
+            index: str,
+            body: dict,
+            top: int = 10,
+            output_format: str = "table",
+        ) -> list[TextContent]:
+            """
+            Run a search with `profile: true` and summarize the profile instead of returning
+            the raw per-shard tree: `took`, the slowest shards with their query, rewrite,
+            collector and aggregation time, and the most expensive query components,
+            collectors and aggregations merged across shards and ranked by self time (time
+            not spent in child components), with the phase that dominates each.
+
+            The index mapping is read alongside to suggest common fixes: term-level clauses
+            that could run in filter context, term queries on analyzed text fields, match
+            queries on keyword fields, aggregations and sorts on text fields, unrounded `now`
+            in date ranges, and costly wildcard or script components. Hits are not returned;
+            the body goes through the query cost guard like search_documents.
+
+            Args:
+                index: Name of the index or pattern to search.
+                body: Opensearch query DSL, as passed to search_documents.
+                top: Number of shards, components, collectors and aggregations to list.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info(f"Profiling search in index: {index}")
+            try:
+                # profile is set before the guard so it does not cap the profiled query with terminate_after
+                body, report = await self._guard(index, dict(body, profile=True))
+                response, mapping = await asyncio.gather(
+                    self._run(lambda client: client.search(index=index, body=body, filter_path=PROFILE_FILTER_PATH)),
+                    self._run(lambda client: client.indices.get_mapping(index=index, filter_path=MAPPING_FILTER_PATH)),
+                )
+                summary = summarize_profile(response, top)
+                summary['suggestions'] = suggest_fixes(body, field_types(mapping), summary)
+                if report and report["rewrites"]:
+                    summary['guard_rewrites'] = report["rewrites"]
+                return [TextContent(type="text", text=serialize(summary, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error profiling search: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Bulk index NDJSON documents from inline text or a local file")
+        async def bulk_index(
+            index: str,
+            ndjson: Optional[str] = None,
+            path: Optional[str] = None,
+            op_type: str = "index",
+            id_field: Optional[str] = None,
+            chunk_docs: int = 500,
+            chunk_bytes: int = 5 * 1024 * 1024,
+            workers: int = 4,
+            max_retries: int = 3,
+        ) -> list[TextContent]:
+            """
+            Index documents with the _bulk API. Input is NDJSON, one document per line, or _bulk
+            API action/document line pairs, given inline or as a path to a local file. Files are streamed, so multi-GB loads work.
+            Documents are sent in chunks by parallel workers; 429 rejections are retried with backoff.
+            Returns totals, throughput, per-chunk timings and errors grouped by type.
+
+            Args:
+                index: Target index. Action lines ({"index": {...}}, "create", "update", "delete") may set their own _index.
+                ndjson: Inline NDJSON documents. Provide either ndjson or path.
+                path: Path to a local NDJSON file.
+                op_type: "index" (create or replace) or "create" (fail if the id exists).
+                id_field: Use this document field as the document _id.
+                chunk_docs: Maximum documents per _bulk request.
+                chunk_bytes: Approximate maximum bytes per _bulk request.
+                workers: Number of _bulk requests in flight at once.
+                max_retries: Retries per chunk for 429 (too many requests) rejections.
+            """
+            self.logger.info(f"Bulk indexing into {index} from {'file ' + path if path else 'inline NDJSON'}")
+            try:
+                actions = iter_actions(iter_ndjson(ndjson=ndjson, path=path), index, op_type=op_type, id_field=id_field)
+                summary = await self._run_blocking(
+                    bulk_load, self.es_client, actions, max(1, chunk_docs), max(1, chunk_bytes),
+                    max(1, workers), max_retries
+                )
+                self.logger.info(
+                    f"Bulk indexed {summary['indexed']}/{summary['docs']} documents into {index} in {summary['seconds']}s"
+                )
+                return [TextContent(type="text", text=serialize(summary))]
+            except Exception as e:
+                self.logger.error(f"Error bulk indexing: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -1,6 +1,12 @@
+import io
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from ...clusters import current_cluster
 from ...es_client import OpensearchClient
+from ...hot_threads import HOT_THREADS_TYPES, aggregate_stacks, parse_hot_threads
+from ...serialization import serialize
+from ...tasks import TASKS_FILTER_PATH, summarize_tasks
+from ...watcher import peek_cluster_watcher
 from mcp.types import TextContent
 
 class AdminClusterTools(OpensearchClient):
@@ -8,54 +14,85 @@ class AdminClusterTools(OpensearchClient):
         """Register administrative cluster related tools."""
         
         @mcp.tool(description="Check hot threads on nodes")
-        async def get_hot_threads() -> list[TextContent]:
+        async def get_hot_threads(
+            threads: int = 3,
+            interval: str = "500ms",
+            snapshots: int = 10,
+            type: str = "cpu",
+            nodes: Optional[str] = None,
+            top: int = 10,
+            max_frames: int = 10,
+            include_threads: bool = False,
+            output_format: Optional[str] = None,
+        ) -> list[TextContent]:
             """
-            Get hot threads information from all nodes, filtering for CPU percentage data.
-            Returns only thread information containing percentage signs, indicating CPU usage.
-            If no threads show percentage usage, indicates no hot threads were found.
+            Sample the busiest threads on every node and rank the hottest code paths cluster-wide.
+            Stacks with identical top frames are merged across threads, nodes and snapshots; each
+            carries its summed CPU share, how often and on how many nodes it was seen, and the
+            thread pools involved. The busiest individual threads are listed as well.
+
+            Args:
+                threads: Busiest threads sampled per node.
+                interval: Sampling interval per snapshot, e.g. "500ms" or "1s".
+                snapshots: Stack snapshots taken per thread.
+                type: What to measure: "cpu", "wait" or "block".
+                nodes: Comma-separated node IDs or names to sample; defaults to all nodes.
+                top: Number of hot stacks and busiest threads returned.
+                max_frames: Top stack frames kept per stack; stacks are merged on these frames.
+                include_threads: Also return every parsed per-thread stack record.
+                output_format: "json" (compact, default), "pretty" or "table".
             """
-            self.logger.info("Fetching hot threads information...")
+            self.logger.info(f"Fetching hot threads ({type}, {threads} threads, interval {interval})...")
             try:
-                response = self.es_client.transport.perform_request(
-                    'GET',
-                    '/_nodes/hot_threads'
-                )
-                # Filter lines containing '%'
-                hot_lines = [line for line in str(response).split('\n') if '%' in line]
-                
-                if hot_lines:
-                    return [TextContent(type="text", text='\n'.join(hot_lines))]
-                else:
+                if type not in HOT_THREADS_TYPES:
+                    raise ValueError(f"Unknown hot threads type '{type}', expected one of {', '.join(HOT_THREADS_TYPES)}")
+                response = await self._run(lambda client: client.nodes.hot_threads(
+                    node_id=nodes, threads=threads, interval=interval, snapshots=snapshots, doc_type=type
+                ))
+                records = list(parse_hot_threads(io.StringIO(str(response)), max_frames=max(1, max_frames)))
+                if not records:
                     return [TextContent(type="text", text="No hot threads detected in the cluster.")]
+                result = aggregate_stacks(records, top=max(1, top))
+                if include_threads:
+                    result["thread_stacks"] = records
+                return [TextContent(type="text", text=serialize(result, output_format))]
             except Exception as e:
                 self.logger.error(f"Error fetching hot threads: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get current tasks in cluster")
-        async def get_tasks() -> list[TextContent]:
+        async def get_tasks(
+            actions: Optional[str] = None,
+            nodes: Optional[str] = None,
+            group_by: str = "action",
+            long_running_seconds: float = 60.0,
+            top: int = 20,
+            output_format: str = "table",
+        ) -> list[TextContent]:
             """
-            Get current tasks running in the cluster.
-            Filters duplicate task types to show only unique operations.
+            Get the tasks running in the cluster, grouped by action, node or parent task, with
+            counts, total and maximum running time. Top-level tasks running longer than
+            long_running_seconds are listed with their description and number of child tasks.
+
+            Args:
+                actions: Only tasks whose action matches these comma-separated patterns, e.g. "*search*,*reindex".
+                    Filtered by the cluster, so prefer this on large clusters.
+                nodes: Only tasks on these comma-separated node IDs or names.
+                group_by: "action", "node" or "parent" (a top-level task with all its child tasks).
+                long_running_seconds: Flag tasks running at least this long.
+                top: Maximum groups and long-running tasks returned.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
             """
-            self.logger.info("Fetching cluster tasks...")
+            self.logger.info(f"Fetching cluster tasks (actions={actions}, nodes={nodes}, group_by={group_by})...")
             try:
-                response = self.es_client.cat.tasks(v=True)
-                lines = response.split('\n')
-                seen_tasks = set()
-                filtered_lines = []
-                
-                for line in lines:
-                    if not line.strip():
-                        continue
-                    task_type = line.split()[0]
-                    if task_type not in seen_tasks:
-                        seen_tasks.add(task_type)
-                        filtered_lines.append(line)
-                        
-                if filtered_lines:
-                    return [TextContent(type="text", text='\n'.join(filtered_lines))]
-                else:
+                response = await self._run(lambda client: client.tasks.list(
+                    actions=actions, nodes=nodes, detailed=True, group_by="parents", filter_path=TASKS_FILTER_PATH
+                ))
+                tasks = response.get("tasks") or {}
+                if not tasks:
                     return [TextContent(type="text", text="No tasks currently running in the cluster.")]
+                result = summarize_tasks(tasks, group_by, long_running_seconds, max(1, top))
+                return [TextContent(type="text", text=serialize(result, output_format))]
             except Exception as e:
                 self.logger.error(f"Error fetching tasks: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -69,11 +106,12 @@ class AdminClusterTools(OpensearchClient):
             self.logger.info("Fetching recovery status...")
             try:
                 # Get active recoveries with detailed stats
-                response = self.es_client.cat.recovery(format='json', active_only=True, v=True)
-                
+                response = await self._run(lambda client: client.cat.recovery(
+                    format='json', active_only=True, bytes='b', time='ms'
+                ))
                 if not response:
                     # Get cluster health to show overall shard status if no active recoveries
-                    health = self.es_client.cluster.health()
+                    health = await self._run(lambda client: client.cluster.health())
                     total_shards = health['active_shards'] + health['unassigned_shards'] + health['initializing_shards']
                     active_pct = (health['active_shards'] / total_shards) * 100 if total_shards > 0 else 100
                     
@@ -95,30 +133,37 @@ class AdminClusterTools(OpensearchClient):
                     # Calculate progress and time remaining
                     files_pct = float(recovery.get('files_percent', '0').rstrip('%'))
                     bytes_pct = float(recovery.get('bytes_percent', '0').rstrip('%'))
-                    total_bytes = int(recovery.get('total_bytes', 0))
-                    bytes_recovered = int(recovery.get('recovered_in_bytes', 0))
-                    
-                    # Parse time value which can be in format like "1.2s" or "3m" or "2.5h"
-                    time_str = recovery.get('time', '0s')
+                    # bytes=b and time=ms make these plain numbers
+                    total_bytes = int(recovery.get('bytes_total') or 0)
+                    bytes_recovered = int(recovery.get('bytes_recovered') or 0)
                     try:
-                        # Convert time string to milliseconds
-                        if time_str.endswith('ms'):
-                            time_spent_ms = float(time_str[:-2])
-                        elif time_str.endswith('s'):
-                            time_spent_ms = float(time_str[:-1]) * 1000
-                        elif time_str.endswith('m'):
-                            time_spent_ms = float(time_str[:-1]) * 60 * 1000
-                        elif time_str.endswith('h'):
-                            time_spent_ms = float(time_str[:-1]) * 60 * 60 * 1000
-                        else:
-                            time_spent_ms = 0
+                        time_spent_ms = float(recovery.get('time') or 0)
                     except ValueError:
                         time_spent_ms = 0
-                    
+
+                    # Prefer the rate observed across recent watcher samples of this very recovery
+                    # over this single sample
+                    watcher = peek_cluster_watcher(current_cluster())
+                    observed = watcher.observed_rate(
+                        index, shard, recovery.get('source_node'), recovery.get('target_node')
+                    ) if watcher else None
+                    remaining_bytes = max(0, total_bytes - bytes_recovered)
+
                     # Calculate recovery rate and estimated time remaining
-                    if bytes_recovered > 0 and time_spent_ms > 0:
-                        rate_mb_sec = (bytes_recovered / 1024 / 1024) / (time_spent_ms / 1000)
-                        remaining_bytes = total_bytes - bytes_recovered
+                    if observed and observed[0] <= 0 and remaining_bytes:
+                        recovery_info = (
+                            f"Index: {index}, Shard: {shard}\n"
+                            f"Stage: {stage}\n"
+                            f"Progress: files={files_pct:.1f}%, bytes={bytes_pct:.1f}%\n"
+                            f"Rate: stalled, no bytes recovered over {observed[1]} samples\n"
+                            "Est. time remaining: unknown\n"
+                        )
+                    elif observed or (bytes_recovered > 0 and time_spent_ms > 0):
+                        rate_source = f" (observed over {observed[1]} samples)" if observed else ""
+                        if observed:
+                            rate_mb_sec = max(0.0, observed[0]) / 1024 / 1024
+                        else:
+                            rate_mb_sec = (bytes_recovered / 1024 / 1024) / (time_spent_ms / 1000)
                         est_seconds_remaining = (remaining_bytes / 1024 / 1024) / rate_mb_sec if rate_mb_sec > 0 else 0
                         
                         # Format time remaining in a human-readable way
@@ -133,7 +178,7 @@ class AdminClusterTools(OpensearchClient):
                             f"Index: {index}, Shard: {shard}\n"
                             f"Stage: {stage}\n"
                             f"Progress: files={files_pct:.1f}%, bytes={bytes_pct:.1f}%\n"
-                            f"Rate: {rate_mb_sec:.1f} MB/sec\n"
+                            f"Rate: {rate_mb_sec:.1f} MB/sec{rate_source}\n"
                             f"Est. time remaining: {time_remaining}\n"
                         )
                     else:
@@ -146,7 +191,7 @@ class AdminClusterTools(OpensearchClient):
                     
                     summary.append(recovery_info)
                 
-                return [TextContent(type="text", text="\n".join(summary))]
+                return [TextContent(type="text", text=serialize("\n".join(summary)))]
                 
             except Exception as e:
                 self.logger.error(f"Error fetching recovery status: {e}")
@@ -1,81 +1,241 @@
+import asyncio
 import logging
-from typing import Dict, Any
-from ...es_client import OpensearchClient
+from typing import Dict, Any, List, Optional
+from ...capacity import (
+    INDEX_COLUMNS, SEGMENT_COLUMNS, SETTINGS_FILTER_PATH, STATS_FILTER_PATH, STATS_METRICS, analyze_capacity,
+)
+from ...es_client import OpensearchClient, request_params, resolve_filter_path
+from ...serialization import serialize
 from mcp.types import TextContent
 
+ISM_POLICIES_FILTER_PATH = "policies.policy.policy_id,policies.policy.description,policies.policy.states,policies.policy.ism_template.index_patterns"
+INDEX_TEMPLATES_FILTER_PATH = ",".join(
+    ["index_templates.name"]
+    + [f"index_templates.index_template.{field}" for field in ("index_patterns", "priority", "composed_of", "data_stream", "template.aliases")]
+    + [f"index_templates.index_template.template.settings.index.{setting}" for setting in (
+        "number_of_shards", "number_of_replicas", "auto_expand_replicas", "refresh_interval", "codec",
+        "plugins.index_state_management.rollover_alias",
+    )]
+)
+
+SHARD_COLUMNS = "index,shard,prirep,state,docs,store,node"
+MAX_SHARD_ROWS = 5000
+
+# A node is hot when it holds this much more than the per-node mean of bytes or shards
+HOT_NODE_RATIO = 1.25
+
+
+def _number(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def summarize_shards(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-node shard counts, bytes, docs and skew of a `_cat/shards` response, in one pass."""
+    nodes: Dict[str, Dict[str, Any]] = {}
+    states: Dict[str, int] = {}
+    indices = set()
+    unassigned = 0
+    for row in rows:
+        indices.add(row.get("index"))
+        state = row.get("state") or "UNKNOWN"
+        states[state] = states.get(state, 0) + 1
+        node = row.get("node")
+        if not node:
+            unassigned += 1
+            continue
+        # Relocating shards read "source -> ip id target"; count them on the source
+        node = node.split(" -> ")[0]
+        stats = nodes.get(node)
+        if stats is None:
+            stats = nodes[node] = {"node": node, "shards": 0, "primaries": 0, "bytes": 0, "docs": 0}
+        stats["shards"] += 1
+        stats["primaries"] += row.get("prirep") == "p"
+        stats["bytes"] += _number(row.get("store"))
+        stats["docs"] += _number(row.get("docs"))
+
+    per_node = sorted(nodes.values(), key=lambda n: n["bytes"], reverse=True)
+    mean_bytes = sum(n["bytes"] for n in per_node) / len(per_node) if per_node else 0
+    mean_shards = sum(n["shards"] for n in per_node) / len(per_node) if per_node else 0
+    for stats in per_node:
+        stats["bytes_vs_mean"] = round(stats["bytes"] / mean_bytes, 2) if mean_bytes else None
+        stats["shards_vs_mean"] = round(stats["shards"] / mean_shards, 2) if mean_shards else None
+        stats["hot"] = bool(
+            (mean_bytes and stats["bytes"] > mean_bytes * HOT_NODE_RATIO)
+            or (mean_shards and stats["shards"] > mean_shards * HOT_NODE_RATIO)
+        )
+
+    return {
+        "indices": len(indices),
+        "shards": len(rows),
+        "unassigned": unassigned,
+        "states": states,
+        "nodes": len(per_node),
+        "bytes_skew": per_node[0]["bytes_vs_mean"] if per_node else None,
+        "shards_skew": max((n["shards_vs_mean"] or 0 for n in per_node), default=None),
+        "hot_nodes": [n["node"] for n in per_node if n["hot"]],
+        "per_node": per_node,
+    }
+
+
 class AdminIndexTools(OpensearchClient):
     def register_tools(self, mcp: Any):
         """Register administrative index-related tools."""
         
         @mcp.tool(description="Get ISM policies and their configurations")
-        async def get_ism_policies() -> list[TextContent]:
+        async def get_ism_policies(filter_path: Optional[str] = None) -> list[TextContent]:
             """
             Get Index State Management policies and their configurations.
             Returns policy IDs, descriptions, states, and index patterns.
             This result should be useful in determining index lifecycle management configurations such as index size limits, index rollover policy
             and retention policy.
+
+            Args:
+                filter_path: Response filter; defaults to policy IDs, descriptions, states and index patterns.
             """
             self.logger.info("Fetching ISM policies...")
             try:
-                response = self.es_client.transport.perform_request(
+                response = await self._run(lambda client: client.transport.perform_request(
                     'GET',
                     '/_plugins/_ism/policies',
-                    params={'filter_path': 'policies.policy.policy_id,policies.policy.description,policies.policy.states,policies.policy.ism_template.index_patterns'}
-                )
-                return [TextContent(type="text", text=str(response))]
+                    params=request_params(filter_path=resolve_filter_path(filter_path, ISM_POLICIES_FILTER_PATH))
+                ))
+                return [TextContent(type="text", text=serialize(response))]
             except Exception as e:
                 self.logger.error(f"Error fetching ISM policies: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get index template configurations")
-        async def get_index_templates() -> list[TextContent]:
+        async def get_index_templates(filter_path: Optional[str] = None) -> list[TextContent]:
             """
             Get index templates and their configurations.
-            Returns template names and their configured number of shards.
+            Returns template names, index patterns, priority, component templates, aliases and
+            the settings that shape new indices: shard and replica counts, replica auto-expansion,
+            refresh interval, codec and the ISM rollover alias.
             This helps understand how new indices will be created.
+
+            Args:
+                filter_path: Response filter; defaults to the fields above. "" returns the full templates.
             """
             self.logger.info("Fetching index templates...")
             try:
-                response = self.es_client.transport.perform_request(
+                response = await self._run(lambda client: client.transport.perform_request(
                     'GET',
                     '/_index_template',
-                    params={'filter_path': ' _index_template?filter_path=index_templates.name,index_templates.index_template.index_patterns,index_templates.index_template.template.settings.index.number_of_shards'}
-                )
-                return [TextContent(type="text", text=str(response))]
+                    params=request_params(filter_path=resolve_filter_path(filter_path, INDEX_TEMPLATES_FILTER_PATH))
+                ))
+                return [TextContent(type="text", text=serialize(response))]
             except Exception as e:
                 self.logger.error(f"Error fetching index templates: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get index shard allocation distribution")
-        async def get_shard_allocation(latest_index: str) -> list[TextContent]:
+        async def get_shard_allocation(
+            latest_index: Optional[str] = None,
+            include_rows: bool = False,
+            offset: int = 0,
+            page_size: int = 500,
+            output_format: str = "table",
+        ) -> list[TextContent]:
             """
-            Get the current index shard allocation distribution across nodes.
-            Returns index name, shard number, primary/replica status, and node assignment.
-            This helps understand how shards are distributed across the cluster.
+            Get the current shard allocation across nodes, summarized per node: shard and primary
+            counts, store bytes and docs, and skew against the cluster mean. Nodes holding
+            noticeably more bytes or shards than average are flagged as hot. Unassigned shards are
+            counted separately. Raw per-shard rows are only returned when include_rows is set.
 
             Args:
-            latest_index: The most recent index of interest.
+                latest_index: Only analyze shards of this index or wildcard pattern (comma-separated allowed).
+                    Omit to analyze every index.
+                include_rows: Also return per-shard rows (index, shard, prirep, state, docs, store, node).
+                offset: First row to return when include_rows is set; must not be negative. The response
+                    carries the total row count, so an offset past the end is recognisable.
+                page_size: Rows per page when include_rows is set (max 5000).
+                output_format: "table" (tab-separated columns), "json" or "pretty".
             """
-            self.logger.info("Fetching shard allocation...")
+            self.logger.info(f"Fetching shard allocation for {latest_index or 'all indices'}...")
             try:
-                response = self.es_client.transport.perform_request(
-                    'GET',
-                    '/_cat/shards',
-                    params={'h': 'index,shard,prirep,node', 'format': 'json'}
-                )
-                # Count shards per node
-                shard_counts = {}
-                for shard in response:
-                    if shard['node'] not in shard_counts:
-                        shard_counts[shard['node']] = 0
-                    shard_counts[shard['node']] += 1
-                
-                # Format the response with both raw data and counts
-                formatted_response = {
-                    'shard_distribution': response,
-                    'shards_per_node': shard_counts
-                }
-                return [TextContent(type="text", text=str(formatted_response))]
+                if offset < 0:
+                    raise ValueError(f"offset must not be negative, got {offset}")
+                response = await self._run(lambda client: client.cat.shards(
+                    index=latest_index, format="json", bytes="b", h=SHARD_COLUMNS
+                ))
+                result = summarize_shards(response)
+                if include_rows:
+                    page_size = max(1, min(page_size, MAX_SHARD_ROWS))
+                    result["total"] = len(response)
+                    result["rows"] = response[offset:offset + page_size]
+                    result["next_offset"] = offset + page_size if offset + page_size < len(response) else None
+                return [TextContent(type="text", text=serialize(result, output_format))]
             except Exception as e:
                 self.logger.error(f"Error fetching shard allocation: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Analyze shard sizes, segments and settings and rank indices for force-merge, shrink or rollover")
+        async def analyze_index_health(
+            index: Optional[str] = None,
+            target_shard_gb: float = 30,
+            min_shard_gb: float = 1,
+            max_shard_gb: float = 50,
+            max_segments_per_shard: int = 30,
+            top: int = 20,
+            sample_seconds: float = 2.0,
+            output_format: str = "table",
+        ) -> list[TextContent]:
+            """
+            Capacity analysis of indices for merge, refresh and shard-size tuning. Reads
+            _cat/indices, _cat/segments, _stats and _settings concurrently, in bytes and
+            projected to the needed columns, and joins them in one pass. _stats is read again
+            after sample_seconds: an index counts as written only if indexing is in flight or
+            its indexed-document count grew in between.
+
+            Returns totals (shards, average shard size and segments per shard, oversized and
+            tiny shards) and ranked candidates:
+            - force_merge: indices not being written with more segments per shard than the limit
+              or over 20% deleted documents, ranked by reclaimable bytes and segments removed.
+            - shrink: indices whose primary shards are below min_shard_gb, with the fewest
+              primaries (a factor of the current count) that keeps shards under target_shard_gb.
+            - rollover: indices with a primary shard above max_shard_gb, ranked by bytes above
+              target; "rollover" for indices being written, "split" for the others.
+            - anomalies: refresh intervals below 1s or disabled, replicas that cannot be
+              allocated or are missing, and red indices.
+
+            Args:
+                index: Only analyze indices matching this name or wildcard pattern (comma-separated allowed).
+                target_shard_gb: Desired primary shard size.
+                min_shard_gb: Shards smaller than this are tiny.
+                max_shard_gb: Shards larger than this are oversized.
+                max_segments_per_shard: Segment count per primary shard above which force-merge is suggested.
+                top: Number of rows in each ranked list.
+                sample_seconds: Interval between the two _stats samples; 0 uses in-flight indexing only.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info(f"Analyzing index health of {index or 'all indices'}...")
+            try:
+                def read_stats():
+                    return self._run(lambda client: client.indices.stats(
+                        index=index, metric=STATS_METRICS, filter_path=STATS_FILTER_PATH
+                    ))
+
+                earlier_stats = None
+                if sample_seconds > 0:
+                    earlier_stats = await read_stats() or {}
+                    await asyncio.sleep(sample_seconds)
+                indices, segments, stats, settings, health = await asyncio.gather(
+                    self._run(lambda client: client.cat.indices(index=index, format="json", bytes="b", h=INDEX_COLUMNS)),
+                    self._run(lambda client: client.cat.segments(index=index, format="json", bytes="b", h=SEGMENT_COLUMNS)),
+                    read_stats(),
+                    self._run(lambda client: client.indices.get_settings(index=index, filter_path=SETTINGS_FILTER_PATH)),
+                    self._run(lambda client: client.cluster.health(filter_path="number_of_data_nodes")),
+                )
+                result = analyze_capacity(
+                    indices, segments, stats or {}, settings or {}, (health or {}).get("number_of_data_nodes", 0),
+                    target_shard_gb=target_shard_gb, min_shard_gb=min_shard_gb, max_shard_gb=max_shard_gb,
+                    max_segments_per_shard=max_segments_per_shard, top=top,
+                    earlier_stats=earlier_stats,
+                )
+                return [TextContent(type="text", text=serialize(result, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error analyzing index health: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
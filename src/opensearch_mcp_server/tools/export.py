@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, Any, Optional
+from ..es_client import OpensearchClient
+from ..export import export_documents
+from ..query_guard import get_query_guard
+from ..serialization import serialize
+from mcp.types import TextContent
+
+class ExportTools(OpensearchClient):
+    def register_tools(self, mcp: Any):
+        """Register export-related tools."""
+
+        @mcp.tool(description="Export all matching documents to a local NDJSON or Parquet file")
+        async def export_documents_to_file(
+            index: str,
+            body: dict,
+            path: str,
+            format: str = "ndjson",
+            compression: Optional[str] = None,
+            slices: int = 1,
+            page_size: int = 1000,
+            resume: bool = False,
+        ) -> list[TextContent]:
+            """
+            Export every document matching a query to a local file for offline analysis.
+            Documents are streamed to disk and never returned in the response; only the path,
+            row count, bytes written and throughput are returned. The query cost guard's allowed
+            index patterns apply; its size and bucket limits do not, as every hit is read by design.
+
+            Args:
+                index: Name of the index or pattern to export from.
+                body: Opensearch query DSL (query, sort, _source). size and aggregations are ignored.
+                path: Local output file path.
+                format: "ndjson" (one {"_index", "_id", "_source"} object per line) or "parquet" (requires pyarrow;
+                    columns follow the index mapping, objects are JSON text, unmapped fields go to `_unmapped`).
+                compression: "gzip" for NDJSON; "snappy", "gzip", "zstd", "brotli" or "lz4" for Parquet.
+                slices: Number of slices read in parallel, up to the number of shards is most useful.
+                page_size: Hits fetched per request and slice.
+                resume: Continue an interrupted NDJSON export from its checkpoint file (path + ".checkpoint").
+            """
+            self.logger.info(f"Exporting {index} to {path} as {format} ({slices} slices)")
+            try:
+                guard = get_query_guard()
+                if guard is not None:
+                    guard.check_index(index)
+                summary = await self._run_blocking(
+                    lambda: export_documents(
+                        self.es_client, index, body, path, fmt=format, compression=compression,
+                        slices=slices, page_size=max(1, min(page_size, 10000)), resume=resume,
+                    )
+                )
+                self.logger.info(f"Exported {summary['rows']} documents to {summary['path']} in {summary['seconds']}s")
+                return [TextContent(type="text", text=serialize(summary))]
+            except Exception as e:
+                self.logger.error(f"Error exporting documents: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -1,57 +1,102 @@
 import logging
-from typing import Dict, Any
-from ..es_client import OpensearchClient
+from typing import Dict, Any, Optional
+from ..es_client import OpensearchClient, resolve_filter_path
+from ..serialization import serialize
 from mcp.types import TextContent
 
+# Default projections pushed down to OpenSearch; pass filter_path="" to get everything
+LIST_INDICES_COLUMNS = "health,status,index,pri,rep,docs.count,store.size"
+MAPPING_FILTER_PATH = "*.mappings.properties,*.mappings.dynamic_templates"
+
 class IndexTools(OpensearchClient):
     def register_tools(self, mcp: Any):
         """Register index-related tools."""
-        
+
         @mcp.tool(description="List all indices in the Opensearch cluster")
-        async def list_indices() -> list[TextContent]:
+        async def list_indices(
+            output_format: str = "table",
+            index: Optional[str] = None,
+            columns: Optional[str] = None,
+        ) -> list[TextContent]:
             """
             List all indices in the Opensearch cluster.
             It is important to check the indices before searching documents
             to understand what indices are avilable.
+
+            Args:
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+                index: Only list indices matching this name or wildcard pattern.
+                columns: Comma-separated _cat/indices columns, defaults to health,status,index,pri,rep,docs.count,store.size.
             """
             self.logger.info("Listing indices...")
+            columns = columns or LIST_INDICES_COLUMNS
             try:
-                indices = self.es_client.cat.indices(format="json")
-                return [TextContent(type="text", text=str(indices))]
+                async def load():
+                    indices = await self._run(lambda client: client.cat.indices(index=index, format="json", h=columns))
+                    return serialize(indices, output_format)
+
+                # A named index or pattern is fingerprinted, so creating or deleting a matching index
+                # invalidates the entry; the unscoped listing relies on its short TTL
+                text = await self._cached("list_indices", load, index=index or "*", output_format=output_format, columns=columns)
+                return [TextContent(type="text", text=text)]
             except Exception as e:
                 self.logger.error(f"Error listing indices: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get index mapping")
-        async def get_mapping(index: str) -> list[TextContent]:
+        async def get_mapping(
+            index: str,
+            fields: Optional[list[str]] = None,
+            filter_path: Optional[str] = None,
+        ) -> list[TextContent]:
             """
             Get the mapping for an index.
-            It is important to always check the mappings to understand 
+            It is important to always check the mappings to understand
             the exact field names and types before constructing queries or URLs.
-            
+
             Args:
                 index: Name of the index
+                fields: Only return the mapping of these fields (wildcards allowed).
+                filter_path: Response filter; defaults to field properties and dynamic templates. "" returns the full mapping.
             """
             self.logger.info(f"Getting mapping for index: {index}")
             try:
-                response = self.es_client.indices.get_mapping(index=index)
-                return [TextContent(type="text", text=str(response))]
+                async def load():
+                    if fields:
+                        response = await self._run(lambda client: client.indices.get_field_mapping(
+                            fields=fields, index=index, filter_path=resolve_filter_path(filter_path, None)
+                        ))
+                    else:
+                        response = await self._run(lambda client: client.indices.get_mapping(
+                            index=index, filter_path=resolve_filter_path(filter_path, MAPPING_FILTER_PATH)
+                        ))
+                    return serialize(response)
+
+                text = await self._cached("get_mapping", load, index=index, fields=fields, filter_path=filter_path)
+                return [TextContent(type="text", text=text)]
             except Exception as e:
                 self.logger.error(f"Error getting mapping: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
 
         @mcp.tool(description="Get index settings")
-        async def get_settings(index: str) -> list[TextContent]:
+        async def get_settings(index: str, filter_path: Optional[str] = None) -> list[TextContent]:
             """
             Get the settings for an index.
-            
+
             Args:
                 index: Name of the index
+                filter_path: Response filter, e.g. "*.settings.index.number_of_shards,*.settings.index.refresh_interval".
             """
             self.logger.info(f"Getting settings for index: {index}")
             try:
-                response = self.es_client.indices.get_settings(index=index, h=["index", "health"])
-                return [TextContent(type="text", text=str(response))]
+                async def load():
+                    response = await self._run(lambda client: client.indices.get_settings(
+                        index=index, filter_path=resolve_filter_path(filter_path, None)
+                    ))
+                    return serialize(response)
+
+                text = await self._cached("get_settings", load, index=index, filter_path=filter_path)
+                return [TextContent(type="text", text=text)]
             except Exception as e:
                 self.logger.error(f"Error getting settings: {e}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
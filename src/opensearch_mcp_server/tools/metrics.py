@@ -0,0 +1,35 @@
+from typing import Any
+from ..coalesce import get_single_flight
+from ..es_client import OpensearchClient
+from ..instrumentation import get_metrics
+from ..serialization import serialize
+from mcp.types import TextContent
+
+class MetricsTools(OpensearchClient):
+    def register_tools(self, mcp: Any):
+        """Register server instrumentation tools."""
+
+        @mcp.tool(description="Get per-tool latency, payload size and error metrics of this MCP server")
+        async def get_server_metrics(output_format: str = "table", include_traces: bool = False) -> list[TextContent]:
+            """
+            Get call counts, error rates, p50/p99 latency, bytes returned and the mean time
+            spent in cluster transport, JSON decoding and output formatting for every tool
+            called since the server started, and how many calls joined an identical call
+            already in flight instead of querying the cluster.
+
+            Args:
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+                include_traces: Also return the phase breakdown of the most recent calls.
+            """
+            self.logger.info("Getting server metrics")
+            try:
+                summary = get_metrics().summary(include_traces=include_traces)
+                single_flight = get_single_flight()
+                if single_flight is not None:
+                    coalesced = single_flight.stats()
+                    summary["in_flight"] = coalesced["in_flight"]
+                    summary["coalesced"] = coalesced["tools"]
+                return [TextContent(type="text", text=serialize(summary, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error getting server metrics: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
@@ -0,0 +1,118 @@
+from typing import Any, Optional
+from ..clusters import get_cluster_registry
+from ..es_client import OpensearchClient, get_es_config, opened_clusters
+from ..serialization import serialize
+from ..watcher import HEALTH_FIELDS
+from .index import LIST_INDICES_COLUMNS
+from mcp.types import TextContent
+
+HEALTH_ALL_FILTER_PATH = ",".join(("cluster_name",) + HEALTH_FIELDS)
+
+
+def _statuses(results: list) -> list:
+    """Per-cluster status rows of a fan-out, without the responses."""
+    return [{key: result.get(key) for key in ("cluster", "status", "took_ms", "error")} for result in results]
+
+
+class MultiClusterTools(OpensearchClient):
+    def register_tools(self, mcp: Any):
+        """Register tools that span every configured cluster."""
+
+        @mcp.tool(description="List the OpenSearch clusters this server can query")
+        async def list_clusters(output_format: str = "table") -> list[TextContent]:
+            """
+            List the configured clusters with their host and Dashboards URL. Pass a cluster name
+            as the `cluster` argument of any other tool to query that cluster.
+
+            Args:
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info("Listing clusters")
+            try:
+                registry = get_cluster_registry()
+                opened = set(opened_clusters())
+                rows = []
+                for name in registry.names():
+                    row = {"cluster": name, "default": name == registry.default, "connected": name in opened}
+                    try:
+                        config = get_es_config(self.logger, name)
+                        row.update(host=config["host"], dashboards_host=config["dashboards_host"], error=None)
+                    except ValueError as e:
+                        row.update(host=None, dashboards_host=None, error=str(e))
+                    rows.append(row)
+                return [TextContent(type="text", text=serialize(rows, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error listing clusters: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="Get the health of every cluster at once")
+        async def get_cluster_health_all(
+            clusters: Optional[list[str]] = None,
+            output_format: str = "table",
+        ) -> list[TextContent]:
+            """
+            Query the health of all configured clusters concurrently. Returns one row per
+            cluster with its status, node and shard counts, the request latency and, for
+            clusters that could not be reached, the error.
+
+            Args:
+                clusters: Only query these clusters; defaults to all of them.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info(f"Getting health of {', '.join(clusters) if clusters else 'all clusters'}")
+            try:
+                results = await self._fan_out(
+                    lambda client: client.cluster.health(filter_path=HEALTH_ALL_FILTER_PATH), clusters
+                )
+                rows = []
+                for result in results:
+                    row = {"cluster": result["cluster"], "status": result["status"], "took_ms": result["took_ms"]}
+                    health = result.get("response") or {}
+                    row["health"] = health.get("status")
+                    row.update({field: health.get(field) for field in ("cluster_name",) + HEALTH_FIELDS if field != "status"})
+                    row["error"] = result.get("error")
+                    rows.append(row)
+                return [TextContent(type="text", text=serialize(rows, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error getting health of all clusters: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
+
+        @mcp.tool(description="List indices across every cluster at once")
+        async def list_indices_all(
+            index: Optional[str] = None,
+            clusters: Optional[list[str]] = None,
+            columns: Optional[str] = None,
+            output_format: str = "table",
+        ) -> list[TextContent]:
+            """
+            List indices of all configured clusters concurrently, merged into one table with
+            a leading `cluster` column, followed by the latency and error status of each cluster.
+            Clusters that fail do not prevent the others from being listed.
+
+            Args:
+                index: Only list indices matching this name or wildcard pattern.
+                clusters: Only query these clusters; defaults to all of them.
+                columns: Comma-separated _cat/indices columns, defaults to health,status,index,pri,rep,docs.count,store.size.
+                output_format: "table" (tab-separated columns), "json" or "pretty".
+            """
+            self.logger.info(f"Listing indices of {', '.join(clusters) if clusters else 'all clusters'}")
+            columns = columns or LIST_INDICES_COLUMNS
+            try:
+                results = await self._fan_out(
+                    lambda client: client.cat.indices(index=index, format="json", h=columns), clusters
+                )
+                indices = []
+                for result in results:
+                    for row in result.get("response") or []:
+                        indices.append({"cluster": result["cluster"], **row})
+                summary = {
+                    "clusters_ok": sum(result["status"] == "ok" for result in results),
+                    "clusters_failed": sum(result["status"] == "error" for result in results),
+                    "index_count": len(indices),
+                    "clusters": _statuses(results),
+                    "indices": indices,
+                }
+                return [TextContent(type="text", text=serialize(summary, output_format))]
+            except Exception as e:
+                self.logger.error(f"Error listing indices of all clusters: {e}")
+                return [TextContent(type="text", text=f"Error: {str(e)}")]
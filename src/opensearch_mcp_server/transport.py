@@ -0,0 +1,29 @@
+"""
+opensearch-py transport and serializer classes that report their time to the
+running tool call's trace (see `instrumentation.py`).
+
+Kept apart from `es_client.py` so opensearch-py is only imported once the
+first client is created, not when the server starts.
+"""
+from typing import Any
+
+from opensearchpy import Transport
+from opensearchpy.serializer import JSONSerializer
+
+from .instrumentation import span
+
+
+class TimedJSONSerializer(JSONSerializer):
+    """JSON serializer that attributes response decoding to the current tool call."""
+
+    def loads(self, s: str) -> Any:
+        with span("decode"):
+            return super().loads(s)
+
+
+class TimedTransport(Transport):
+    """Transport that attributes cluster round trips to the current tool call."""
+
+    def perform_request(self, *args: Any, **kwargs: Any) -> Any:
+        with span("transport"):
+            return super().perform_request(*args, **kwargs)
@@ -0,0 +1,375 @@
+"""
+Background watcher of cluster health, tasks and shard recoveries.
+
+A daemon thread polls the cluster and keeps the latest snapshot plus a
+bounded log of changes, so repeated checks during an incident cost one
+cheap in-memory read instead of a full re-fetch. Every poll is numbered;
+clients pass the number they last saw (inside an opaque cursor) and get
+only the changes after it:
+
+    health     status transitions and changes of shard/node counters
+    tasks      top-level tasks that started or finished
+    recovery   recoveries that started or finished, plus the progress of
+               active ones since the cursor
+
+Recovery rates are the least-squares slope of recovered bytes over the
+retained samples of each shard, which smooths out the bursty progress a
+single `_cat/recovery` sample shows.
+
+The poll interval backs off while nothing changes and after errors, and
+resets on the first change or while recoveries are active. The thread starts on first use and stops when
+no client has read from it for the idle timeout. Each cluster gets its own watcher.
+
+Tool calls waiting for a change await an asyncio.Event that the polling
+thread sets through their event loop, so a long poll holds no thread.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .env import env_float, env_int
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_MAX_INTERVAL = 60.0
+DEFAULT_IDLE_TIMEOUT = 600.0
+DEFAULT_HISTORY = 1000
+BACKOFF_FACTOR = 1.5
+
+# Recovery samples kept per shard for rate estimates
+RATE_SAMPLES = 30
+# Samples older than this many poll intervals no longer describe a recovery's rate
+STALE_INTERVALS = 3
+
+HEALTH_FIELDS = (
+    "status", "number_of_nodes", "number_of_data_nodes", "active_shards", "relocating_shards",
+    "initializing_shards", "unassigned_shards", "delayed_unassigned_shards", "number_of_pending_tasks",
+    "active_shards_percent_as_number",
+)
+HEALTH_FILTER_PATH = ",".join(HEALTH_FIELDS)
+TASKS_FILTER_PATH = ",".join(
+    f"nodes.*.tasks.*.{field}"
+    for field in ("action", "node", "start_time_in_millis", "running_time_in_nanos", "parent_task_id")
+)
+RECOVERY_COLUMNS = "index,shard,stage,type,source_node,target_node,bytes_total,bytes_recovered,time"
+
+# The watcher's own polling shows up as tasks; never report it
+IGNORED_TASK_PREFIXES = ("cluster:monitor/tasks/lists", "cluster:monitor/health", "indices:monitor/recovery")
+
+
+def _health(client: Any) -> Dict[str, Any]:
+    return client.cluster.health(filter_path=HEALTH_FILTER_PATH)
+
+
+def _tasks(client: Any) -> Dict[str, Dict[str, Any]]:
+    response = client.tasks.list(filter_path=TASKS_FILTER_PATH)
+    tasks = {}
+    for node in response.get("nodes", {}).values():
+        for task_id, task in node.get("tasks", {}).items():
+            # Child tasks come and go with their parent; only top-level work is tracked
+            if task.get("parent_task_id") or task.get("action", "").startswith(IGNORED_TASK_PREFIXES):
+                continue
+            tasks[task_id] = task
+    return tasks
+
+
+def _recoveries(client: Any) -> Dict[str, Dict[str, Any]]:
+    rows = client.cat.recovery(format="json", active_only=True, bytes="b", time="ms", h=RECOVERY_COLUMNS)
+    return {f"{r['index']}/{r['shard']}/{r.get('target_node')}": r for r in rows}
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _slope(samples: List[Tuple[int, float, int]]) -> Optional[float]:
+    """Least-squares slope of recovered bytes over time, in bytes per second."""
+    if len(samples) < 2:
+        return None
+    times = [t for _, t, _ in samples]
+    values = [v for _, _, v in samples]
+    mean_t = sum(times) / len(times)
+    mean_v = sum(values) / len(values)
+    var = sum((t - mean_t) ** 2 for t in times)
+    if var == 0:
+        return None
+    return sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / var
+
+
+class ClusterWatcher:
+    """Polls cluster health, tasks and recoveries on a background thread."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        logger: logging.Logger,
+        interval: float = DEFAULT_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        history: int = DEFAULT_HISTORY,
+    ):
+        self.client_factory = client_factory
+        self.logger = logger
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.idle_timeout = idle_timeout
+        self.current_interval = interval
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sample = 0
+        self.last_sample_time: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.health: Dict[str, Any] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.recoveries: Dict[str, Dict[str, Any]] = {}
+        self.progress: Dict[str, deque] = {}
+        self.events: deque = deque(maxlen=history)
+        self._last_read = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiters: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_running(self):
+        """Start the polling thread if it is not running and mark the watcher as in use."""
+        with self._lock:
+            self._last_read = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="opensearch-watcher", daemon=True)
+                self._thread.start()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            self._notify()
+
+    def _notify(self):
+        """Wake every waiting tool call; call with the lock held."""
+        for loop, event in self._waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's event loop is closed; it is no longer waiting
+                pass
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if time.monotonic() - self._last_read > self.idle_timeout:
+                self.logger.info("Cluster watcher idle, stopping")
+                return
+            try:
+                changed = self.poll()
+                self.current_interval = (
+                    self.interval if changed else min(self.max_interval, self.current_interval * BACKOFF_FACTOR)
+                )
+            except Exception as e:
+                self.logger.warning(f"Cluster watcher poll failed: {e}")
+                with self._lock:
+                    self.last_error = str(e)
+                self.current_interval = min(self.max_interval, self.current_interval * 2)
+            self._stop.wait(self.current_interval)
+
+    def poll(self) -> bool:
+        """Take one sample and record what changed. Returns whether anything did."""
+        client = self.client_factory()
+        health = _health(client)
+        tasks = _tasks(client)
+        recoveries = _recoveries(client)
+        now = time.time()
+
+        with self._lock:
+            self.sample += 1
+            first = self.sample == 1
+            events = [] if first else self._diff(health, tasks, recoveries, now)
+            for key, row in recoveries.items():
+                samples = self.progress.setdefault(key, deque(maxlen=RATE_SAMPLES))
+                samples.append((self.sample, now, _int(row.get("bytes_recovered"))))
+            for key in list(self.progress):
+                if key not in recoveries:
+                    del self.progress[key]
+            self.health, self.tasks, self.recoveries = health, tasks, recoveries
+            self.last_sample_time = now
+            self.last_error = None
+            self.events.extend(events)
+            self._notify()
+            # Keep sampling at full rate while recoveries run so their rate estimates stay fresh
+            return bool(events) or bool(recoveries)
+
+    def _diff(self, health, tasks, recoveries, now) -> List[Dict[str, Any]]:
+        events = []
+
+        def event(kind: str, **fields: Any):
+            events.append({"sample": self.sample, "time": round(now, 3), "type": kind, **fields})
+
+        changes = {
+            field: {"from": self.health.get(field), "to": health.get(field)}
+            for field in HEALTH_FIELDS
+            if self.health.get(field) != health.get(field)
+        }
+        if changes:
+            event("health", changes=changes)
+
+        for task_id in tasks.keys() - self.tasks.keys():
+            task = tasks[task_id]
+            event("task_started", task_id=task_id, action=task.get("action"), node=task.get("node"))
+        for task_id in self.tasks.keys() - tasks.keys():
+            task = self.tasks[task_id]
+            running = _int(task.get("running_time_in_nanos")) / 1e9
+            event("task_finished", task_id=task_id, action=task.get("action"), node=task.get("node"),
+                  observed_running_seconds=round(running + (now - (self.last_sample_time or now)), 1))
+
+        for key in recoveries.keys() - self.recoveries.keys():
+            row = recoveries[key]
+            event("recovery_started", shard=key, stage=row.get("stage"), type=row.get("type"),
+                  source_node=row.get("source_node"), bytes_total=_int(row.get("bytes_total")))
+        for key in self.recoveries.keys() - recoveries.keys():
+            event("recovery_finished", shard=key, bytes_total=_int(self.recoveries[key].get("bytes_total")))
+        for key in recoveries.keys() & self.recoveries.keys():
+            if recoveries[key].get("stage") != self.recoveries[key].get("stage"):
+                event("recovery_stage", shard=key, stage={"from": self.recoveries[key].get("stage"),
+                                                         "to": recoveries[key].get("stage")})
+        return events
+
+    def recovery_progress(self, since: int = 0) -> List[Dict[str, Any]]:
+        """Progress, observed rate and ETA of every active recovery; call with the lock held."""
+        rows = []
+        for key, row in sorted(self.recoveries.items()):
+            samples = list(self.progress.get(key, ()))
+            total = _int(row.get("bytes_total"))
+            recovered = _int(row.get("bytes_recovered"))
+            baseline = next((v for s, _, v in reversed(samples) if s <= since), samples[0][2] if samples else recovered)
+            rate = _slope(samples)
+            remaining = max(0, total - recovered)
+            rows.append({
+                "shard": key,
+                "stage": row.get("stage"),
+                "percent": round(recovered / total * 100, 1) if total else None,
+                "bytes_recovered": recovered,
+                "bytes_since_cursor": recovered - baseline,
+                "rate_mb_per_second": round(rate / 1024 / 1024, 2) if rate is not None else None,
+                "eta_seconds": round(remaining / rate) if rate and rate > 0 else None,
+                "samples": len(samples),
+            })
+        return rows
+
+    def observed_rate(
+        self, index: str, shard: Any, source_node: Optional[str], target_node: Optional[str]
+    ) -> Optional[Tuple[float, int]]:
+        """
+        Observed bytes/second and sample count of the recovery of a shard from `source_node` to
+        `target_node`, if the watcher is running and sampled it recently. The rate is 0 or
+        negative for a recovery that made no progress over the samples.
+        """
+        if not self.is_running():
+            return None
+        key = f"{index}/{shard}/{target_node}"
+        with self._lock:
+            row = self.recoveries.get(key)
+            samples = list(self.progress.get(key, ()))
+            if row is None or row.get("source_node") != source_node or not samples:
+                return None
+            # The last samples of a watcher that fell behind say nothing about the current rate
+            if time.time() - samples[-1][1] > STALE_INTERVALS * max(self.interval, self.current_interval):
+                return None
+        rate = _slope(samples)
+        return (rate, len(samples)) if rate is not None else None
+
+    def changes(self, since: Optional[int], epoch: Optional[str]) -> Dict[str, Any]:
+        """Everything that changed after sample `since` (a full snapshot when the cursor is unusable)."""
+        with self._lock:
+            self._last_read = time.monotonic()
+            oldest = self.events[0]["sample"] if self.events else self.sample
+            # Once the log is full, events up to the oldest retained sample may have been dropped
+            reset = since is None or epoch != self.epoch or since > self.sample or (
+                len(self.events) == self.events.maxlen and since < oldest
+            )
+            result: Dict[str, Any] = {
+                "sample": self.sample,
+                "reset": reset,
+                "interval_seconds": round(self.current_interval, 1),
+                "sampled_at": round(self.last_sample_time, 3) if self.last_sample_time else None,
+            }
+            if self.last_error:
+                result["last_error"] = self.last_error
+            if reset:
+                result["health"] = self.health
+                result["tasks"] = [dict(task, task_id=task_id) for task_id, task in sorted(self.tasks.items())]
+                result["events"] = []
+            else:
+                result["events"] = [e for e in self.events if e["sample"] > since]
+            result["recoveries"] = self.recovery_progress(0 if reset else since)
+            return result
+
+    async def _wait(self, predicate: Callable[[], bool], timeout: float) -> bool:
+        """Wait until `predicate` holds (checked under the lock after every sample), or the timeout passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            event = asyncio.Event()
+            waiter = (loop, event)
+            with self._lock:
+                if predicate() or self._stop.is_set():
+                    return True
+                self._waiters.add(waiter)
+            try:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+
+    async def wait_for_sample(self, after: int, timeout: float) -> bool:
+        """Wait until a sample newer than `after` was taken, or the timeout passes."""
+        return await self._wait(lambda: self.sample > after, timeout)
+
+    async def wait_for_events(self, after: int, timeout: float) -> bool:
+        """Wait until a change newer than sample `after` was recorded, or the timeout passes."""
+        return await self._wait(lambda: bool(self.events) and self.events[-1]["sample"] > after, timeout)
+
+
+_watchers: Dict[str, ClusterWatcher] = {}
+_watcher_lock = threading.Lock()
+
+
+def get_cluster_watcher(cluster: str, client_factory: Callable[[], Any], logger: logging.Logger) -> ClusterWatcher:
+    """Return the process-wide watcher of a cluster, configured from the environment."""
+    watcher = _watchers.get(cluster)
+    if watcher is None:
+        with _watcher_lock:
+            watcher = _watchers.get(cluster)
+            if watcher is None:
+                watcher = _watchers[cluster] = ClusterWatcher(
+                    client_factory,
+                    logger,
+                    interval=env_float("OPENSEARCH_WATCH_INTERVAL", DEFAULT_INTERVAL),
+                    max_interval=env_float("OPENSEARCH_WATCH_MAX_INTERVAL", DEFAULT_MAX_INTERVAL),
+                    idle_timeout=env_float("OPENSEARCH_WATCH_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT),
+                    history=env_int("OPENSEARCH_WATCH_HISTORY", DEFAULT_HISTORY),
+                )
+    return watcher
+
+
+def peek_cluster_watcher(cluster: str) -> Optional[ClusterWatcher]:
+    """Return the watcher of a cluster if one was started, without creating it."""
+    return _watchers.get(cluster)
+
+
+def stop_cluster_watcher():
+    """Stop the watchers of every cluster."""
+    with _watcher_lock:
+        for watcher in _watchers.values():
+            watcher.stop()
+        _watchers.clear()
@@ -0,0 +1,61 @@
+import pytest
+
+from opensearch_mcp_server.aggregations import composite_after_keys, flatten_aggregations, resume_composite
+
+
+def test_nested_buckets_become_one_row_per_leaf():
+    response = {"by_host": {"buckets": [
+        {"key": "web-1", "doc_count": 3, "latency": {"value": 12.5},
+         "by_status": {"buckets": [{"key": 200, "doc_count": 2}, {"key": 500, "doc_count": 1}]}},
+        {"key": "web-2", "doc_count": 1, "latency": {"value": 4.0}, "by_status": {"buckets": []}},
+    ]}}
+    assert flatten_aggregations(response) == [
+        {"by_host": "web-1", "doc_count": 2, "latency": 12.5, "by_status": 200},
+        {"by_host": "web-1", "doc_count": 1, "latency": 12.5, "by_status": 500},
+        {"by_host": "web-2", "doc_count": 1, "latency": 4.0},
+    ]
+
+
+def test_metrics_keyed_buckets_and_single_bucket_aggregations():
+    response = {
+        "took_stats": {"count": 2, "min": 1.0, "max": 3.0, "min_as_string": "1"},
+        "p": {"values": {"50.0": 2.0, "99.0": 3.0}},
+        "errors": {"doc_count": 4, "avg": {"value": 1.5}},
+        "by_range": {"buckets": {"small": {"doc_count": 5}, "large": {"doc_count": 1}}},
+        "per_day": {"buckets": [{"key": 1700000000000, "key_as_string": "2023-11-14", "doc_count": 7}]},
+    }
+    rows = flatten_aggregations(response)
+    common = {"took_stats.count": 2, "took_stats.min": 1.0, "took_stats.max": 3.0, "p.50.0": 2.0, "p.99.0": 3.0,
+              "errors.doc_count": 4, "errors.avg": 1.5}
+    assert rows == [
+        dict(common, by_range="small", doc_count=5),
+        dict(common, by_range="large", doc_count=1),
+        dict(common, per_day="2023-11-14", doc_count=7),
+    ]
+
+
+def test_composite_keys_get_a_column_per_source():
+    response = {"pairs": {"after_key": {"host": "b", "status": 200},
+                          "buckets": [{"key": {"host": "a", "status": 200}, "doc_count": 2}]}}
+    assert flatten_aggregations(response) == [{"pairs.host": "a", "pairs.status": 200, "doc_count": 2}]
+
+
+def test_after_keys_only_for_full_composite_pages():
+    aggs = {"pairs": {"composite": {"size": 1, "sources": []}}, "rest": {"composite": {"size": 5, "sources": []}},
+            "hosts": {"terms": {"field": "host"}}}
+    response = {"pairs": {"after_key": {"host": "a"}, "buckets": [{"key": {"host": "a"}}]},
+                "rest": {"after_key": {"host": "z"}, "buckets": [{"key": {"host": "z"}}]}}
+    assert composite_after_keys(aggs, response) == {"pairs": {"host": "a"}}
+
+
+def test_resume_composite_injects_the_after_key():
+    aggs = {"pairs": {"composite": {"size": 10, "sources": [{"host": {"terms": {"field": "host"}}}]},
+                      "aggs": {"bytes": {"sum": {"field": "bytes"}}}},
+            "hosts": {"terms": {"field": "host"}}}
+    resumed = resume_composite(aggs, {"pairs": {"host": "web-9"}})
+    assert list(resumed) == ["pairs"]
+    assert resumed["pairs"]["composite"]["after"] == {"host": "web-9"}
+    assert resumed["pairs"]["aggs"] == aggs["pairs"]["aggs"]
+    assert "after" not in aggs["pairs"]["composite"]
+    with pytest.raises(ValueError, match="not a top-level composite"):
+        resume_composite(aggs, {"hosts": {"host": "x"}})
@@ -0,0 +1,80 @@
+import pytest
+
+from opensearch_mcp_server.bulk import iter_actions, iter_chunks, iter_ndjson
+
+
+def _actions(text, **kwargs):
+    return [action for action, _ in iter_actions(iter_ndjson(ndjson=text), "logs", **kwargs)]
+
+
+def test_iter_ndjson_numbers_lines_and_skips_blank_ones(tmp_path):
+    text = '{"a": 1}\n\n  \n{"a": 2}\n'
+    assert list(iter_ndjson(ndjson=text)) == [(1, '{"a": 1}'), (4, '{"a": 2}')]
+    path = tmp_path / "docs.ndjson"
+    path.write_text(text, encoding="utf-8")
+    assert [number for number, _ in iter_ndjson(path=str(path))] == [1, 4]
+
+
+def test_iter_ndjson_needs_exactly_one_source():
+    with pytest.raises(ValueError, match="exactly one"):
+        list(iter_ndjson())
+    with pytest.raises(ValueError, match="exactly one"):
+        list(iter_ndjson(ndjson="{}", path="docs.ndjson"))
+
+
+def test_plain_documents_use_op_type_and_id_field():
+    actions = _actions('{"id": "a", "n": 1}\n{"n": 2}', op_type="create", id_field="id")
+    assert actions == [
+        {"_op_type": "create", "_index": "logs", "_source": {"id": "a", "n": 1}, "_id": "a"},
+        {"_op_type": "create", "_index": "logs", "_source": {"n": 2}},
+    ]
+
+
+def test_documents_with_a_doc_field_are_not_actions():
+    assert _actions('{"doc": {"title": "x"}}') == [{"_op_type": "index", "_index": "logs", "_source": {"doc": {"title": "x"}}}]
+
+
+def test_bulk_action_pairs():
+    text = "\n".join([
+        '{"index": {"_id": "1", "_index": "other"}}', '{"n": 1}',
+        '{"update": {"_id": "2"}}', '{"doc": {"n": 2}}',
+        '{"delete": {"_id": "3"}}',
+        '{"create": {"_id": "4"}}', '{"n": 4}',
+    ])
+    assert _actions(text) == [
+        {"_op_type": "index", "_index": "other", "_id": "1", "_source": {"n": 1}},
+        {"_op_type": "update", "_index": "logs", "_id": "2", "doc": {"n": 2}},
+        {"_op_type": "delete", "_index": "logs", "_id": "3"},
+        {"_op_type": "create", "_index": "logs", "_id": "4", "_source": {"n": 4}},
+    ]
+
+
+def test_sizes_count_both_lines_of_a_pair():
+    sizes = [size for _, size in iter_actions(iter_ndjson(ndjson='{"index": {}}\n{"n": 1}'), "logs")]
+    assert sizes == [len('{"index": {}}') + len('{"n": 1}')]
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"n": 1}\n{"n": ', "Invalid JSON on line 2"),
+    ('[1, 2]', "Line 1 is not a JSON object"),
+    ('{"n": 1}\n{"index": {"_id": "1"}}', "Line 2: index action has no document line"),
+    ('{"create": {}}\n"text"', "Line 2 is not a JSON object"),
+])
+def test_bad_lines_report_their_line_number(text, message):
+    with pytest.raises(ValueError, match=message):
+        _actions(text)
+
+
+def test_op_type_is_validated_before_reading():
+    def lines():
+        raise AssertionError("read")
+        yield
+
+    with pytest.raises(ValueError, match="Unknown op_type 'upsert'"):
+        iter_actions(lines(), "logs", op_type="upsert")
+
+
+def test_chunks_are_bounded_by_docs_and_bytes():
+    actions = [({"n": i}, 10) for i in range(5)]
+    assert [len(chunk) for chunk, _ in iter_chunks(actions, chunk_docs=2, chunk_bytes=1000)] == [2, 2, 1]
+    assert [size for _, size in iter_chunks(actions, chunk_docs=100, chunk_bytes=25)] == [20, 20, 10]
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+
+from opensearch_mcp_server import cache as cache_module
+from opensearch_mcp_server import es_client
+from opensearch_mcp_server.cache import DEFAULT_FINGERPRINT_TTL, DEFAULT_TTLS, ResponseCache
+
+
+class FakeCluster:
+    """Index metadata and mapping whose versions a test can bump."""
+
+    def __init__(self):
+        self.mapping_version = 1
+        self.metadata_reads = 0
+        self.mapping_reads = 0
+
+    def perform_request(self, method, path, params=None):
+        self.metadata_reads += 1
+        return {"metadata": {"indices": {"logs": {
+            "version": self.mapping_version, "mapping_version": self.mapping_version,
+            "settings_version": 1, "settings": {"index": {"uuid": "abc"}},
+        }}}}
+
+    def mapping(self):
+        self.mapping_reads += 1
+        return f"mapping v{self.mapping_version}"
+
+
+class Tools(es_client.OpensearchClient):
+    def __init__(self, cluster):
+        super().__init__(logging.getLogger("test"))
+        self.cluster = cluster
+
+    async def _run(self, request):
+        return request(type("Client", (), {"transport": self.cluster})())
+
+    async def get_mapping(self):
+        async def load():
+            return self.cluster.mapping()
+        return await self._cached("get_mapping", load, index="logs")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _setup(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    response_cache = ResponseCache(max_bytes=1 << 20, ttls=dict(DEFAULT_TTLS))
+    monkeypatch.setattr(es_client, "get_response_cache", lambda: response_cache)
+    cluster = FakeCluster()
+    return clock, cluster, Tools(cluster)
+
+
+def test_hits_within_the_fingerprint_ttl_share_one_metadata_read(monkeypatch):
+    clock, cluster, tools = _setup(monkeypatch)
+    assert asyncio.run(tools.get_mapping()) == "mapping v1"
+    clock.now += DEFAULT_FINGERPRINT_TTL / 2
+    assert asyncio.run(tools.get_mapping()) == "mapping v1"
+    assert (cluster.metadata_reads, cluster.mapping_reads) == (1, 1)
+
+
+def test_mapping_change_is_seen_once_the_fingerprint_expires(monkeypatch):
+    clock, cluster, tools = _setup(monkeypatch)
+    assert asyncio.run(tools.get_mapping()) == "mapping v1"
+    cluster.mapping_version = 2
+    # Well within the 300s response TTL of get_mapping
+    clock.now += DEFAULT_FINGERPRINT_TTL + 1
+    assert asyncio.run(tools.get_mapping()) == "mapping v2"
+    assert cluster.mapping_reads == 2
+
+
+def test_fingerprint_ttl_is_independent_of_the_response_ttl():
+    response_cache = ResponseCache(max_bytes=1 << 20, ttls={"get_mapping": 300.0})
+    response_cache.store_fingerprint("logs", "fp")
+    assert response_cache.fingerprint_ttl == DEFAULT_FINGERPRINT_TTL < response_cache.ttl("get_mapping")
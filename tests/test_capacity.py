@@ -0,0 +1,43 @@
+from opensearch_mcp_server.capacity import GB, analyze_capacity, is_writing
+
+
+def _index(name, docs=1000, deleted=400):
+    return {"index": name, "health": "green", "status": "open", "pri": "1", "rep": "1",
+            "docs.count": str(docs), "docs.deleted": str(deleted),
+            "pri.store.size": str(GB), "store.size": str(2 * GB)}
+
+
+def _stats(index_total, index_current=0):
+    return {"indices": {"logs": {"primaries": {
+        "indexing": {"index_total": index_total, "index_current": index_current},
+        "merges": {"current": 0},
+    }}}}
+
+
+def _segments(count):
+    return [{"index": "logs", "shard": "0", "prirep": "p", "size": str(GB // count)} for _ in range(count)]
+
+
+def test_historical_writes_do_not_count_as_writing():
+    assert not is_writing("logs", _stats(5000), earlier_stats=_stats(5000))
+    assert is_writing("logs", _stats(5001), earlier_stats=_stats(5000))
+    assert is_writing("logs", _stats(5000, index_current=3), earlier_stats=_stats(5000))
+
+
+def test_read_only_index_with_historical_writes_is_force_merge_eligible():
+    result = analyze_capacity([_index("logs")], _segments(40), _stats(5000), {}, data_nodes=2,
+                              earlier_stats=_stats(5000))
+    assert [row["index"] for row in result["force_merge"]] == ["logs"]
+
+
+def test_index_written_between_samples_is_not_force_merged():
+    result = analyze_capacity([_index("logs")], _segments(40), _stats(5100), {}, data_nodes=2,
+                              earlier_stats=_stats(5000))
+    assert result["force_merge"] == []
+
+
+def test_oversized_read_only_index_is_split_not_rolled_over():
+    row = dict(_index("logs"), **{"pri.store.size": str(80 * GB)})
+    segments = [{"index": "logs", "shard": "0", "prirep": "p", "size": str(80 * GB)}]
+    result = analyze_capacity([row], segments, _stats(5000), {}, data_nodes=2, earlier_stats=_stats(5000))
+    assert result["rollover"][0]["action"] == "split"
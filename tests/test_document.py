@@ -0,0 +1,33 @@
+import pytest
+
+from opensearch_mcp_server.tools.document import (
+    MSEARCH_FILTER_PATH, match_msearch_responses, msearch_filter_path,
+)
+
+SEARCHES = [{"index": "logs"}, {"index": "secrets"}, {"index": "metrics"}]
+
+
+def test_responses_are_matched_around_rejected_searches():
+    checked = [({"size": 20}, None), (None, "index secrets is outside the allowed patterns"), ({"size": 20}, None)]
+    responses = [
+        {"status": 200, "hits": {"total": {"value": 1}, "hits": [{"_id": "a", "_source": {}}]}},
+        {"status": 404, "error": {"type": "index_not_found_exception", "reason": "no such index [metrics]"}},
+    ]
+    results = match_msearch_responses(SEARCHES, checked, responses)
+    assert results[0]["index"] == "logs" and results[0]["total_hits"] == 1
+    assert results[1] == {"index": "secrets", "status": None, "error": "index secrets is outside the allowed patterns"}
+    assert results[2] == {"index": "metrics", "status": 404, "error": "no such index [metrics]"}
+
+
+@pytest.mark.parametrize("responses", [[], [{"status": 200}], [{"status": 200}] * 4])
+def test_mismatched_response_count_is_an_error(responses):
+    checked = [({"size": 20}, None)] * 3
+    with pytest.raises(ValueError, match=f"returned {len(responses)} responses for 3 searches"):
+        match_msearch_responses(SEARCHES, checked, responses)
+
+
+def test_status_and_error_are_always_kept():
+    assert MSEARCH_FILTER_PATH.startswith("responses.status,responses.error,")
+    assert msearch_filter_path(None) == MSEARCH_FILTER_PATH
+    assert msearch_filter_path("responses.hits.hits._id") == "responses.hits.hits._id,responses.status,responses.error"
+    assert msearch_filter_path("") is None
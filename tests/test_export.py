@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from opensearch_mcp_server.export import export_documents, parquet_columns
+
+MAPPING = {"logs": {"mappings": {"properties": {
+    "status": {"type": "integer"},
+    "host": {"type": "keyword"},
+    "tags": {"properties": {"name": {"type": "keyword"}}},
+}}}}
+
+
+class FakeClient:
+    """Synchronous client serving the given hits from a point in time."""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.closed_pits = []
+        client = self
+
+        class Transport:
+            def perform_request(self, method, path, params=None, body=None):
+                if method == "DELETE":
+                    client.closed_pits.extend(body["pit_id"])
+                    return {}
+                return {"pit_id": "pit-1"}
+
+        class Indices:
+            def get_mapping(self, index, filter_path=None):
+                return MAPPING
+
+        self.transport = Transport()
+        self.indices = Indices()
+
+    def search(self, body, filter_path=None, **params):
+        start = body["search_after"][0] if "search_after" in body else 0
+        page = self.hits[start:start + body["size"]]
+        return {"pit_id": "pit-1", "hits": {"hits": page}}
+
+
+def _hits(count):
+    return [{"_index": "logs", "_id": str(i), "_source": {"status": 200, "host": f"h{i}"}, "sort": [i + 1]}
+            for i in range(count)]
+
+
+def test_parquet_columns_follow_the_mapping():
+    assert parquet_columns(MAPPING) == {"status": "int", "host": "string", "tags": "json"}
+
+
+def test_ndjson_export_writes_every_hit(tmp_path):
+    path = tmp_path / "out.ndjson"
+    summary = export_documents(FakeClient(_hits(5)), "logs", {}, str(path), page_size=2)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert summary["rows"] == 5 and [line["_id"] for line in lines] == ["0", "1", "2", "3", "4"]
+    assert summary["bytes"] == path.stat().st_size
+
+
+def test_parquet_export_without_hits_writes_an_empty_file(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    client = FakeClient([])
+    summary = export_documents(client, "logs", {}, str(path), fmt="parquet")
+    table = pq.read_table(str(path))
+    assert summary["rows"] == 0 and summary["bytes"] > 0
+    assert table.num_rows == 0 and table.column_names == ["_index", "_id", "status", "host", "tags", "_unmapped"]
+    assert client.closed_pits == ["pit-1"]
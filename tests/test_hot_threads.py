@@ -0,0 +1,45 @@
+import os
+
+from opensearch_mcp_server.hot_threads import aggregate_stacks, parse_hot_threads
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "hot_threads.txt")
+
+
+def _records():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return list(parse_hot_threads(f))
+
+
+def test_parse_yields_one_record_per_stack_group():
+    records = _records()
+    assert [(r["node"], r["thread_pool"], r["snapshots"], len(r["frames"])) for r in records] == [
+        ("node-1", "search", 8, 3), ("node-1", "search", 2, 0), ("node-1", "write", 10, 2),
+        ("node-2", "search", 5, 3), ("node-2", "search", 1, 1), ("node-2", "search", 4, 0),
+    ]
+    first = records[0]
+    assert first["node_id"] == "aBcD" and first["type"] == "cpu"
+    assert (first["percent"], first["busy_ms"], first["interval_ms"]) == (80.0, 400.0, 500.0)
+    # A unique snapshot counts against the total of the thread's other groups
+    assert records[4]["snapshots_total"] == 10
+
+
+def test_frames_are_capped():
+    with open(FIXTURE, encoding="utf-8") as f:
+        assert max(len(r["frames"]) for r in parse_hot_threads(f, max_frames=1)) == 1
+
+
+def test_identical_stacks_merge_across_nodes_weighted_by_snapshots():
+    result = aggregate_stacks(_records())
+    assert (result["nodes"], result["threads"]) == (2, 3)
+    top = result["hot_stacks"][0]
+    assert top["total_percent"] == 80.0 * 8 / 10 + 60.0 * 5 / 10
+    assert (top["occurrences"], top["node_names"], top["thread_pools"]) == (2, ["node-1", "node-2"], ["search"])
+    assert top["top_frame"].startswith("org.apache.lucene.search.BooleanScorer")
+    assert [t["percent"] for t in result["busiest_threads"]] == [80.0, 60.0, 40.0]
+
+
+def test_stacks_without_frames_are_not_merged():
+    stacks = aggregate_stacks(_records())["hot_stacks"]
+    empty = [s for s in stacks if not s["frames"]]
+    assert [(s["node_names"], s["occurrences"]) for s in empty] == [(["node-2"], 1), (["node-1"], 1)]
+    assert aggregate_stacks(_records())["distinct_stacks"] == 5
@@ -0,0 +1,109 @@
+import base64
+
+import pytest
+from opensearchpy.exceptions import TransportError
+
+from opensearch_mcp_server.pagination import (
+    decode_cursor, encode_cursor, pagination_filter_path, search_page, with_tiebreaker,
+)
+
+
+class FakeClient:
+    """Serves `total` numbered hits through a PIT, or a scroll when PIT is unsupported."""
+
+    def __init__(self, total, pit=True):
+        self.total = total
+        self.requests = []
+        self.closed = []
+        client = self
+
+        class Transport:
+            def perform_request(self, method, path, params=None, body=None):
+                if method == "DELETE":
+                    client.closed.append(("pit", body["pit_id"][0]))
+                    return {}
+                if not pit:
+                    raise TransportError(405, "method_not_allowed", {})
+                return {"pit_id": "pit-1"}
+
+        self.transport = Transport()
+
+    def _hits(self, start, size):
+        return [{"_id": str(i), "_source": {"n": i}, "sort": [i]} for i in range(start, min(self.total, start + size))]
+
+    def search(self, body, index=None, scroll=None, **params):
+        self.requests.append(body)
+        start = body.get("search_after", [-1])[0] + 1
+        response = {"hits": {"hits": self._hits(start, body["size"])}}
+        response["pit_id" if scroll is None else "_scroll_id"] = "pit-1" if scroll is None else "scroll-1"
+        return response
+
+    def scroll(self, body, filter_path=None):
+        return {"_scroll_id": body["scroll_id"], "hits": {"hits": self._hits(2, 2)}}
+
+    def clear_scroll(self, body):
+        self.closed.append(("scroll", body["scroll_id"][0]))
+
+
+def _tamper(token):
+    data = bytearray(base64.urlsafe_b64decode(token))
+    data[-1] ^= 1
+    return base64.urlsafe_b64encode(bytes(data)).decode("ascii")
+
+
+def test_cursor_round_trips():
+    state = {"mode": "pit", "pit_id": "abc", "search_after": [3, "x"], "size": 10, "cluster": "default"}
+    assert decode_cursor(encode_cursor(state)) == state
+    assert decode_cursor(encode_cursor(state), "default") == state
+
+
+def test_tampered_cursor_is_rejected():
+    token = encode_cursor({"mode": "pit", "body": {"query": {"match_all": {}}}, "size": 10})
+    with pytest.raises(ValueError, match="altered"):
+        decode_cursor(_tamper(token))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not a cursor!")
+
+
+def test_cursor_of_another_cluster_is_rejected():
+    token = encode_cursor({"mode": "pit", "size": 10, "cluster": "eu"})
+    with pytest.raises(ValueError, match="belongs to cluster eu"):
+        decode_cursor(token, "us")
+
+
+def test_pit_pages_continue_with_search_after():
+    client = FakeClient(total=5)
+    response, state = search_page(client, "logs", {"query": {"match_all": {}}, "aggs": {"a": {}}}, 2)
+    assert [h["_id"] for h in response["hits"]["hits"]] == ["0", "1"]
+    assert "aggs" in client.requests[0]
+
+    state = decode_cursor(encode_cursor(state))
+    response, state = search_page(client, "logs", {}, 2, state)
+    assert [h["_id"] for h in response["hits"]["hits"]] == ["2", "3"]
+    assert client.requests[1]["search_after"] == [1] and "aggs" not in client.requests[1]
+    assert client.requests[1]["sort"] == with_tiebreaker(None)
+
+    response, state = search_page(client, "logs", {}, 2, decode_cursor(encode_cursor(state)))
+    assert [h["_id"] for h in response["hits"]["hits"]] == ["4"]
+    assert state is None and client.closed == [("pit", "pit-1")]
+
+
+def test_scroll_is_used_without_pit_support():
+    client = FakeClient(total=3, pit=False)
+    _, state = search_page(client, "logs", {}, 2)
+    assert state["mode"] == "scroll" and state["scroll_id"] == "scroll-1"
+    response, state = search_page(client, "logs", {}, 2, decode_cursor(encode_cursor(state)))
+    assert [h["_id"] for h in response["hits"]["hits"]] == ["2"]
+    assert state is None and client.closed == [("scroll", "scroll-1")]
+
+
+def test_hits_without_sort_values_cannot_continue():
+    client = FakeClient(total=5)
+    client._hits = lambda start, size: [{"_id": str(i)} for i in range(start, start + size)]
+    with pytest.raises(ValueError, match="hits.hits.sort"):
+        search_page(client, "logs", {}, 2)
+
+
+def test_filter_path_keeps_the_fields_paging_needs():
+    assert pagination_filter_path(None) is None
+    assert pagination_filter_path("hits.hits._id,hits.hits.sort") == "hits.hits._id,hits.hits.sort,pit_id,_scroll_id"
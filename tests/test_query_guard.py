@@ -0,0 +1,94 @@
+import pytest
+
+from opensearch_mcp_server.query_guard import (
+    DEFAULT_TIMEOUT, QueryGuard, QueryRejected, estimate_buckets, leading_wildcards,
+)
+
+
+def test_leading_wildcards_are_found_in_wildcard_regexp_and_query_string():
+    query = {"bool": {"should": [
+        {"wildcard": {"host": {"value": "*web"}}},
+        {"regexp": {"path": ".*login"}},
+        {"query_string": {"query": "status:500 AND message:?rror"}},
+        {"wildcard": {"host": "web*"}},
+        {"query_string": {"query": "*"}},
+    ]}}
+    assert leading_wildcards(query) == ["*web", ".*login", "?rror"]
+
+
+def test_leading_wildcard_is_rejected():
+    with pytest.raises(QueryRejected, match="leading wildcard"):
+        QueryGuard().check("logs", {"query": {"wildcard": {"host": "*web"}}})
+
+
+def test_leading_wildcard_is_allowed_when_configured():
+    body, _ = QueryGuard(allow_leading_wildcards=True).check("logs", {"query": {"wildcard": {"host": "*web"}}})
+    assert body["query"] == {"wildcard": {"host": "*web"}}
+
+
+def test_bucket_estimate_multiplies_nested_and_sums_siblings():
+    aggs = {
+        "hosts": {"terms": {"field": "host", "size": 50},
+                  "aggs": {"status": {"terms": {"field": "status"}}}},
+        "ranges": {"range": {"field": "bytes", "ranges": [{"to": 10}, {"from": 10}]}},
+        "per_day": {"date_histogram": {"field": "@timestamp", "calendar_interval": "day"}},
+    }
+    unestimated = []
+    assert estimate_buckets(aggs, unestimated) == 50 * 10 + 2 + 1
+    assert unestimated == ["per_day"]
+
+
+def test_bucket_overrun_is_clamped_in_rewrite_mode_and_rejected_in_reject_mode():
+    body = {"aggs": {"hosts": {"terms": {"field": "host", "size": 5000},
+                               "aggs": {"paths": {"terms": {"field": "path", "size": 100}}}}}}
+    rewritten, report = QueryGuard(max_buckets=10000).check("logs", body)
+    assert report["estimated_buckets"] <= 10000 and report["rewrites"]
+    assert body["aggs"]["hosts"]["terms"]["size"] == 5000  # the caller's body is left alone
+    with pytest.raises(QueryRejected, match="buckets"):
+        QueryGuard(mode="reject", max_buckets=10000).check("logs", body)
+
+
+def test_size_is_capped():
+    body, report = QueryGuard(max_size=1000).check("logs", {"from": 200, "size": 5000})
+    assert body["size"] == 800 and report["rewrites"] == ["size 5000 -> 800"]
+    with pytest.raises(QueryRejected, match="beyond"):
+        QueryGuard(max_size=1000).check("logs", {"from": 1000, "size": 10})
+
+
+def test_timeout_is_injected_unless_set():
+    assert QueryGuard().check("logs", {})[0]["timeout"] == DEFAULT_TIMEOUT
+    assert QueryGuard().check("logs", {"timeout": "5s"})[0]["timeout"] == "5s"
+    assert "timeout" not in QueryGuard(timeout=None).check("logs", {})[0]
+
+
+def test_terminate_after_skips_profiled_and_aggregating_searches():
+    guard = QueryGuard(terminate_after=1000)
+    assert guard.check("logs", {})[0]["terminate_after"] == 1000
+    assert "terminate_after" not in guard.check("logs", {"profile": True})[0]
+    assert "terminate_after" not in guard.check("logs", {"aggs": {"n": {"value_count": {"field": "x"}}}})[0]
+
+
+def test_allowed_indices():
+    guard = QueryGuard(allowed_indices=("logs-*", "metrics"))
+    guard.check("logs-2024,metrics", {})
+    guard.check_index("logs-*,-logs-old")
+    with pytest.raises(QueryRejected, match="secrets"):
+        guard.check("logs-2024,secrets", {})
+    with pytest.raises(QueryRejected, match="outside the allowed"):
+        guard.check_index("-logs-old")
+
+
+def test_time_series_index_needs_a_time_range():
+    guard = QueryGuard(time_series_indices=("logs-*",))
+    with pytest.raises(QueryRejected, match="time-series"):
+        guard.check("logs-2024", {"query": {"match": {"host": "web"}}})
+    body, report = QueryGuard(time_series_indices=("logs-*",), default_time_range="now-1d").check(
+        "logs-2024", {"query": {"match": {"host": "web"}}}
+    )
+    assert body["query"]["bool"]["filter"] == [{"range": {"@timestamp": {"gte": "now-1d"}}}]
+    assert report["rewrites"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown query guard mode"):
+        QueryGuard(mode="off")
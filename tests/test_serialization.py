@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from opensearch_mcp_server.serialization import records_to_table, serialize, to_table
+
+
+def _size(text):
+    return len(text.encode("utf-8"))
+
+
+def test_small_responses_are_unchanged():
+    data = {"hits": [{"_id": "1"}], "total": 1}
+    assert json.loads(serialize(data, "json", max_bytes=1000)) == data
+    pretty = serialize(data, "pretty", max_bytes=0)
+    assert json.loads(pretty) == data and "\n  " in pretty
+
+
+def test_largest_list_is_trimmed_to_the_budget_and_marked():
+    data = {"total": 500, "hits": [{"_id": str(i), "message": "x" * 50} for i in range(500)]}
+    text = serialize(data, "json", max_bytes=4000)
+    result = json.loads(text)
+    assert _size(text) <= 4000
+    kept = len(result["hits"])
+    assert 0 < kept < 500 and result["total"] == 500
+    assert result["_truncated"] == {"omitted": 500 - kept, "path": "hits"}
+    # As many records as fit: one more would exceed the budget
+    bigger = dict(data, hits=data["hits"][:kept + 1], _truncated={"omitted": 499 - kept, "path": "hits"})
+    assert _size(serialize(bigger, "json", max_bytes=0)) > 4000
+
+
+def test_nested_list_is_trimmed_without_touching_the_input():
+    data = {"result": {"rows": [{"n": i} for i in range(1000)]}}
+    result = json.loads(serialize(data, "json", max_bytes=2000))
+    assert result["_truncated"]["path"] == "result.rows"
+    assert len(data["result"]["rows"]) == 1000
+
+
+def test_top_level_list_gets_a_trailing_marker_row_in_tables():
+    rows = [{"index": f"logs-{i}", "docs": i} for i in range(1000)]
+    text = serialize(rows, "table", max_bytes=1500)
+    lines = text.splitlines()
+    assert _size(text) <= 1500
+    assert lines[0] == "index\tdocs" and lines[-1].startswith("# truncated: ")
+    assert json.loads(lines[-1][len("# truncated: "):])["omitted"] == 1000 - (len(lines) - 2)
+
+
+def test_text_that_cannot_be_trimmed_is_cut_with_a_marker():
+    text = serialize("é" * 5000, max_bytes=1000)
+    assert _size(text) <= 1000 and text.endswith("bytes]") and "[truncated " in text
+    blob = serialize({"blob": "y" * 5000}, "json", max_bytes=200)
+    assert _size(blob) <= 200 and "[truncated " in blob
+
+
+def test_budget_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("OPENSEARCH_MAX_RESPONSE_BYTES", "300")
+    assert _size(serialize({"rows": [{"n": i} for i in range(1000)]}, "json")) <= 300
+    monkeypatch.setenv("OPENSEARCH_MAX_RESPONSE_BYTES", "0")
+    assert len(json.loads(serialize({"rows": [{"n": i} for i in range(1000)]}, "json"))["rows"]) == 1000
+
+
+def test_table_rendering():
+    assert records_to_table([{"a": 1, "b": "x\ty"}, {"a": None, "c": [1]}]) == "a\tb\tc\n1\tx y\t\n\t\t[1]"
+    assert to_table({"total": 2, "rows": [{"n": 1}, {"n": 2}]}) == "total: 2\nrows:\nn\n1\n2"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown output format 'xml'"):
+        serialize({}, "xml")
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from opensearch_mcp_server.tasks import iter_tasks, summarize_tasks
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "tasks.json")
+
+
+def _tasks():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return json.load(f)["tasks"]
+
+
+def test_iter_tasks_flattens_the_parent_tree():
+    tasks = list(iter_tasks(_tasks()))
+    assert [(t["task_id"], t["root"], t["depth"]) for t in tasks] == [
+        ("node-1:100", "node-1:100", 0),
+        ("node-1:101", "node-1:100", 1),
+        ("node-2:7", "node-1:100", 2),
+        ("node-1:102", "node-1:100", 1),
+        ("node-2:200", "node-2:200", 0),
+    ]
+    assert tasks[0]["running_seconds"] == 120.0
+
+
+def test_group_by_parents_counts_every_descendant():
+    result = summarize_tasks(_tasks(), group_by="parent", long_running_seconds=60)
+    assert (result["tasks"], result["top_level_tasks"]) == (5, 2)
+    reindex = result["groups"][0]
+    assert reindex["parent"] == "node-1:100" and reindex["action"] == "indices:data/write/reindex"
+    assert (reindex["count"], reindex["total_seconds"], reindex["max_seconds"]) == (4, 123.5, 120.0)
+    assert [(t["task_id"], t["children"]) for t in result["long_running"]] == [("node-1:100", 3)]
+
+
+def test_group_by_node_and_action():
+    by_node = {g["node"]: g["count"] for g in summarize_tasks(_tasks(), group_by="node")["groups"]}
+    assert by_node == {"node-1": 3, "node-2": 2}
+    result = summarize_tasks(_tasks(), group_by="action", top=2)
+    assert len(result["groups"]) == 2 and result["groups_omitted"] == 3
+
+
+def test_unknown_group_by_is_rejected():
+    with pytest.raises(ValueError, match="Unknown group_by"):
+        summarize_tasks(_tasks(), group_by="index")
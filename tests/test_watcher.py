@@ -0,0 +1,81 @@
+import logging
+import time
+
+from opensearch_mcp_server import watcher as watcher_module
+from opensearch_mcp_server.watcher import ClusterWatcher
+
+
+class FakeClient:
+    """Cluster with one recovery whose progress a test advances."""
+
+    def __init__(self):
+        self.recovered = 0
+        client = self
+
+        class Cluster:
+            def health(self, filter_path=None):
+                return {"status": "yellow"}
+
+        class Tasks:
+            def list(self, filter_path=None):
+                return {"nodes": {}}
+
+        class Cat:
+            def recovery(self, **params):
+                return [{"index": "logs", "shard": "0", "stage": "index", "source_node": "node-1",
+                         "target_node": "node-2", "bytes_total": "1000", "bytes_recovered": str(client.recovered)}]
+
+        self.cluster, self.tasks, self.cat = Cluster(), Tasks(), Cat()
+
+
+def _watcher(client):
+    watcher = ClusterWatcher(lambda: client, logging.getLogger("test"), interval=60)
+    watcher.ensure_running()
+    deadline = time.monotonic() + 5
+    while watcher.sample < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return watcher
+
+
+def test_rate_of_a_progressing_recovery():
+    client = FakeClient()
+    watcher = _watcher(client)
+    try:
+        client.recovered = 500
+        watcher.poll()
+        rate, samples = watcher.observed_rate("logs", "0", "node-1", "node-2")
+        assert rate > 0 and samples == 2
+    finally:
+        watcher.stop()
+
+
+def test_stalled_recovery_has_no_positive_rate():
+    client = FakeClient()
+    watcher = _watcher(client)
+    try:
+        watcher.poll()
+        rate, _ = watcher.observed_rate("logs", "0", "node-1", "node-2")
+        assert rate <= 0
+    finally:
+        watcher.stop()
+
+
+def test_rate_is_matched_on_source_and_target_node():
+    watcher = _watcher(FakeClient())
+    try:
+        watcher.poll()
+        assert watcher.observed_rate("logs", "0", "node-1", "node-3") is None
+        assert watcher.observed_rate("logs", "0", "node-3", "node-2") is None
+    finally:
+        watcher.stop()
+
+
+def test_stopped_watcher_and_old_samples_give_no_rate(monkeypatch):
+    watcher = _watcher(FakeClient())
+    watcher.poll()
+    later = time.time() + 4 * 60
+    monkeypatch.setattr(watcher_module.time, "time", lambda: later)
+    assert watcher.observed_rate("logs", "0", "node-1", "node-2") is None
+    monkeypatch.undo()
+    watcher.stop()
+    assert watcher.observed_rate("logs", "0", "node-1", "node-2") is None